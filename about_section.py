@@ -6,6 +6,7 @@ description: Portfolio section designed to display housekeeping information and
 
 import streamlit as st
 from portfolio_section import PortfolioSection
+from render_metrics import instrumented_render
 from about_section_data_loader import load_general_info, load_key_interest, load_key_hypothesis, load_dev_environment
 from about_section_data_loader import (
     load_general_info, 
@@ -32,6 +33,7 @@ class AboutSection(PortfolioSection):
             ai_content=not self.DATA_VERIFIED  # This ensures consistency
         )
 
+    @instrumented_render
     def render(self):
         """Render the about section with notable quotes."""
         self._render_headers()
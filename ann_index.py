@@ -0,0 +1,145 @@
+"""
+title: ANN Index Types
+description: Construction and search-time tuning for the FAISS index types the retrieval layer supports: exact
+             "flat" inner-product search, graph-based "hnsw", and compressed "ivfpq" (inverted lists with product
+             quantization). The index builder uses `build_index` per group, the retriever applies efSearch/nprobe
+             when it opens an index, and index_benchmark compares the types on recall, latency and size.
+             Corpora too small to train an approximate index fall back to flat, which is exact and fastest there.
+"""
+
+import os
+import math
+import logging
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# Build-time defaults
+HNSW_M = 32                 # Graph neighbours per node
+HNSW_EF_CONSTRUCTION = 80
+IVFPQ_SUBQUANTIZERS = 48    # 384-d vectors -> 8 dims per sub-vector
+IVFPQ_BITS = 8
+IVFPQ_MIN_TRAINING_POINTS = 39  # Per inverted list, FAISS' own lower bound for k-means
+MIN_APPROXIMATE_ITEMS = int(os.getenv("ANN_MIN_APPROXIMATE_ITEMS", "1000"))
+
+# Search-time defaults, overridable per retriever
+HNSW_EF_SEARCH = int(os.getenv("RETRIEVER_HNSW_EF_SEARCH", "64"))
+IVF_NPROBE = int(os.getenv("RETRIEVER_IVF_NPROBE", "16"))
+
+
+def resolve_index_type(index_type: str, num_vectors: int) -> str:
+    """
+    Index type actually built for a corpus of `num_vectors`.
+
+    Approximate indexes below MIN_APPROXIMATE_ITEMS vectors are replaced by flat: exact search over a
+    few hundred vectors is already sub-millisecond, and IVF-PQ could not be trained on them.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Available: {list(INDEX_TYPES)}")
+    if index_type != "flat" and num_vectors < MIN_APPROXIMATE_ITEMS:
+        return "flat"
+    return index_type
+
+
+def default_nlist(num_vectors: int) -> int:
+    """Number of IVF lists: about 4 * sqrt(n), capped so every list gets enough training points."""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // IVFPQ_MIN_TRAINING_POINTS))
+
+
+def build_index(vectors: np.ndarray, index_type: str = "flat", allow_fallback: bool = True, **options):
+    """
+    Builds and fills an inner-product index over normalized vectors.
+
+    Args:
+        vectors (np.ndarray): NxD float32 matrix; row i becomes vector id i.
+        index_type (str): "flat", "hnsw" or "ivfpq".
+        allow_fallback (bool): Build flat instead when the corpus is below MIN_APPROXIMATE_ITEMS.
+        options: Build parameters: `m` and `ef_construction` for HNSW; `nlist`, `m` and `nbits` for IVF-PQ.
+
+    Returns:
+        faiss.Index: The populated index.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    num_vectors, dimension = vectors.shape
+    resolved = resolve_index_type(index_type, num_vectors) if allow_fallback else index_type
+    if resolved != index_type:
+        logger.info(f"{num_vectors} vectors are too few for '{index_type}'; building a flat index instead.")
+
+    if resolved == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, options.get("m", HNSW_M), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = options.get("ef_construction", HNSW_EF_CONSTRUCTION)
+    elif resolved == "ivfpq":
+        nlist = options.get("nlist") or default_nlist(num_vectors)
+        subquantizers = options.get("m", IVFPQ_SUBQUANTIZERS)
+        if dimension % subquantizers:
+            raise ValueError(f"IVF-PQ needs the dimension ({dimension}) to be a multiple of m ({subquantizers}).")
+        # Codebooks need a few points per centroid; small corpora get fewer bits per sub-vector
+        nbits = options.get("nbits") or min(IVFPQ_BITS, max(1, int(math.log2(num_vectors))))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, subquantizers, nbits, faiss.METRIC_INNER_PRODUCT
+        )
+        # Small corpora train sub-vector codebooks on fewer points than FAISS recommends; that is
+        # expected here (recall is measured by index_benchmark), so skip the per-codebook warning
+        index.pq.cp.min_points_per_centroid = 1
+        index.train(vectors)
+    else:
+        index = faiss.IndexFlatIP(dimension)
+
+    index.add(vectors)
+    return index
+
+
+def index_type_of(index) -> str:
+    """Index type name of a loaded index ("flat", "hnsw", "ivfpq", or the FAISS class name)."""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    return type(index).__name__
+
+
+def configure_search(index, ef_search: int = None, nprobe: int = None):
+    """
+    Applies search-time accuracy/speed settings to an index; flat indexes are left unchanged.
+
+    Args:
+        index: A FAISS index.
+        ef_search (int, optional): HNSW candidate list size (default HNSW_EF_SEARCH).
+        nprobe (int, optional): IVF lists visited per query (default IVF_NPROBE).
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search or HNSW_EF_SEARCH
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe or IVF_NPROBE, index.nlist)
+    return index
+
+
+def enable_reconstruct(index):
+    """
+    Lets `reconstruct`/`reconstruct_batch` work on an index. IVF indexes need a direct map from
+    vector id to inverted-list entry, which FAISS neither builds nor stores by default; other
+    index types are returned unchanged.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.no():
+        ivf.make_direct_map()
+    return index
+
+
+def search_parameters(index, selector=None):
+    """
+    Per-call search parameters carrying an ID selector, typed for the index so that the
+    efSearch/nprobe configured on it still apply.
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    return faiss.SearchParameters(sel=selector)
@@ -3,6 +3,9 @@ title: Web Application
 description: Streamlit based Front-End application for my professional portfolio. 
 """
 
+import time
+start_time = time.perf_counter()
+
 import streamlit as st
 import os
 from dotenv import load_dotenv
@@ -19,6 +22,7 @@ from floating_whatsapp_button import  display_floating_whatsapp_button
 from floating_linkedin_button import display_floating_linkedin_button
 from floating_buttons import display_floating_buttons_container, close_floating_buttons_container
 from multi_page_navigation import render_multi_page_navigation
+from render_metrics import record_rerun, render_debug_overlay
 #from url_as_tooltip import render_tooltip
 
 st.markdown("""
@@ -127,5 +131,9 @@ visible_text = "Universidad de los Andes"
 
 
 render_multi_page_navigation()
+
+# Full script reruns only; fragment reruns (e.g. a RecSys query) are timed by the section itself
+record_rerun("page", time.perf_counter() - start_time)
+render_debug_overlay()
 #display_floating_whatsapp_button( whatsapp_number=WHATSAPP_NUMBER, horizontal_position= "65%",)
 
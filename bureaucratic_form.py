@@ -1,4 +1,5 @@
 import streamlit as st
+from render_metrics import emit
 
 #
 # (0)
@@ -139,4 +140,4 @@ def render_bureaucratic_form(details: dict):
     
     :param details: Dictionary containing field names as keys and corresponding values.
     """
-    st.markdown(_generate_bureaucratic_html(details), unsafe_allow_html=True)
+    st.markdown(emit("markdown", _generate_bureaucratic_html(details)), unsafe_allow_html=True)
@@ -0,0 +1,281 @@
+"""
+title: Encoder Backends
+description: Interchangeable query encoders that all return normalized float32 vectors of the same dimension.
+             "torch" is the original sentence-transformers model. "onnx" runs an exported copy of the same model
+             on ONNX Runtime with a fast tokenizer and mean pooling, so query embedding needs neither torch nor
+             transformers at serving time; "onnx-int8" uses a dynamically quantized export. The command line
+             exports models and compares a backend against the torch reference for parity and latency.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ONNX_MODELS_DIR = os.getenv("ONNX_MODELS_DIR", "onnx_models")
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+MAX_SEQUENCE_LENGTH = 256
+
+# Minimum cosine similarity between a backend's vector and the torch vector for the same query
+PARITY_MIN_COSINE = {"onnx": 0.9999, "onnx-int8": 0.98}
+
+
+def encoder_key(model_name: str, backend: str = None) -> str:
+    """Name under which an encoder is registered and its query vectors are cached."""
+    backend = backend or ENCODER_BACKEND
+    return model_name if backend == "torch" else f"{model_name}[{backend}]"
+
+
+def onnx_model_dir(model_name: str) -> str:
+    """Directory holding the ONNX export of `model_name`."""
+    return os.path.join(ONNX_MODELS_DIR, model_name.replace("/", "__"))
+
+
+#
+# (1) ONNX Runtime encoder
+#
+class OnnxEncoder:
+    """
+    Sentence encoder over an exported transformer, mirroring `SentenceTransformer.encode`.
+
+    Token embeddings are mean-pooled over the attention mask and L2-normalized, which is what the
+    MiniLM sentence-transformers pipeline does.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, num_threads: int = None):
+        """
+        Args:
+            model_dir (str): Directory written by `export_onnx`.
+            quantized (bool): Load the int8 model instead of the float32 one.
+            num_threads (int, optional): Intra-op threads for ONNX Runtime; defaults to its own choice.
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No ONNX model at {model_path}. Export it with: python encoder_backends.py export"
+            )
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        # Hidden size from the output shape (token embeddings: batch x tokens x D); None if symbolic
+        hidden_size = self.session.get_outputs()[0].shape[-1]
+        self._dimension = hidden_size if isinstance(hidden_size, int) else None
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(MAX_SEQUENCE_LENGTH)
+        self.tokenizer.enable_padding()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension D, as on SentenceTransformer."""
+        if self._dimension is None:
+            self._dimension = int(self.encode(["dimension probe"]).shape[1])
+        return self._dimension
+
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        Encodes a list of texts.
+
+        Returns:
+            np.ndarray: (len(texts), D) float32 array.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[start:start + batch_size]))
+            input_ids = np.array([e.ids for e in encodings], dtype="int64")
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype="int64")
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention_mask[..., None].astype("float32")
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype("float32"))
+        if not batches:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype="float32")
+        return np.vstack(batches)
+
+
+#
+# (2) loading
+#
+def load_encoder(model_name: str, backend: str = None):
+    """
+    Instantiates the encoder for `model_name` on the given backend.
+
+    Args:
+        model_name (str): Name of the sentence-transformers model.
+        backend (str, optional): One of BACKENDS; defaults to the ENCODER_BACKEND environment variable.
+
+    Returns:
+        An object with a SentenceTransformer-compatible `encode` method.
+    """
+    backend = backend or ENCODER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Available: {list(BACKENDS)}")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return OnnxEncoder(onnx_model_dir(model_name), quantized=backend == "onnx-int8")
+
+
+#
+# (3) export (needs torch and transformers, only on the machine doing the export)
+#
+def export_onnx(model_name: str, output_dir: str = None, quantize: bool = True) -> str:
+    """
+    Exports the transformer behind `model_name` to ONNX, with an optional int8 copy.
+
+    Args:
+        model_name (str): Name of the sentence-transformers model.
+        output_dir (str, optional): Target directory; defaults to `onnx_model_dir(model_name)`.
+        quantize (bool): Also write a dynamically quantized int8 model.
+
+    Returns:
+        str: The output directory.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    tokenizer.save_pretrained(output_dir)  # Writes tokenizer.json for the runtime tokenizer
+    model = AutoModel.from_pretrained(hub_name).eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in input_names), model_path,
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=14,
+        )
+    logger.info(f"Exported {hub_name} to {model_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantized_path = os.path.join(output_dir, ONNX_INT8_MODEL_FILE)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        logger.info(f"Wrote int8 model to {quantized_path}")
+    return output_dir
+
+
+#
+# (4) parity and latency against the torch reference
+#
+DEFAULT_PARITY_QUERIES = [
+    "time series forecasting",
+    "ETL pipeline with pyspark",
+    "interactive dashboards in Streamlit",
+    "causal inference for labor economics",
+    "ggplot2 visualizations",
+    "web scraping with BeautifulSoup",
+    "Bayesian regression models",
+    "recommendation system with embeddings",
+]
+
+
+def _latency_ms(encoder, queries, repeats):
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            encoder.encode([query], normalize_embeddings=True)
+            timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
+
+
+def compare_backends(model_name: str, backend: str, queries: list = None, repeats: int = 5) -> dict:
+    """
+    Compares `backend` with the torch encoder on the same queries.
+
+    Returns:
+        dict: Minimum cosine similarity, maximum absolute difference, p50/p95 single-query latency
+              and load time for both encoders, and whether parity holds.
+    """
+    from encoder_registry import current_rss_bytes
+
+    queries = queries or DEFAULT_PARITY_QUERIES
+    report = {"model_name": model_name, "backend": backend, "queries": len(queries)}
+    vectors = {}
+    # The candidate is loaded first so its memory figure is not hidden by modules torch already imported
+    for name in (backend, "torch"):
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        encoder = load_encoder(model_name, name)
+        load_seconds = time.perf_counter() - start
+        encoder.encode(queries[:1], normalize_embeddings=True)  # Warm-up
+        vectors[name] = encoder.encode(queries, normalize_embeddings=True).astype("float32")
+        p50, p95 = _latency_ms(encoder, queries, repeats)
+        report[name] = {
+            "load_seconds": round(load_seconds, 3),
+            "rss_delta_mb": round((current_rss_bytes() - rss_before) / 2**20, 1),
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(p95, 3),
+        }
+
+    cosines = np.sum(vectors["torch"] * vectors[backend], axis=1)
+    report["min_cosine"] = round(float(cosines.min()), 6)
+    report["max_abs_diff"] = round(float(np.abs(vectors["torch"] - vectors[backend]).max()), 6)
+    report["parity"] = bool(cosines.min() >= PARITY_MIN_COSINE.get(backend, 1.0))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ONNX query encoders and check them against torch.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Sentence-transformers model name.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export the model to ONNX (needs torch).")
+    export_parser.add_argument("--output-dir", default=None, help="Defaults to ONNX_MODELS_DIR/<model>.")
+    export_parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 model.")
+
+    compare_parser = subparsers.add_parser("compare", help="Check parity and latency against torch.")
+    compare_parser.add_argument("--backend", default="onnx", choices=[b for b in BACKENDS if b != "torch"])
+    compare_parser.add_argument("--repeats", type=int, default=5, help="Timed passes over the queries.")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "export":
+        export_onnx(args.model, args.output_dir, quantize=not args.no_quantize)
+        return 0
+
+    report = compare_backends(args.model, args.backend, repeats=args.repeats)
+    for name in ("torch", args.backend):
+        logger.info(f"{name:>10}: load {report[name]['load_seconds']}s, RSS +{report[name]['rss_delta_mb']} MB, "
+                    f"p50 {report[name]['p50_ms']} ms, p95 {report[name]['p95_ms']} ms")
+    logger.info(f"min cosine {report['min_cosine']}, max |diff| {report['max_abs_diff']}, "
+                f"parity {'OK' if report['parity'] else 'FAILED'}")
+    return 0 if report["parity"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+title: Encoder Registry
+description: A process-wide registry of query encoders shared by every SemanticRetriever. Each model name is
+             loaded once, on first use, and handed out to all retrievers that ask for it. The registry records
+             how long each load took and how much resident memory it added, so cold-start cost can be checked
+             on a running worker. Encoders can run on any backend from encoder_backends (torch or ONNX).
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+
+from encoder_backends import ENCODER_BACKEND, encoder_key, load_encoder
+
+logger = logging.getLogger(__name__)
+
+
+#
+# (0) resident memory of the current process
+#
+def current_rss_bytes():
+    """
+    Returns the resident set size of the current process in bytes.
+
+    Reads /proc/self/statm when available (Linux containers) and falls back to the peak RSS
+    reported by getrusage on other platforms.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+#
+# (1) the registry
+#
+class EncoderRegistry:
+    """
+    Loads encoders lazily and shares them across the process.
+
+    Models are keyed by name and backend. The first caller of `get` pays the load cost; every later caller
+    (from any retriever or Streamlit session thread) receives the same instance.
+    """
+
+    def __init__(self):
+        self._encoders = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _load(self, model_name: str, backend: str = None):
+        """Instantiates the encoder for the given model name on the given backend."""
+        return load_encoder(model_name, backend)
+
+    def get(self, model_name: str, backend: str = None):
+        """
+        Returns the shared encoder for `model_name`, loading it on first request.
+
+        Args:
+            model_name (str): Name of the sentence-transformers model.
+            backend (str, optional): Encoder backend ("torch", "onnx", "onnx-int8"); defaults to the
+                                     ENCODER_BACKEND environment variable.
+
+        Returns:
+            The loaded encoder instance.
+        """
+        key = encoder_key(model_name, backend)
+        encoder = self._encoders.get(key)
+        if encoder is not None:
+            return encoder
+
+        with self._lock:
+            # Another thread may have finished loading while we waited for the lock
+            encoder = self._encoders.get(key)
+            if encoder is not None:
+                return encoder
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            encoder = self._load(model_name, backend)
+            load_seconds = time.perf_counter() - start
+            rss_after = current_rss_bytes()
+
+            self._encoders[key] = encoder
+            self._stats[key] = {
+                "model_name": model_name,
+                "backend": backend or ENCODER_BACKEND,
+                "load_seconds": round(load_seconds, 4),
+                "rss_before_bytes": rss_before,
+                "rss_after_bytes": rss_after,
+                "rss_delta_bytes": rss_after - rss_before,
+                "loaded_at": time.time(),
+            }
+            logger.info(
+                "Loaded encoder '%s' in %.2fs (RSS +%.1f MB)",
+                key, load_seconds, (rss_after - rss_before) / 2**20
+            )
+            return encoder
+
+    def is_loaded(self, model_name: str, backend: str = None) -> bool:
+        """Whether the encoder for `model_name` is already resident."""
+        return encoder_key(model_name, backend) in self._encoders
+
+    def stats(self) -> dict:
+        """
+        Returns load timing and memory figures for every encoder loaded so far.
+
+        Returns:
+            dict: encoder key -> {model_name, backend, load_seconds, rss_before_bytes, rss_after_bytes, rss_delta_bytes, loaded_at},
+                  plus a "process" entry with the current resident memory.
+        """
+        report = {name: dict(entry) for name, entry in self._stats.items()}
+        report["process"] = {"rss_bytes": current_rss_bytes()}
+        return report
+
+
+# Process-wide instance shared by all retrievers
+encoder_registry = EncoderRegistry()
+
+
+def get_encoder(model_name: str = "all-MiniLM-L6-v2", backend: str = None):
+    """Shortcut to the shared registry."""
+    return encoder_registry.get(model_name, backend)
+
+
+def encoder_stats() -> dict:
+    """Shortcut to the shared registry statistics."""
+    return encoder_registry.stats()
@@ -4,6 +4,7 @@ description: A custom front-end component to highlight notable quotes.
 """
 
 import streamlit as st
+from render_metrics import emit
 
 def exceptional_but_subtle_quote(markdown_text: str):
     """
@@ -29,4 +30,4 @@ def exceptional_but_subtle_quote(markdown_text: str):
 
     """
     
-    st.markdown(subtle_style, unsafe_allow_html=True)
+    st.markdown(emit("markdown", subtle_style), unsafe_allow_html=True)
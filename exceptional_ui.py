@@ -5,6 +5,8 @@ description: Implements beautiful front-end components using Streamlit, HTML, an
 
 import streamlit as st
 import time
+from render_metrics import emit
+from html_fragments import stable_id
 
 #
 # (0)
@@ -70,7 +72,7 @@ def apply_custom_tooltip(element_id: str, tooltip_text: str, sys_prompt: str = "
         apply_custom_tooltip("my_button", "Click to submit")
     """
     full_tooltip_text = f"{sys_prompt} {tooltip_text}"
-    st.markdown(_custom_tooltip_html(element_id, full_tooltip_text), unsafe_allow_html=True)
+    st.markdown(emit("markdown", _custom_tooltip_html(element_id, full_tooltip_text)), unsafe_allow_html=True)
 
 #
 # (2)
@@ -201,7 +203,8 @@ def html_for_tooltip_from_large_list(items, label, color="#007ACC", emoji=None):
     if not items:
         return f'<div style="color:gray;">No {label.lower()} listed</div>', None
 
-    unique_id = hashlib.md5(datetime.now().isoformat().encode()).hexdigest()[:10]
+    # Derived from the content, so the same list renders to identical HTML on every rerun
+    unique_id = stable_id(label, color, emoji, *items, prefix="summary_")
 
     # Remove trailing dot from the first item
     first_item = html.escape(items[0]).rstrip(".")
@@ -234,15 +237,12 @@ def setup_tooltip_behavior(unique_id):
     Injects the required CSS and behavior into Streamlit to activate the tooltip.
     Combines an unfolding effect with a subtle floating animation and background blur.
     """
-    import time
     if not unique_id:
         return ""
 
-    timestamp = int(time.time())  # Forces Streamlit to refresh styles
-
     tooltip_css = f"""
     <style>
-        /* Timestamp {timestamp} to force refresh */
+        /* Styles for tooltip {unique_id} */
 
         .tooltip-container {{
             display: inline;
@@ -3,7 +3,8 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import os
 import streamlit as st
-import uuid
+from html_fragments import stable_id
+from render_metrics import emit
 
 #
 # (1)
@@ -102,7 +103,7 @@ def _url_as_tooltip_html(visible_text, url):
     hero = metadata.get("hero_image")
     final_url = metadata.get("url", url)
 
-    tooltip_id = f"tooltip_{uuid.uuid4().hex[:8]}"
+    tooltip_id = stable_id(visible_text, url, prefix="tooltip_", length=8)
     hero_img_html = f'<img src="{hero}" alt="Main Image" class="hero-img" />' if hero else ""
 
     html = f"""
@@ -198,7 +199,7 @@ def _url_as_tooltip_html(visible_text, url):
 def render_url_as_tooltip(visible_text, url):
     """Render the tooltip using Streamlit markdown."""
     html = _url_as_tooltip_html(visible_text, url)
-    st.markdown(html, unsafe_allow_html=True)
+    st.markdown(emit("markdown", html), unsafe_allow_html=True)
 #
 # (4)
 #
@@ -248,7 +249,7 @@ def _url_as_tooltip_html(visible_text, url, strategy="default"):
     hero = metadata.get("hero_image")
     final_url = metadata.get("url", url)
 
-    tooltip_id = f"tooltip_{uuid.uuid4().hex[:8]}"
+    tooltip_id = stable_id(visible_text, url, strategy, prefix="tooltip_", length=8)
     tooltip_content = ""
 
     # Title row (icon + title link)
@@ -372,7 +373,7 @@ def _url_as_tooltip_html(visible_text, url, strategy="default"):
 def render_url_as_tooltip(visible_text, url, strategy="default"):
     """Render the tooltip using Streamlit markdown with optional scraping strategy."""
     html = _url_as_tooltip_html(visible_text, url, strategy)
-    st.markdown(html, unsafe_allow_html=True)
+    st.markdown(emit("markdown", html), unsafe_allow_html=True)
 
 
 
@@ -6,7 +6,7 @@ description: Implements the front-end representation of items displayed by the R
 import hashlib
 import html
 import re
-import time
+from datetime import datetime, timedelta, timezone
 
 import streamlit as st
 from badges_for_item_data import apply_badges_to_item_title
@@ -14,6 +14,11 @@ from exceptional_ui import _custom_tooltip_html
 from media_carrousel import flexible_file_discovery, html_for_media_carousel, dummy_media_list
 from tooltip_canvas import TooltipCanvas
 from front_end_utils import prettify_title, render_external_link_button,  html_for_container,html_for_github_button, ButtonFabric
+from html_fragments import html_fragment_cache, stable_id, content_hash, files_signature
+from render_metrics import emit
+
+# Hours an item keeps its "recently updated"/"recently created" badges (apply_badges_to_item_title's default)
+BADGE_RECENCY_HOURS = 72
 
 # Instantiate the tooltip system
 tooltip_system = TooltipCanvas()
@@ -156,6 +161,28 @@ def html_for_milestones_from_project_metadata(milestones=None, project_metadata=
     </style>
     """
 
+def item_card_signature(rec, search_dir="assets"):
+    """
+    What an item's card depends on besides its styling, computed once per item by whoever owns the
+    item list (RecSysCatalog, ServicesSection), so rendering a card does no file discovery, hashing
+    of the item or date parsing.
+
+    Returns:
+    - tuple: (content signature, media paths, badge_flips) where the signature covers the item and
+      the size/mtime of its media files, and `badge_flips` are the UTC timestamps at which its
+      recency badges expire.
+    """
+    media = tuple(flexible_file_discovery(rec["image_path"], search_dir=search_dir) or []) if "image_path" in rec else ()
+    badge_flips = []
+    for field in ("last_updated", "creation_date"):
+        try:
+            since = datetime.fromisoformat(str(rec[field]).replace("Z", "+00:00"))
+            badge_flips.append((since + timedelta(hours=BADGE_RECENCY_HOURS)).timestamp())
+        except (KeyError, ValueError, TypeError):
+            continue
+    return content_hash(rec, files_signature(media)), media, tuple(sorted(badge_flips))
+
+
 def html_for_item_data(
     rec,
     badge_rules=None,
@@ -163,11 +190,17 @@ def html_for_item_data(
     border_style="1px solid #ddd",
     card_height="150px",
     post_fix="_card",
-    search_dir="assets"  # Default search directory for media files
+    search_dir="assets",  # Default search directory for media files
+    slot="grid",
+    signature=None
 ):
     """
     Generate an HTML snippet for a recommended item card dynamically.
 
+    Cards are served from the HTML fragment cache, keyed by the item id, its `item_card_signature`,
+    how many of its recency badges have expired, and the arguments. A cached card, media carousel
+    included, is returned as is.
+
     Parameters:
     - rec (dict): Dictionary containing item metadata.
     - badge_rules (dict, optional): Rules for applying badges to the item title.
@@ -176,10 +209,33 @@ def html_for_item_data(
     - card_height (str, optional): Height of the card.
     - post_fix (str, optional): Suffix for card ID.
     - search_dir (str, optional): Base directory for media file discovery.
+    - slot (str, optional): Where the card is placed; with the item id it determines the card ID,
+      so the same item can appear in two places without clashing.
+    - signature (tuple, optional): The item's precomputed `item_card_signature`; computed here when omitted.
 
     Returns:
-    - tuple: (card_html, styles_html)
+    - tuple: (card_html, tooltip_html, tooltip_styles)
     """
+    if signature is None:
+        signature = item_card_signature(rec, search_dir)
+    content_signature, discovered_media, badge_flips = signature
+    now = datetime.now(timezone.utc).timestamp()
+    expired_badges = sum(now >= flip for flip in badge_flips)
+    key = content_hash(
+        rec.get("id") or rec.get("title"), content_signature, expired_badges,
+        badge_rules, background_color, border_style, card_height, post_fix, slot
+    )
+    # The badges store their flags on the item, so the card is built from a copy (the metadata is shared)
+    return html_fragment_cache.get_or_render(
+        "item_card", key,
+        lambda: _html_for_item_data(
+            dict(rec), badge_rules, background_color, border_style, card_height, post_fix, slot, discovered_media
+        )
+    )
+
+
+def _html_for_item_data(rec, badge_rules, background_color, border_style, card_height, post_fix, slot, discovered_media):
+    """Builds the card HTML (see html_for_item_data)."""
 
     # Define the styles for the title
     title_style = {
@@ -212,10 +268,10 @@ def html_for_item_data(
         "border-radius": "8px",  
     }
     
-    # Unique ID based on timestamp hash
-    card_id = f"card_{hash(time.time())}"
+    # Stable ID from the item and its slot, so reruns produce identical HTML
+    card_id = stable_id(rec.get("id") or rec.get("title", ""), slot, prefix="card_") + post_fix
 
-    # Apply the badge system
+    # Apply the badge system (once; the tooltip reuses the badged title)
     title = apply_badges_to_item_title(rec, badge_rules)
     
     # Wrap the title using the new function
@@ -230,7 +286,7 @@ def html_for_item_data(
 
     # Merge modern_dashboard_style with title_style and set width to 300px
     tooltip_title = html_for_container(
-        f'<div class="item-tooltip title-tooltip">{apply_badges_to_item_title(rec, badge_rules)}</div>',
+        f'<div class="item-tooltip title-tooltip">{title}</div>',
         {**modern_dashboard_style, **title_style, "width": "300px"}
     )
     
@@ -294,18 +350,17 @@ def html_for_item_data(
             ]
         ]
 
-    # If the card metadata includes an image path, discover media files
-    if "image_path" in rec:
-        discovered_media = flexible_file_discovery(rec["image_path"], search_dir=search_dir)
-        if discovered_media:
-            media_items = [{"src": path, "alt": f"Media {i+1}"} for i, path in enumerate(discovered_media)]
-            media_carousel = html_for_media_carousel(media_items)
-            tooltip_content.append([
-                html_for_container(
-                    f'<div class="item-tooltip media-carousel-tooltip">{media_carousel}</div>',
-                    {"max-width": "800px"}
-                )
-            ])
+    # If the card metadata includes an image path, show the discovered media files. The card is cached
+    # as a whole, so the carousel is not memoized separately
+    if discovered_media:
+        media_items = [{"src": path, "alt": f"Media {i+1}"} for i, path in enumerate(discovered_media)]
+        media_carousel = html_for_media_carousel(media_items, cache=False)
+        tooltip_content.append([
+            html_for_container(
+                f'<div class="item-tooltip media-carousel-tooltip">{media_carousel}</div>',
+                {"max-width": "800px"}
+            )
+        ])
 
     # Generate tooltip
     tooltip_html, tooltip_styles = tooltip_system.html_to_apply_tooltip(
@@ -481,7 +536,7 @@ def render_recommendation_card(rec, badge_rules=None, title_style=None, key=None
     border_style = "1px solid #ddd"
 
     # Apply the badge system (if badge_rules is provided)
-    title = apply_badges_to_item_title(rec, badge_rules) if badge_rules else rec.get("title", "Untitled")
+    title = apply_badges_to_item_title(dict(rec), badge_rules) if badge_rules else rec.get("title", "Untitled")
 
     # Wrap the title in a tooltip div
     raw_title = f'<div class="recommendation-title" style="{title_style_str}">{title}</div>'
@@ -575,38 +630,38 @@ def render_recommendation_card(rec, badge_rules=None, title_style=None, key=None
     """
 
     # Render the styles once
-    st.markdown(card_styles, unsafe_allow_html=True)
+    st.markdown(emit("markdown", card_styles), unsafe_allow_html=True)
 
     # Create the recommendation card container
     with st.container(border=True, key=f"card-{key}"):
-        st.markdown(f'<div class="recommendation-card">{raw_title}</div>', unsafe_allow_html=True)
+        st.markdown(emit("markdown", f'<div class="recommendation-card">{raw_title}</div>'), unsafe_allow_html=True)
 
         # GitHub and Colab buttons inside separate columns
         col1, col2 = st.columns([1, 1])
         with col1:
             if "url" in rec:
                 st.markdown(
-                    f'<a href="{rec["url"]}" target="_blank" class="github-btn">'
-                    f'<img src="https://cdn-icons-png.flaticon.com/512/25/25231.png" alt="GitHub">'
-                    f'</a>',
+                    emit("markdown", f'<a href="{rec["url"]}" target="_blank" class="github-btn">'
+                                     f'<img src="https://cdn-icons-png.flaticon.com/512/25/25231.png" alt="GitHub">'
+                                     f'</a>'),
                     unsafe_allow_html=True
                 )
         with col2:
             if "colab_url" in rec:
                 st.markdown(
-                    f'<a href="{rec["colab_url"]}" target="_blank" class="colab-btn">'
-                    f'<img src="https://upload.wikimedia.org/wikipedia/commons/thumb/d/d0/Google_Colaboratory_SVG_Logo.svg/512px-Google_Colaboratory_SVG_Logo.svg.png" alt="Colab">'
-                    f'</a>',
+                    emit("markdown", f'<a href="{rec["colab_url"]}" target="_blank" class="colab-btn">'
+                                     f'<img src="https://upload.wikimedia.org/wikipedia/commons/thumb/d/d0/Google_Colaboratory_SVG_Logo.svg/512px-Google_Colaboratory_SVG_Logo.svg.png" alt="Colab">'
+                                     f'</a>'),
                     unsafe_allow_html=True
                 )
 
         # Tooltip container
         with st.container(border=False, key=f"tooltip-{key}"):
-            st.markdown('<div class="media-tooltip">', unsafe_allow_html=True)
-            st.markdown('<div class="media-tooltip-content">', unsafe_allow_html=True)
-            st.markdown('<div class="media-tooltip-title">Media Content</div>', unsafe_allow_html=True)
-            st.markdown("<p>Placeholder for media content. You can add images, videos, or other media related to this item here.</p>", unsafe_allow_html=True)
-            st.markdown('</div></div>', unsafe_allow_html=True)
+            st.markdown(emit("markdown", '<div class="media-tooltip">'), unsafe_allow_html=True)
+            st.markdown(emit("markdown", '<div class="media-tooltip-content">'), unsafe_allow_html=True)
+            st.markdown(emit("markdown", '<div class="media-tooltip-title">Media Content</div>'), unsafe_allow_html=True)
+            st.markdown(emit("markdown", "<p>Placeholder for media content. You can add images, videos, or other media related to this item here.</p>"), unsafe_allow_html=True)
+            st.markdown(emit("markdown", '</div></div>'), unsafe_allow_html=True)
 
 
 def html_for_milestones_from_project_metadata(milestones=None, project_metadata=None, milestone_type="achieved_milestones"):
@@ -6,16 +6,17 @@ description: Contains various utilities for design across portfolio sections.
 import html
 import streamlit as st
 import re
-import random
 from exceptional_ui import apply_custom_tooltip
+from html_fragments import stable_id
+from render_metrics import emit
 
 
 #
 def render_section_separator():
   # 
-  st.markdown("<br>", unsafe_allow_html=True)
-  st.markdown("<br>", unsafe_allow_html=True)
-  st.markdown("<br>", unsafe_allow_html=True)
+  st.markdown(emit("markdown", "<br>"), unsafe_allow_html=True)
+  st.markdown(emit("markdown", "<br>"), unsafe_allow_html=True)
+  st.markdown(emit("markdown", "<br>"), unsafe_allow_html=True)
 
 
 #
@@ -238,10 +239,8 @@ def prettify_title(title, cleanup_regex=r"[^a-zA-Z0-9]+"):
     return " ".join(word.capitalize() for word in clean_title.split())
 
 #
-import random
-
 def tags_in_twitter_style(tags, color_palette=None):
-    """Generates styled hashtags with a high intellectual energy vibe."""
+    """Generates styled hashtags with a high intellectual energy vibe. Each tag keeps its color across reruns."""
     if color_palette is None:
         color_palette = [
             "#5F0F40",  # Deep Magenta
@@ -259,7 +258,7 @@ def tags_in_twitter_style(tags, color_palette=None):
         cleaned = "".join(word.capitalize() for word in tag.lower().split())
         return (
             f'<span style="'
-            f'color: {random.choice(color_palette)}; '
+            f'color: {color_palette[int(stable_id(cleaned), 16) % len(color_palette)]}; '
             f'font-size: 1.0em; '
             f'font-weight: 600; '
             f'margin-right: 14px; '
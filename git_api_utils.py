@@ -476,11 +476,11 @@ def load_metadata_from_file(metadata_type):
     if os.path.exists(metadata_path):
         # If the file exists, read and return the data
         with open(metadata_path, 'r') as file:
-            print(f"Loading {metadata_type} metadata from {metadata_path}")
+            logger.info(f"Loading {metadata_type} metadata from {metadata_path}")
             return json.load(file)
     else:
         # If the file doesn't exist, log a message and return None
-        print(f"{metadata_type} metadata file not found at {metadata_path}.")
+        logger.warning(f"{metadata_type} metadata file not found at {metadata_path}.")
         return None
 # 
 def load_repos_metadata():
@@ -548,6 +548,56 @@ def reconcile_metadata(keys, *sources):
 
     return list(reconciled.values())
 
+#
+# 14.
+#
+def _slugify(text):
+    """Lowercase slug with underscores, e.g. 'Forecast Plots' -> 'forecast_plots'."""
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+def project_item_id(project):
+    """
+    Stable id for a project (repository): its repository name.
+    """
+    return project["title"]
+
+def module_item_id(module):
+    """
+    Stable id for a code sample: '<repo_name>/<slugified title>'.
+    """
+    return f"{module['repo_name']}/{_slugify(module['title'])}"
+
+def assign_item_ids(items, kind):
+    """
+    Adds an 'id' field to every item that lacks one, keeping existing ids untouched.
+
+    Ids are derived from the item the first time they are assigned and persisted with the metadata,
+    so they survive later edits to titles. Collisions get a numeric suffix.
+
+    :param items: List of metadata dictionaries (modified in place).
+    :param kind: 'repos' or 'modules'.
+    :return: The same list, for convenience.
+    """
+    if kind == 'repos':
+        make_id = project_item_id
+    elif kind == 'modules':
+        make_id = module_item_id
+    else:
+        raise ValueError("Invalid metadata type. Choose 'repos' or 'modules'.")
+
+    taken = {item["id"] for item in items if item.get("id")}
+    for item in items:
+        if item.get("id"):
+            continue
+        base_id = candidate = make_id(item)
+        suffix = 2
+        while candidate in taken:
+            candidate = f"{base_id}-{suffix}"
+            suffix += 1
+        item["id"] = candidate
+        taken.add(candidate)
+    return items
+
 # Main loop for extracting and reconciling metadata
 def main():
     logging.info("Downloading existing metadata from GitHub...")
@@ -587,7 +637,11 @@ def main():
     reconciled_repos_metadata = reconcile_metadata(["url"], repos_metadata_from_json_files, repos_metadata_from_code_repos)
     reconciled_modules_metadata = reconcile_metadata(["title","repo_name"], modules_metadata_from_json_files, modules_metadata_from_code_repos)
 
-    # Step 4: Overwrite metadata files in the local 'files' folder
+    # Step 4: Give new entries a stable id (existing ids are kept)
+    assign_item_ids(reconciled_repos_metadata, 'repos')
+    assign_item_ids(reconciled_modules_metadata, 'modules')
+
+    # Step 5: Overwrite metadata files in the local 'files' folder
     with open(REPOS_METADATA_FILE, "w", encoding="utf-8") as f:
         json.dump(sorted(reconciled_repos_metadata, key=lambda x: x["title"]), f, indent=2)
 
@@ -27,6 +27,7 @@ from bureaucratic_form import render_bureaucratic_form
 from front_end_for_recommended_content import html_for_milestones_from_project_metadata
 import html 
 from expandable_text import  expandable_text_html
+from render_metrics import emit, instrumented_render
 
 # Load environment variables
 load_dotenv()
@@ -92,65 +93,65 @@ class HeroArea:
               <p style="padding-left: 20px;">📧 {' | '.join(DEFAULT_EMAILS)}</p>
           </div>
           """
-          st.markdown(contact_html, unsafe_allow_html=True)
+          st.markdown(emit("markdown", contact_html), unsafe_allow_html=True)
 
     def render_contact_button(self):
         if not self.whatsapp_number:
             st.warning("WhatsApp number is not available.")
             return
         
-        st.markdown(f'<p class="contact-button-intro">{self.contact_button_intro}</p>', unsafe_allow_html=True)
+        st.markdown(emit("markdown", f'<p class="contact-button-intro">{self.contact_button_intro}</p>'), unsafe_allow_html=True)
         
         button_url = f"https://wa.me/{self.whatsapp_number}?text=Hi,%20I%27d%20like%20to%20connect!"
     
         button_label = "Start a Conversation 💬"
     
-        st.markdown(f"""
+        st.markdown(emit("markdown", f"""
         <a href="{button_url}" target="_blank">
             <button style="background-color: #25d366; color: white; border: 1px solid white; padding: 10px 20px; font-size: 14px; border-radius: 5px; text-align: center; width: 100%;">
                 {button_label}
             </button>
         </a>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
     
     def _render_biopic_section(self):
         """Renders the avatar, caption, hashtags, and contact details with a fun tooltip."""
         avatar_id = "biopic-avatar"
     
-        st.markdown('<div class="hero-avatar-container" style="position: relative;">', unsafe_allow_html=True)
+        st.markdown(emit("markdown", '<div class="hero-avatar-container" style="position: relative;">'), unsafe_allow_html=True)
     
         # Actual image (keeps working properly)
-        st.image(f"assets/{self.avatar_image}", use_container_width=True)
+        st.image(emit("image", f"assets/{self.avatar_image}"), use_container_width=True)
     
         # Invisible div positioned over the image
-        st.markdown(f"""
+        st.markdown(emit("markdown", f"""
         <div id="{avatar_id}" style="
             position: absolute; 
             top: 0; left: 0; width: 100%; height: 100%;
             background: transparent;">
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
     
         apply_custom_tooltip(avatar_id, "I am 15% less good-looking but 25% greater worker than I appear. 🎭💪")
     
         # Caption and Hashtags
         tags_html = tags_in_twitter_style(self.avatar_tags)
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <div style="text-align: center; font-size: 1.1em; color: #444;">
                 <p>{self.avatar_caption}</p>
             </div>
-            """,
+            """),
             unsafe_allow_html=True,
         )
     
         # Contact Details
         #self.render_contact_details()
     
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(emit("markdown", '</div>'), unsafe_allow_html=True)
 
     def _render_quote(self):
-        st.markdown("""
+        st.markdown(emit("markdown", """
         <style>
         .hero-quote {
             font-style: italic;
@@ -174,7 +175,7 @@ class HeroArea:
             animation: inkSeep 0.3s ease-in-out forwards;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
     
         for paragraph in self.quote:
             # Match words with possible <b> or <em> tags and include the following space or comma
@@ -186,9 +187,10 @@ class HeroArea:
                 for i, (word, space) in enumerate(words)
             )
     
-            st.markdown(f'<p class="hero-quote">{styled_text}</p>', unsafe_allow_html=True)
+            st.markdown(emit("markdown", f'<p class="hero-quote">{styled_text}</p>'), unsafe_allow_html=True)
 
         
+    @instrumented_render
     def render(self):
         col1, col2 = st.columns([2, 1])
     
@@ -204,8 +206,8 @@ class HeroArea:
         # Bureaucratic Form Section (before detailed professional offering)
         render_bureaucratic_form(DETAILS)
         
-        st.markdown('<br>', unsafe_allow_html=True)       
-        st.markdown('<br>', unsafe_allow_html=True)  
+        st.markdown(emit("markdown", '<br>'), unsafe_allow_html=True)       
+        st.markdown(emit("markdown", '<br>'), unsafe_allow_html=True)  
         
         self.render_detailed_offering()
         #self.render_code_samples(notebook_examples)
@@ -213,7 +215,7 @@ class HeroArea:
     
     def render_code_samples(self, notebook_examples):
         st.markdown(
-            """
+            emit("markdown", """
             <style>
                 .non-fixed-navbar {
                     margin: 0 auto;
@@ -273,7 +275,7 @@ class HeroArea:
                     font-style: italic;
                 }
             </style>
-            """,
+            """),
             unsafe_allow_html=True,
         )
     
@@ -288,7 +290,7 @@ class HeroArea:
         ])
     
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <div>
                 <p class="section-label">
                     I highlighted some exceptional code samples from my ML consultancies:
@@ -297,7 +299,7 @@ class HeroArea:
                     {links_html}
                 </div>
             </div>
-            """,
+            """),
             unsafe_allow_html=True,
         )
 
@@ -383,13 +385,13 @@ class HeroArea:
             offering_html += '</li>'
     
         offering_html += '</ul>'
-        st.markdown(offering_html, unsafe_allow_html=True)
+        st.markdown(emit("markdown", offering_html), unsafe_allow_html=True)
     
         # (3) Enhanced tooltip styles
         style_block += "</style>"
-        st.markdown(style_block, unsafe_allow_html=True)
+        st.markdown(emit("markdown", style_block), unsafe_allow_html=True)
     
-        st.markdown(f"""
+        st.markdown(emit("markdown", f"""
           <style>
               .skills-container:hover {{
                   background-color: {pastel_color};
@@ -430,7 +432,7 @@ class HeroArea:
                   transform: translateX(-50%) translateY(0px) scale(1.1);
               }}
           </style>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
 
 
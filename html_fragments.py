@@ -0,0 +1,115 @@
+"""
+title: HTML Fragments
+description: Deterministic element ids and a memo cache for generated HTML. Ids are short digests of stable content
+             keys (e.g. item id + slot), so the same card renders to byte-identical HTML on every rerun and in every
+             session. That makes the output memoizable: HtmlFragmentCache maps a content hash of a generator's
+             inputs (plus the size and mtime of any files it inlines) to the finished HTML, so a card that has
+             not changed costs a dictionary lookup instead of a full string rebuild and base64 encoding. The
+             cache is bounded by the total size of its fragments, since inlined media can make one fragment
+             several megabytes.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+HTML_FRAGMENT_CACHE_MB = float(os.getenv("HTML_FRAGMENT_CACHE_MB", "64"))
+
+
+#
+# (1) stable keys
+#
+def stable_id(*parts, prefix: str = "", length: int = 10) -> str:
+    """Short, HTML-safe id derived from `parts` (same parts, same id)."""
+    digest = hashlib.md5("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:length]
+    return f"{prefix}{digest}"
+
+
+def content_hash(*values) -> str:
+    """Digest of JSON-serializable inputs, independent of dict key order."""
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def files_signature(paths) -> tuple:
+    """(path, mtime_ns, size) of each file, so cached HTML that inlines files is rebuilt when they change."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+#
+# (2) fragment cache
+#
+class HtmlFragmentCache:
+    """
+    LRU cache of generated HTML, keyed by (namespace, content key) and bounded by the total
+    characters of the cached fragments.
+
+    Values must be immutable (strings or tuples of strings), since they are shared by every session.
+    A fragment larger than the whole budget is returned but not cached.
+    """
+
+    def __init__(self, max_bytes: int = int(HTML_FRAGMENT_CACHE_MB * 2**20)):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (namespace, key) -> (value, size)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _size(value) -> int:
+        """Characters in a fragment; generated HTML (and its base64 media) is ASCII, so about its bytes."""
+        return sum(len(part) for part in value) if isinstance(value, tuple) else len(value)
+
+    def get_or_render(self, namespace: str, key: str, render):
+        """Returns the cached fragment for `key`, calling `render()` to build it on a miss."""
+        cache_key = (namespace, key)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                return self._entries[cache_key][0]
+            self.stats["misses"] += 1
+
+        value = render()
+        size = self._size(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self._entries[cache_key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.stats["evictions"] += 1
+        return value
+
+    def invalidate(self, namespace: str = None):
+        """Drops every fragment, or only those of one namespace."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self.total_bytes = 0
+            else:
+                for cache_key in [k for k in self._entries if k[0] == namespace]:
+                    self.total_bytes -= self._entries.pop(cache_key)[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+html_fragment_cache = HtmlFragmentCache()
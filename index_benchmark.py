@@ -0,0 +1,165 @@
+"""
+title: Index Benchmark
+description: Compares the FAISS index types from ann_index (flat, HNSW, IVF-PQ at several efSearch/nprobe settings)
+             on recall@k against exact search, p50/p99 single-query latency, build time and serialized size. It runs
+             on the vectors of the real embedding corpora and on synthetic corpora scaled up from them: every real
+             vector spawns noisy, re-normalized neighbours, so the scaled set keeps the real topic structure.
+             Queries are perturbed corpus vectors, which needs no encoder.
+
+Usage:
+    python index_benchmark.py                       # real corpora plus 100x synthetic versions
+    python index_benchmark.py --scale 10 --k 5      # smaller synthetic corpora
+    python index_benchmark.py --json bench.json     # also write the report as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+import faiss
+import numpy as np
+
+from ann_index import build_index, configure_search
+from index_builder import INDEX_FILE, PROJECTS_OUTPUT_DIR, SAMPLES_OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+# (label, index type, build options, search settings)
+CONFIGURATIONS = [
+    ("flat", "flat", {}, {}),
+    ("hnsw ef=16", "hnsw", {}, {"ef_search": 16}),
+    ("hnsw ef=64", "hnsw", {}, {"ef_search": 64}),
+    ("hnsw ef=128", "hnsw", {}, {"ef_search": 128}),
+    ("ivfpq nprobe=1", "ivfpq", {}, {"nprobe": 1}),
+    ("ivfpq nprobe=8", "ivfpq", {}, {"nprobe": 8}),
+    ("ivfpq nprobe=32", "ivfpq", {}, {"nprobe": 32}),
+]
+
+
+#
+# (1) corpora and queries
+#
+def load_corpus_vectors(source_dir: str) -> np.ndarray:
+    """Reconstructs every vector of the root index in `source_dir`."""
+    index = faiss.read_index(os.path.join(source_dir, INDEX_FILE))
+    return index.reconstruct_n(0, index.ntotal).astype("float32")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype("float32")
+
+
+def perturb(vectors: np.ndarray, copies: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """`copies` noisy, unit-length variants of each vector."""
+    repeated = np.repeat(vectors, copies, axis=0)
+    return _normalize(repeated + rng.normal(0.0, noise, repeated.shape).astype("float32"))
+
+
+def make_queries(corpus: np.ndarray, num_queries: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    """Queries near randomly chosen corpus vectors."""
+    rows = rng.integers(0, len(corpus), num_queries)
+    return perturb(corpus[rows], 1, noise, rng)
+
+
+#
+# (2) measurements
+#
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    """Mean fraction of the exact top-k found by the approximate search."""
+    hits = [len(set(a[a >= 0]) & set(e[e >= 0])) / max(len(e[e >= 0]), 1) for a, e in zip(approximate, exact)]
+    return float(np.mean(hits))
+
+
+def benchmark_configuration(corpus, queries, exact_ids, k, index_type, build_options, search_settings) -> dict:
+    """Builds one index configuration and measures it on `queries`."""
+    start = time.perf_counter()
+    index = build_index(corpus, index_type, allow_fallback=False, **build_options)
+    build_seconds = time.perf_counter() - start
+    configure_search(index, **search_settings)
+
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+
+    return {
+        "recall_at_k": round(recall_at_k(np.array(results), exact_ids), 4),
+        "p50_ms": round(float(np.percentile(timings, 50)), 4),
+        "p99_ms": round(float(np.percentile(timings, 99)), 4),
+        "build_seconds": round(build_seconds, 3),
+        "size_bytes": int(faiss.serialize_index(index).nbytes),
+    }
+
+
+def benchmark_corpus(name, corpus, k, num_queries, query_noise, rng) -> dict:
+    """Runs every configuration on one corpus against exact flat search."""
+    queries = make_queries(corpus, num_queries, query_noise, rng)
+    exact = faiss.IndexFlatIP(corpus.shape[1])
+    exact.add(corpus)
+    _, exact_ids = exact.search(queries, k)
+
+    report = {"corpus": name, "vectors": int(len(corpus)), "k": k, "queries": num_queries, "configurations": {}}
+    for label, index_type, build_options, search_settings in CONFIGURATIONS:
+        try:
+            report["configurations"][label] = benchmark_configuration(
+                corpus, queries, exact_ids, k, index_type, build_options, search_settings
+            )
+        except RuntimeError as e:  # e.g., too few vectors to train IVF-PQ
+            report["configurations"][label] = {"skipped": str(e).strip().splitlines()[-1]}
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{report['corpus']}: {report['vectors']} vectors, recall@{report['k']} over {report['queries']} queries")
+    print(f"{'configuration':<18}{'recall':>8}{'p50 ms':>10}{'p99 ms':>10}{'build s':>10}{'size KB':>12}")
+    for label, result in report["configurations"].items():
+        if "skipped" in result:
+            print(f"{label:<18}  skipped: {result['skipped']}")
+            continue
+        print(f"{label:<18}{result['recall_at_k']:>8.3f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{result['build_seconds']:>10.2f}{result['size_bytes'] / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flat, HNSW and IVF-PQ indexes on our embeddings.")
+    parser.add_argument("--corpus", action="append", default=None,
+                        help="Embedding directory with a root projects.index (repeatable)")
+    parser.add_argument("--scale", type=int, default=100, help="Synthetic corpus size as a multiple of the real one")
+    parser.add_argument("--noise", type=float, default=0.02, help="Per-dimension noise of synthetic vectors")
+    parser.add_argument("--query-noise", type=float, default=0.03, help="Per-dimension noise of query vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the full report to this path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+
+    reports = []
+    for source_dir in args.corpus or [SAMPLES_OUTPUT_DIR, PROJECTS_OUTPUT_DIR]:
+        if not os.path.exists(os.path.join(source_dir, INDEX_FILE)):
+            logger.warning(f"No {INDEX_FILE} in {source_dir}; skipping.")
+            continue
+        real = load_corpus_vectors(source_dir)
+        corpora = [(source_dir, real)]
+        if args.scale > 1:
+            corpora.append((f"{source_dir} x{args.scale}", perturb(real, args.scale, args.noise, rng)))
+        for name, corpus in corpora:
+            report = benchmark_corpus(name, corpus, args.k, args.queries, args.query_noise, rng)
+            print_report(report)
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0 if reports else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+title: Index Builder
+description: Offline builder for the embedding artifacts served by SemanticRetriever. It reads the repos and modules
+             metadata files and writes a FAISS index plus a row-keyed metadata.json per group, the same layout the
+             retriever walks at start-up. Every item carries a content hash over its title, description and
+             libraries; vectors for unchanged items are reused from the previous build, so only edited items go
+             through the encoder. Encoding runs in batches and reports throughput. A manifest.json with a
+             content version and file checksums is written last, which running retrievers watch to hot-reload.
+
+Usage:
+    python index_builder.py                 # incremental rebuild of both corpora
+    python index_builder.py --full          # ignore the embedding cache
+    python index_builder.py --only samples  # rebuild code samples only
+    python index_builder.py --layout consolidated  # single code index, no per-project copies
+    python index_builder.py --index-type hnsw --group-index-type small_repo=flat
+    python index_builder.py --index-type ivfpq --allow-flat-fallback  # small groups stay flat
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+
+import faiss
+import numpy as np
+
+from ann_index import INDEX_TYPES, build_index, index_type_of
+from encoder_registry import encoder_registry
+from semantic_retriever import file_sha256
+from metadata_store import METADATA_STORE_FILE, write_metadata_store, source_signature
+from git_api_utils import REPOS_METADATA_FILE, MODULES_METADATA_FILE, assign_item_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+PROJECTS_OUTPUT_DIR = os.getenv("PROJECTS_EMBEDDINGS_DIR", "new_project_embeddings")
+SAMPLES_OUTPUT_DIR = os.getenv("SAMPLES_EMBEDDINGS_DIR", "new_samples_embeddings")
+
+INDEX_FILE = "projects.index"
+METADATA_FILE = "metadata.json"
+CACHE_FILE = "embedding_cache.npz"
+GROUPS_FILE = "groups.json"
+MANIFEST_FILE = "manifest.json"
+
+# Fields that define what an item "means" to the encoder
+HASHED_FIELDS = ("title", "description", "libraries")
+
+
+#
+# (0) item text and content hash
+#
+def item_text(item):
+    """
+    Builds the text passed to the encoder for a project or a code sample.
+
+    Args:
+        item (dict): Project or module metadata.
+
+    Returns:
+        str: Title, description and (if any) libraries joined into a single passage.
+    """
+    parts = [item.get("title", ""), item.get("description", "")]
+    libraries = item.get("libraries") or []
+    if libraries:
+        parts.append("Libraries: " + ", ".join(libraries))
+    return ". ".join(part.strip() for part in parts if part and part.strip())
+
+
+def content_hash(item, model_name=DEFAULT_MODEL_NAME):
+    """
+    Returns a stable hash over the fields that feed the encoder.
+
+    The model name is part of the hash, so switching models invalidates every cached vector.
+    """
+    payload = {field: item.get(field) for field in HASHED_FIELDS}
+    payload["model_name"] = model_name
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+#
+# (1) embedding cache (content hash -> vector), one per output directory
+#
+def load_embedding_cache(output_dir, model_name):
+    """
+    Loads previously computed vectors keyed by content hash.
+
+    Returns:
+        dict: content hash -> float32 vector. Empty if there is no cache or it was built by another model.
+    """
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(cache_path):
+        return {}
+
+    with np.load(cache_path, allow_pickle=False) as cache:
+        if str(cache["model_name"]) != model_name:
+            logger.info(f"Embedding cache at {cache_path} was built with another model; ignoring it.")
+            return {}
+        return dict(zip(cache["hashes"].tolist(), cache["vectors"]))
+
+
+def save_embedding_cache(output_dir, model_name, hash_to_vector):
+    """Persists the content hash -> vector mapping next to the indexes it produced."""
+    hashes = sorted(hash_to_vector)
+    vectors = (
+        np.stack([hash_to_vector[h] for h in hashes]).astype("float32")
+        if hashes else np.zeros((0, 0), dtype="float32")
+    )
+    tmp_path = os.path.join(output_dir, CACHE_FILE + ".tmp.npz")
+    np.savez(tmp_path, model_name=np.array(model_name), hashes=np.array(hashes), vectors=vectors)
+    os.replace(tmp_path, os.path.join(output_dir, CACHE_FILE))
+
+
+#
+# (2) batched encoding
+#
+def encode_in_batches(texts, model_name=DEFAULT_MODEL_NAME, batch_size=32):
+    """
+    Encodes texts in batches with the shared encoder and logs throughput.
+
+    Returns:
+        tuple: (np.ndarray of normalized float32 vectors, stats dict with items, seconds and items_per_second)
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype="float32"), {"items": 0, "seconds": 0.0, "items_per_second": 0.0}
+
+    model = encoder_registry.get(model_name)
+    batches = []
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        batch = texts[offset: offset + batch_size]
+        batch_start = time.perf_counter()
+        batches.append(model.encode(batch, batch_size=batch_size, normalize_embeddings=True))
+        batch_seconds = time.perf_counter() - batch_start
+        logger.info(
+            f"Encoded batch {offset // batch_size + 1} ({len(batch)} items) "
+            f"at {len(batch) / max(batch_seconds, 1e-9):.1f} items/s"
+        )
+    seconds = time.perf_counter() - start
+
+    stats = {
+        "items": len(texts),
+        "seconds": round(seconds, 4),
+        "items_per_second": round(len(texts) / max(seconds, 1e-9), 2),
+    }
+    return np.vstack(batches).astype("float32"), stats
+
+
+def embed_items(items, cache, model_name=DEFAULT_MODEL_NAME, batch_size=32, full=False):
+    """
+    Returns one vector per item, encoding only items whose content hash is not cached.
+
+    Args:
+        items (list): Metadata dicts to embed.
+        cache (dict): content hash -> vector from the previous build.
+        full (bool): Re-encode everything, ignoring the cache.
+
+    Returns:
+        tuple: (np.ndarray of vectors aligned with `items`, the hash -> vector mapping for live items, stats dict)
+    """
+    hashes = [content_hash(item, model_name) for item in items]
+    text_by_hash = {h: item_text(item) for h, item in zip(hashes, items)}
+    missing = sorted(h for h in text_by_hash if full or h not in cache)
+
+    vectors, stats = encode_in_batches([text_by_hash[h] for h in missing], model_name, batch_size)
+    live_cache = {h: cache[h] for h in text_by_hash if h in cache and not full}
+    live_cache.update(zip(missing, vectors))
+
+    stats["encoded"] = len(missing)
+    stats["reused"] = len(text_by_hash) - len(missing)
+    if not items:
+        return np.zeros((0, 0), dtype="float32"), live_cache, stats
+    return np.stack([live_cache[h] for h in hashes]).astype("float32"), live_cache, stats
+
+
+#
+# (3) writers for the layout SemanticRetriever expects
+#
+def write_group(directory, items, vectors, index_type="flat", allow_fallback=False):
+    """
+    Writes `projects.index`, `metadata.json` and its columnar twin `metadata.store` (whose header
+    records the size and sha256 of that metadata.json) for one group.
+
+    Files are written to temporary names and swapped in with os.replace, so a reader never sees a
+    half-written index. `index_type` is one of ann_index.INDEX_TYPES and is built as asked unless
+    `allow_fallback` lets groups below ann_index.MIN_APPROXIMATE_ITEMS get a flat index instead.
+
+    Returns:
+        str: The index type actually built.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        index = build_index(vectors, index_type, allow_fallback=allow_fallback)
+    except RuntimeError as e:  # e.g. IVF-PQ cannot be trained on a single vector
+        raise ValueError(
+            f"{directory}: cannot build an index of type {index_type} over {len(vectors)} vectors; pass "
+            f"--group-index-type <group>=flat or --allow-flat-fallback"
+        ) from e
+    built_type = index_type_of(index)
+    if built_type != index_type:
+        logger.warning(f"{directory}: built a {built_type} index instead of {index_type} ({index.ntotal} vectors)")
+    logger.info(f"{directory}: {built_type} index over {index.ntotal} vectors")
+    index_tmp = os.path.join(directory, INDEX_FILE + ".tmp")
+    faiss.write_index(index, index_tmp)
+
+    metadata = {str(row): item for row, item in enumerate(items)}
+    metadata_bytes = json.dumps(metadata, indent=2).encode("utf-8")
+    metadata_tmp = os.path.join(directory, METADATA_FILE + ".tmp")
+    with open(metadata_tmp, "wb") as f:
+        f.write(metadata_bytes)
+
+    # The store records which metadata.json it mirrors, so readers can tell when the JSON was replaced
+    write_metadata_store(os.path.join(directory, METADATA_STORE_FILE), items, source_signature(metadata_bytes))
+    os.replace(index_tmp, os.path.join(directory, INDEX_FILE))
+    os.replace(metadata_tmp, os.path.join(directory, METADATA_FILE))
+    return built_type
+
+
+def remove_stale_groups(output_dir, live_groups):
+    """Deletes group directories left over from items that no longer exist."""
+    for entry in os.listdir(output_dir):
+        full_path = os.path.join(output_dir, entry)
+        if not os.path.isdir(full_path) or entry in live_groups:
+            continue
+        if os.path.exists(os.path.join(full_path, INDEX_FILE)):
+            logger.info(f"Removing stale group '{entry}' from {output_dir}")
+            shutil.rmtree(full_path)
+
+
+#
+# (4) corpus builders
+#
+def build_projects(repos_metadata, output_dir=PROJECTS_OUTPUT_DIR, model_name=DEFAULT_MODEL_NAME,
+                   batch_size=32, full=False, index_type="flat", allow_fallback=False):
+    """Builds the ungrouped project index (`<output_dir>/projects.index` + `metadata.json`)."""
+    os.makedirs(output_dir, exist_ok=True)
+    cache = load_embedding_cache(output_dir, model_name)
+    vectors, live_cache, stats = embed_items(repos_metadata, cache, model_name, batch_size, full)
+
+    index_types = {}
+    if repos_metadata:
+        index_types["."] = write_group(output_dir, repos_metadata, vectors, index_type, allow_fallback)
+
+    save_embedding_cache(output_dir, model_name, live_cache)
+    stats["index_types"] = index_types
+    stats["version"] = write_manifest(output_dir, model_name, index_types)
+    return stats
+
+
+def write_group_ranges(output_dir, groups, group_field="repo_name", index_types=None):
+    """
+    Writes `groups.json`: the [start, end) row range each group occupies in the root index, plus
+    the index type actually built for each group directory (if any).
+
+    A consolidated SemanticRetriever uses these ranges to restrict a search to one group.
+    """
+    ranges = {group: [rows[0], rows[-1] + 1] for group, rows in groups.items()}
+    tmp_path = os.path.join(output_dir, GROUPS_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"field": group_field, "groups": ranges, "index_types": index_types or {}}, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, GROUPS_FILE))
+
+
+def build_samples(modules_metadata, output_dir=SAMPLES_OUTPUT_DIR, model_name=DEFAULT_MODEL_NAME,
+                  batch_size=32, full=False, layout="grouped", index_type="flat", group_index_types=None,
+                  allow_fallback=False):
+    """
+    Builds a root index over every code sample and, in the "grouped" layout, one index per
+    `repo_name` group as well. Every index uses `index_type` unless `group_index_types` maps its
+    group to another type; with `allow_fallback`, groups too small for an approximate index get a
+    flat one. The types actually built are recorded in groups.json and the manifest.
+
+    Items are ordered by repo_name so each group occupies a contiguous block of the root index; the
+    blocks are recorded in groups.json. The "consolidated" layout keeps only the root index and
+    removes per-group directories, since their vectors would duplicate it.
+    """
+    if layout not in ("grouped", "consolidated"):
+        raise ValueError(f"Unknown layout '{layout}'. Use 'grouped' or 'consolidated'.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    items = sorted(modules_metadata, key=lambda item: item["repo_name"])
+
+    cache = load_embedding_cache(output_dir, model_name)
+    vectors, live_cache, stats = embed_items(items, cache, model_name, batch_size, full)
+
+    index_types = {}
+    if items:
+        index_types["."] = write_group(output_dir, items, vectors, index_type, allow_fallback)
+
+    groups = {}
+    for row, item in enumerate(items):
+        groups.setdefault(item["repo_name"], []).append(row)
+
+    if layout == "grouped":
+        for group, rows in groups.items():
+            group_type = (group_index_types or {}).get(group, index_type)
+            index_types[group] = write_group(
+                os.path.join(output_dir, group), [items[r] for r in rows], vectors[rows], group_type, allow_fallback
+            )
+        remove_stale_groups(output_dir, set(groups))
+    else:
+        remove_stale_groups(output_dir, set())
+    write_group_ranges(output_dir, groups, index_types=index_types)
+
+    save_embedding_cache(output_dir, model_name, live_cache)
+    stats["groups"] = len(groups)
+    stats["index_types"] = index_types
+    stats["version"] = write_manifest(output_dir, model_name, index_types)
+    return stats
+
+
+def write_manifest(output_dir, model_name=DEFAULT_MODEL_NAME, index_types=None):
+    """
+    Writes `manifest.json`: a content version plus the checksum of every index, metadata (JSON
+    and columnar) and groups file in `output_dir`, and the index type built per group directory
+    ("." for the root).
+
+    It is written last, after all other files are in place, so a running SemanticRetriever that
+    sees a new version can verify the files and swap them in. The version is derived from the
+    checksums, so a rebuild that changes nothing does not trigger a reload.
+    """
+    files = {}
+    for root, _, names in os.walk(output_dir):
+        for name in sorted(names):
+            if name in (INDEX_FILE, METADATA_FILE, METADATA_STORE_FILE, GROUPS_FILE):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, output_dir).replace(os.sep, "/")] = file_sha256(path)
+
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    manifest = {
+        "version": version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model_name": model_name,
+        "index_types": dict(sorted((index_types or {}).items())),
+        "files": dict(sorted(files.items())),
+    }
+    tmp_path = os.path.join(output_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILE))
+    return version
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FAISS indexes served by SemanticRetriever.")
+    parser.add_argument("--repos", default=REPOS_METADATA_FILE, help="Path to repos_metadata.json")
+    parser.add_argument("--modules", default=MODULES_METADATA_FILE, help="Path to modules_metadata.json")
+    parser.add_argument("--projects-dir", default=PROJECTS_OUTPUT_DIR)
+    parser.add_argument("--samples-dir", default=SAMPLES_OUTPUT_DIR)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--full", action="store_true", help="Re-embed every item, ignoring cached vectors")
+    parser.add_argument("--only", choices=["projects", "samples"], help="Rebuild a single corpus")
+    parser.add_argument("--layout", choices=["grouped", "consolidated"], default="grouped",
+                        help="Code samples: one index per project, or a single index with group ranges")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                        help="FAISS index type, built for every group regardless of its size")
+    parser.add_argument("--allow-flat-fallback", action="store_true",
+                        help="Build flat indexes for groups too small for an approximate index")
+    parser.add_argument("--group-index-type", action="append", default=[], metavar="GROUP=TYPE",
+                        help="Index type for one code-sample group (repeatable)")
+    args = parser.parse_args()
+
+    group_index_types = {}
+    for assignment in args.group_index_type:
+        group, _, group_type = assignment.partition("=")
+        if group_type not in INDEX_TYPES:
+            parser.error(f"--group-index-type {assignment}: type must be one of {list(INDEX_TYPES)}")
+        group_index_types[group] = group_type
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.only in (None, "projects"):
+        # Retriever payloads carry the same stable ids as the metadata files
+        repos_metadata = assign_item_ids(_load_json(args.repos), 'repos')
+        stats = build_projects(
+            repos_metadata, args.projects_dir, args.model, args.batch_size, args.full, args.index_type,
+            args.allow_flat_fallback
+        )
+        print(f"projects: {json.dumps(stats)}")
+
+    if args.only in (None, "samples"):
+        modules_metadata = assign_item_ids(_load_json(args.modules), 'modules')
+        stats = build_samples(
+            modules_metadata, args.samples_dir, args.model, args.batch_size, args.full, args.layout,
+            args.index_type, group_index_types, args.allow_flat_fallback
+        )
+        print(f"samples: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+title: Lexical Index
+description: A small BM25 inverted index over module metadata (titles, descriptions and library names), built once
+             and queried without scanning every item. It complements the dense SemanticRetriever: exact library
+             names such as "ggplot2" or "pyspark" score sharply here, while paraphrased requirements are better
+             served by embeddings. Reciprocal rank fusion merges both rankings into a single hybrid list.
+"""
+
+import re
+import math
+import bisect
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Field weights: a term in a title or a library name says more than one in a long description
+DEFAULT_FIELD_WEIGHTS = {"title": 2.0, "description": 1.0, "libraries": 3.0}
+
+# Query terms also match longer vocabulary terms they prefix ("forecast" -> "forecasting"),
+# at a discount so exact matches still rank first
+MIN_PREFIX_LENGTH = 6
+PREFIX_MATCH_WEIGHT = 0.5
+
+# Query words too common to make a document a match on their own
+STOPWORDS = frozenset("""
+    a an and are as at be by can do does for from how i in into is it its me my of on or our so that the their
+    then this to us was we what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercases text and splits it into word tokens."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class BM25Index:
+    """
+    BM25 scoring over an inverted index of weighted metadata fields.
+
+    Documents are referenced by their position in the list given at construction time.
+    """
+
+    def __init__(self, documents: list, field_weights: dict = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            documents (list): Metadata dicts to index.
+            field_weights (dict, optional): Field name -> term frequency multiplier.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalization.
+        """
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.k1 = k1
+        self.b = b
+        self.num_documents = len(documents)
+
+        self.postings = defaultdict(list)  # term -> [(doc_id, weighted tf)]
+        self.doc_lengths = []
+        for doc_id, document in enumerate(documents):
+            term_frequencies = Counter()
+            for field, weight in self.field_weights.items():
+                value = document.get(field) or ""
+                values = value if isinstance(value, list) else [value]
+                for text in values:
+                    for token in tokenize(text):
+                        term_frequencies[token] += weight
+            self.doc_lengths.append(sum(term_frequencies.values()))
+            for term, frequency in term_frequencies.items():
+                self.postings[term].append((doc_id, frequency))
+
+        self.average_length = (sum(self.doc_lengths) / self.num_documents) if self.num_documents else 0.0
+        self.idf = {
+            term: math.log(1 + (self.num_documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+        # Length normalization depends only on the document, so it is computed once
+        self.doc_norms = [
+            self.k1 * (1 - self.b + self.b * length / self.average_length) if self.average_length else self.k1
+            for length in self.doc_lengths
+        ]
+
+    def _expand(self, token: str) -> list:
+        """Returns (term, weight) pairs a query token matches: itself plus longer terms it prefixes."""
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_right(self.vocabulary, token)
+            end = bisect.bisect_left(self.vocabulary, token + "\uffff")
+            matches.extend((term, PREFIX_MATCH_WEIGHT) for term in self.vocabulary[start:end])
+        return matches
+
+    def search(self, query: str, top_k: int = None, candidates=None) -> list:
+        """
+        Scores documents containing at least one query term (stopwords aside).
+
+        Args:
+            query (str): Free-text query.
+            top_k (int, optional): Maximum number of hits to return.
+            candidates (set, optional): Document ids allowed in the result (e.g., one project).
+
+        Returns:
+            list: (doc_id, score) pairs sorted by descending score.
+        """
+        scores = defaultdict(float)
+        for token in set(tokenize(query)) - STOPWORDS:
+            for term, match_weight in self._expand(token):
+                idf = self.idf[term]
+                for doc_id, frequency in self.postings[term]:
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    scores[doc_id] += (
+                        match_weight * idf * frequency * (self.k1 + 1) / (frequency + self.doc_norms[doc_id])
+                    )
+
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:top_k] if top_k else ranked
+
+
+def reciprocal_rank_fusion(*rankings, k: int = 60) -> list:
+    """
+    Merges several rankings of the same keys with reciprocal rank fusion.
+
+    Args:
+        rankings: Lists of keys, best first.
+        k (int): Damping constant; larger values flatten the contribution of top ranks.
+
+    Returns:
+        list: (key, fused score) pairs sorted by descending score.
+    """
+    fused = defaultdict(float)
+    first_seen = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            fused[key] += 1.0 / (k + rank + 1)
+            first_seen.setdefault(key, len(first_seen))
+    return sorted(fused.items(), key=lambda pair: (-pair[1], first_seen[pair[0]]))
@@ -4,6 +4,7 @@ import streamlit as st
 import time
 import json
 import streamlit.components.v1 as components
+from render_metrics import emit
 
 
 class MediaCarousel:
@@ -87,19 +88,19 @@ class MediaCarousel:
         # Render image or video
         if ext in ['.jpg', '.jpeg', '.png', '.gif']:
             # Render image with aspect ratio preserved
-            img = st.image(media_path, use_container_width=True)
+            img = st.image(emit("image", media_path), use_container_width=True)
             if caption:
-                st.markdown(f"<p style='font-size: 12px; color: #888;'>{caption}</p>", unsafe_allow_html=True)
+                st.markdown(emit("markdown", f"<p style='font-size: 12px; color: #888;'>{caption}</p>"), unsafe_allow_html=True)
         elif ext in ['.mp4', '.avi']:
             # Render video with autoplay, muted, and looping
-            video = st.video(media_path, loop=True, autoplay=True, muted=True)
+            video = st.video(emit("video", media_path), loop=True, autoplay=True, muted=True)
             if caption:
-                st.markdown(f"<p style='font-size: 12px; color: #888;'>{caption}</p>", unsafe_allow_html=True)
+                st.markdown(emit("markdown", f"<p style='font-size: 12px; color: #888;'>{caption}</p>"), unsafe_allow_html=True)
         elif ext == '.html':
             # Render HTML content with embedded JavaScript or dynamic elements
             with open(media_path, 'r') as file:
                 html_content = file.read()
-            components.html(html_content, height=600)  # Use the correct call
+            components.html(emit("html", html_content), height=600)  # Use the correct call
         else:
             # Fallback: Display the file path if unsupported format
             return st.write(media_path)
@@ -116,7 +117,7 @@ class MediaCarousel:
         self.parse_media(self.media_content[self.index])
         
         # Custom CSS to style the buttons and center them vertically
-        st.markdown("""
+        st.markdown(emit("markdown", """
             <style>
             .stButton>button {
                 background-color: #e0e0e0;
@@ -138,7 +139,7 @@ class MediaCarousel:
                 height: 100%;
             }
             </style>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
         
         # Navigation buttons with centered alignment
         col1, col2 = st.columns([1, 1])
@@ -209,21 +210,21 @@ class MediaCarousel:
         caption = self.get_caption(media_path)
 
         if ext in ['.jpg', '.jpeg', '.png', '.gif']:
-            st.image(media_path, use_container_width=True)
+            st.image(emit("image", media_path), use_container_width=True)
         elif ext in ['.mp4', '.avi']:
-            st.video(media_path, loop=True, autoplay=True, muted=True)
+            st.video(emit("video", media_path), loop=True, autoplay=True, muted=True)
         elif ext == '.html':
             with open(media_path, 'r') as file:
-                components.html(file.read(), height=600)
+                components.html(emit("html", file.read()), height=600)
         else:
             st.write(media_path)
 
         if caption:
-            st.markdown(f"<p style='font-size: 12px; color: #888;'>{caption}</p>", unsafe_allow_html=True)
+            st.markdown(emit("markdown", f"<p style='font-size: 12px; color: #888;'>{caption}</p>"), unsafe_allow_html=True)
 
     def render(self):
         """Displays the media carousel and navigation buttons."""
-        st.markdown(f"<p style='font-size: 16px; text-align: center; font-weight: bold;'>Item {self.index + 1} of {len(self.media_content)}</p>", unsafe_allow_html=True)
+        st.markdown(emit("markdown", f"<p style='font-size: 16px; text-align: center; font-weight: bold;'>Item {self.index + 1} of {len(self.media_content)}</p>"), unsafe_allow_html=True)
 
         # Display media content
         self.parse_media(self.media_content[self.index])
@@ -242,7 +243,7 @@ class MediaCarousel:
 import os
 import base64
 import imgkit
-from datetime import datetime
+from html_fragments import stable_id
 
 def html_to_png(html_path):
     """Converts an HTML file to a PNG using imgkit."""
@@ -273,8 +274,8 @@ def html_for_media_carousel(media_items, container_id="media-container", duratio
     # Limit to 10 media items for safety
     media_items = media_items[:10]
 
-    # Unique ID for CSS isolation
-    unique_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    # Unique ID for CSS isolation, stable across reruns
+    unique_id = stable_id(container_id, *(item['src'] for item in media_items))
 
     for item in media_items:
         ext = os.path.splitext(item['src'])[-1].lower()
@@ -14,7 +14,6 @@ import glob
 import re
 import os
 import base64
-import hashlib
 import time
 
 # Global configuration for valid media files
@@ -123,23 +122,36 @@ def html_to_base64(file_path):
 # (1)
 #
 import os
-import hashlib
-import datetime
+from html_fragments import html_fragment_cache, stable_id, content_hash, files_signature
 
-def html_for_media_carousel(media_items, container_id="media-container", duration=5):
+def html_for_media_carousel(media_items, container_id="media-container", duration=5, cache=True):
     """
     Generates an HTML snippet for a media carousel that supports images and HTML files.
 
+    The files are inlined as base64, so the result is memoized by the media list and the size and
+    modification time of each file.
+
     :param media_items: List of dictionaries with media properties (src, alt).
     :param container_id: Unique ID for the media container.
     :param duration: Duration (in seconds) for each media transition.
+    :param cache: False skips the memo, for callers that cache the HTML embedding the carousel.
     :return: HTML string for the media display.
     """
+    if not cache:
+        return _html_for_media_carousel(media_items, container_id, duration)
+    key = content_hash(media_items, container_id, duration, files_signature(item["src"] for item in media_items or []))
+    return html_fragment_cache.get_or_render(
+        "media_carousel", key, lambda: _html_for_media_carousel(media_items, container_id, duration)
+    )
+
+def _html_for_media_carousel(media_items, container_id, duration):
+    """Builds the carousel HTML (see html_for_media_carousel)."""
     if not media_items:
         return "<p>No media available</p>"
 
     media_items = media_items[:10]  # Limit to 10 items for safety
-    unique_id = hashlib.md5(str(datetime.datetime.now()).encode()).hexdigest()[:6]
+    # Derived from the media list, so the same carousel renders to identical HTML on every rerun
+    unique_id = stable_id(container_id, *(item["src"] for item in media_items), length=6)
     
     media_html = []
     for i, item in enumerate(media_items):
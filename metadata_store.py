@@ -0,0 +1,252 @@
+"""
+title: Metadata Store
+description: A compact, columnar, read-only store for retriever payloads, written next to each group's
+             metadata.json. Every field is a column of row-aligned arrays: low-cardinality strings (repo names,
+             dates, authors) are interned into a small dictionary plus int32 codes, other strings are one UTF-8
+             blob with row offsets, and non-string values are stored as JSON text. The file is memory-mapped and
+             the arrays are zero-copy views, so a process only decodes the rows (and fields) it actually returns.
+             MetadataStore behaves like the {"row": item} dict it replaces. The header records the size and sha256
+             of the metadata.json the store was built with, so a stale store is detected without hashing it.
+
+File layout:
+    b"PFMETA1\\n" | uint64 header length | JSON header | 8-byte aligned column arrays
+"""
+
+import os
+import json
+import hashlib
+import logging
+from collections.abc import Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PFMETA1\n"
+METADATA_STORE_FILE = "metadata.store"
+
+# A string column is dictionary-encoded when it has at most this share of distinct values
+INTERN_MAX_DISTINCT_RATIO = 0.5
+
+MISSING_CODE = -1
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _encode_column(values: list):
+    """
+    Chooses an encoding for one column.
+
+    Returns:
+        tuple: (header entry, list of numpy arrays to append in order).
+    """
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, str) for value in present):
+        distinct = sorted(set(present))
+        if len(distinct) <= max(1, INTERN_MAX_DISTINCT_RATIO * len(values)):
+            lookup = {value: code for code, value in enumerate(distinct)}
+            codes = np.array([lookup[v] if v is not None else MISSING_CODE for v in values], dtype="int32")
+            return {"kind": "interned", "values": distinct}, [codes]
+        kind, encoded = "str", [v.encode("utf-8") if v is not None else None for v in values]
+    else:
+        kind = "json"
+        encoded = [json.dumps(v, ensure_ascii=False).encode("utf-8") if v is not None else None for v in values]
+
+    offsets = np.zeros(len(values) + 1, dtype="uint64")
+    missing = np.zeros(len(values), dtype="uint8")
+    for row, blob in enumerate(encoded):
+        missing[row] = blob is None
+        offsets[row + 1] = offsets[row] + (len(blob) if blob is not None else 0)
+    data = np.frombuffer(b"".join(blob for blob in encoded if blob is not None), dtype="uint8")
+    return {"kind": kind}, [offsets, missing, data]
+
+
+def source_signature(data: bytes) -> dict:
+    """Size and sha256 of a serialized metadata.json, as recorded in a store header."""
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def write_metadata_store(path: str, items: list, source: dict = None):
+    """
+    Writes `items` (row i = items[i]) as a columnar store at `path`, atomically.
+
+    Field order is preserved: columns follow the order in which fields first appear, and each row
+    is rebuilt with its fields in that order. `source` (see `source_signature`) identifies the
+    metadata.json written alongside, for `store_is_current`.
+    """
+    fields = list(dict.fromkeys(field for item in items for field in item))
+    header = {"rows": len(items), "fields": fields, "columns": {}}
+    if source is not None:
+        header["source"] = source
+    arrays = []
+    for field in fields:
+        # A field missing from an item is stored as missing, distinct from an explicit null
+        values = [item.get(field) for item in items]
+        entry, column_arrays = _encode_column(values)
+        explicit_nulls = [row for row, item in enumerate(items) if field in item and item[field] is None]
+        if explicit_nulls:
+            entry["nulls"] = explicit_nulls
+        header["columns"][field] = entry
+        arrays.append((field, entry, column_arrays))
+
+    # Array offsets are relative to the first aligned byte after the header
+    relative, position = [], 0
+    for field, entry, column_arrays in arrays:
+        entry["arrays"] = []
+        for array in column_arrays:
+            position = _align(position)
+            entry["arrays"].append([position, array.dtype.str, int(array.size)])
+            relative.append((position, array))
+            position += array.nbytes
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for offset, array in relative:
+            f.seek(data_start + offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + _align(position))  # Trailing empty arrays still lie inside the file
+    os.replace(tmp_path, path)
+
+
+class MetadataStore(Mapping):
+    """
+    Read-only view of a metadata store, keyed like metadata.json by stringified row number.
+
+    Indexing decodes a single row; `column` and `row(..., fields=...)` decode even less.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = np.memmap(path, dtype="uint8", mode="r")
+        if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a metadata store.")
+        header_length = int(np.frombuffer(self._buffer, dtype="uint64", count=1, offset=len(MAGIC))[0])
+        header_start = len(MAGIC) + 8
+        header = json.loads(bytes(self._buffer[header_start:header_start + header_length]).decode("utf-8"))
+        data_start = _align(header_start + header_length)
+
+        self.num_rows = header["rows"]
+        self.fields = header["fields"]
+        self.source = header.get("source")
+        self._columns = {}
+        for field, entry in header["columns"].items():
+            views = [
+                np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+                for offset, dtype, count in entry["arrays"]
+            ]
+            self._columns[field] = (entry["kind"], entry, views, set(entry.get("nulls", ())))
+
+    def _value(self, field: str, row: int):
+        """Returns (present, value) for one cell."""
+        kind, entry, views, nulls = self._columns[field]
+        if row in nulls:
+            return True, None
+        if kind == "interned":
+            code = int(views[0][row])
+            return (False, None) if code == MISSING_CODE else (True, entry["values"][code])
+        offsets, missing, data = views
+        if missing[row]:
+            return False, None
+        text = bytes(data[int(offsets[row]):int(offsets[row + 1])]).decode("utf-8")
+        return True, (text if kind == "str" else json.loads(text))
+
+    def row(self, row: int, fields=None) -> dict:
+        """Decodes one row, optionally only some of its fields."""
+        if not 0 <= row < self.num_rows:
+            raise IndexError(f"Row {row} out of range for {self.num_rows} rows.")
+        item = {}
+        for field in fields or self.fields:
+            if field in self._columns:
+                present, value = self._value(field, row)
+                if present:
+                    item[field] = value
+        return item
+
+    def column(self, field: str) -> list:
+        """Every value of one field (None where missing)."""
+        if field not in self._columns:
+            return [None] * self.num_rows
+        return [self._value(field, row)[1] for row in range(self.num_rows)]
+
+    #
+    # Mapping interface: {"0": item, "1": item, ...}
+    #
+    def __getitem__(self, key) -> dict:
+        try:
+            row = int(key)
+        except (TypeError, ValueError):
+            raise KeyError(key)
+        if not 0 <= row < self.num_rows:
+            raise KeyError(key)
+        return self.row(row)
+
+    def __iter__(self):
+        return (str(row) for row in range(self.num_rows))
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_store_header(path: str) -> dict:
+    """Parses only the JSON header of a store, without mapping its arrays."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a metadata store.")
+        header_length = int(np.frombuffer(f.read(8), dtype="uint64")[0])
+        return json.loads(f.read(header_length).decode("utf-8"))
+
+
+def store_is_current(store_path: str, metadata_path: str) -> bool:
+    """
+    Whether the metadata.store at `store_path` holds the same payloads as `metadata_path`.
+
+    The store header records the size and sha256 of the metadata.json it was built with. The sizes
+    are compared first, so most edits are caught with a stat; only then is the JSON hashed (never
+    the store). File times play no part, since a git checkout or copy sets them arbitrarily. A
+    store without that record (built before it existed) is not trusted.
+    """
+    if not os.path.exists(store_path):
+        return False
+    try:
+        source = read_store_header(store_path).get("source")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read {store_path}: {e}")
+        return False
+    if not source:
+        return False
+    if os.path.getsize(metadata_path) != source["size"]:
+        return False
+    return _sha256(metadata_path) == source["sha256"]
+
+
+def load_metadata(metadata_path: str):
+    """
+    Loads a group's payloads: the metadata.store next to `metadata_path` when it is current (see
+    `store_is_current`), otherwise the metadata.json itself.
+
+    Args:
+        metadata_path (str): Path of the group's metadata.json.
+    """
+    store_path = os.path.join(os.path.dirname(metadata_path), METADATA_STORE_FILE)
+    if store_is_current(store_path, metadata_path):
+        return MetadataStore(store_path)
+    if os.path.exists(store_path):
+        logger.warning(f"{store_path} is out of date with {metadata_path}; reading the JSON instead.")
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -6,6 +6,7 @@ portfolio sections, such as housekeeping messages.
 """
 
 import streamlit as st
+from render_metrics import emit, instrumented_render
 
 class PortfolioSection:
     """
@@ -33,7 +34,7 @@ class PortfolioSection:
         Renders the given title with a row of badges below it.
         Uses instance attributes instead of class attributes.
         """
-        st.markdown(f"### {self.title}", unsafe_allow_html=True)
+        st.markdown(emit("markdown", f"### {self.title}"), unsafe_allow_html=True)
 
         def _create_badge(text, color, emoji, tooltip):
             return (
@@ -57,17 +58,17 @@ class PortfolioSection:
 
         if badges:
             st.markdown(
-                f'<div style="display: flex; gap: {spacing}px; margin-top: -5px; align-items: center;">' +
-                "".join(badges) +
-                "</div>",
+                emit("markdown", f'<div style="display: flex; gap: {spacing}px; margin-top: -5px; align-items: center;">' +
+                                 "".join(badges) +
+                                 "</div>"),
                 unsafe_allow_html=True
             )
         
     def _render_headers(self):
         """Render the section title and associated badges."""
         self._render_title_with_badges()
-        st.markdown("---")
-        st.markdown(f'<p style="{self.DESCRIPTION_STYLE}">{self.description}</p>', unsafe_allow_html=True)
+        st.markdown(emit("markdown", "---"))
+        st.markdown(emit("markdown", f'<p style="{self.DESCRIPTION_STYLE}">{self.description}</p>'), unsafe_allow_html=True)
 
     def _render_messages(self):
         """Render housekeeping messages, now replaced by badges."""
@@ -76,6 +77,7 @@ class PortfolioSection:
         if not self.verified:
             st.info("🤖 This section is still being reviewed and may contain AI-generated or placeholder data.")
 
+    @instrumented_render
     def render(self):
         """Render the section, now using badges for information."""
         self._render_headers()
@@ -85,7 +87,7 @@ class PortfolioSection:
         Renders the given title with a row of badges below it.
         Uses instance attributes instead of class attributes.
         """
-        st.markdown(f"### {self.title}", unsafe_allow_html=True)
+        st.markdown(emit("markdown", f"### {self.title}"), unsafe_allow_html=True)
         #return 
         badge_html_template = """
             <span style="font-size: 0.8em; background: {bg_color}; color: {text_color}; 
@@ -122,4 +124,4 @@ class PortfolioSection:
                 {''.join(badges)}
             </div>
             """
-            st.markdown(full_html, unsafe_allow_html=True)
+            st.markdown(emit("markdown", full_html), unsafe_allow_html=True)
@@ -18,6 +18,7 @@ from cv_data_loader import (
 from front_end_utils import tags_in_twitter_style
 from portfolio_section import PortfolioSection
 from expandable_text import expandable_text_html
+from render_metrics import emit, instrumented_render
 #from url_as_tooltip import _url_as_tooltip_html
 
 class CurriculumVitae(PortfolioSection):
@@ -50,15 +51,16 @@ class CurriculumVitae(PortfolioSection):
     My recurring interest nevertheless has always been the **modernization** of the **data analysis pipeline** through **cutting-edge techniques**, such as **flexible ML-based inference**, **software and algorithmic automation**, **assimilation of data-related technology**, using **NLP** in **latent semantic spaces**, and, more recently, solving **data analysis tasks** through **agency formation** within **LLM applications**.
     """
 
+    @instrumented_render
     def render(self):
         self._render_headers()
-        st.markdown(f'{self.MAIN_STATEMENT}', unsafe_allow_html=True)
+        st.markdown(emit("markdown", f'{self.MAIN_STATEMENT}'), unsafe_allow_html=True)
         self._render_experience()
         self._render_education()
 
 
     def _render_experience(self):
-        st.markdown("#### Work Experience 🔧")
+        st.markdown(emit("markdown", "#### Work Experience 🔧"))
     
         hide_freelance = st.checkbox("Hide freelance work", value=False)
     
@@ -73,7 +75,7 @@ class CurriculumVitae(PortfolioSection):
             display_shadow_color = self.SHADOW_CURRENT_CIRCLE_COLOR if is_current_job else self.SHADOW_CIRCLE_COLOR
             date_range_str = f"{format_date_for_frontend(start_date)} - {format_date_for_frontend(end_date)}"
     
-            st.markdown(f"""<div style='margin-bottom: 0.5rem; display: flex; align-items: flex-start;'>
+            st.markdown(emit("markdown", f"""<div style='margin-bottom: 0.5rem; display: flex; align-items: flex-start;'>
                 <div style='
                     width: 16px; height: 16px; border: 4px solid {display_circle_color}; 
                     border-radius: 50%; box-shadow: 0 0 10px {display_shadow_color}; 
@@ -87,10 +89,10 @@ class CurriculumVitae(PortfolioSection):
                     <p>{experience['description']}</p>
                     <p style='font-style: italic;'>{date_range_str}</p>
                 </div>
-            </div>""", unsafe_allow_html=True)
+            </div>"""), unsafe_allow_html=True)
           
     def _render_education(self):
-        st.markdown("#### Education 🎓")
+        st.markdown(emit("markdown", "#### Education 🎓"))
         
         accumulated_styles = ""  # Collect styles here
         
@@ -113,7 +115,7 @@ class CurriculumVitae(PortfolioSection):
             #    institution_html = f"<em>{institution}</em>"
     
             # Full component
-            st.markdown(f"""<div style='margin-bottom: 0.5rem; display: flex; align-items: flex-start;'>
+            st.markdown(emit("markdown", f"""<div style='margin-bottom: 0.5rem; display: flex; align-items: flex-start;'>
                 <div style='
                     width: 16px; height: 16px; border: 4px solid {self.CIRCLE_COLOR}; 
                     border-radius: 50%; box-shadow: 0 0 10px {self.SHADOW_CIRCLE_COLOR}; 
@@ -127,11 +129,11 @@ class CurriculumVitae(PortfolioSection):
                     {edu_text}
                     <p style='font-style: italic;'>{date_range_str}</p>
                 </div>
-            </div>""", unsafe_allow_html=True)
+            </div>"""), unsafe_allow_html=True)
     
         # Inject accumulated styles once at the end
         if accumulated_styles:
-            st.markdown(f"<style>{accumulated_styles}</style>", unsafe_allow_html=True)
+            st.markdown(emit("markdown", f"<style>{accumulated_styles}</style>"), unsafe_allow_html=True)
 
 
 
@@ -44,42 +44,154 @@ Usage Example:
 Author: Your Name
 """
 
+import os
 import re
+import logging
+import threading
+from collections import OrderedDict
+
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import json
+from encoder_backends import encoder_key
+from encoder_registry import encoder_registry
+from query_cache import get_query_cache
+from metadata_store import load_metadata
 from typing import Optional, Dict, List
 
+logger = logging.getLogger(__name__)
+
+FILTER_STRATEGIES = ("prefilter", "overfetch")
+# First over-fetch round asks for this many times top_k neighbours
+OVERFETCH_FACTOR = 4
+# Distinct filters whose allowed-id sets are kept (least recently used ones are dropped first)
+FILTER_CACHE_SIZE = int(os.getenv("RETRIEVER_FILTER_CACHE_SIZE", "128"))
+
 class SemanticRetriever:
-    def __init__(self, index_path: str, metadata_path: str, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, index_path: str, metadata_path: str, model_name: str = "all-MiniLM-L6-v2", query_cache=None,
+                 backend: str = None, filter_strategy: str = "prefilter", filter_cache_size: int = FILTER_CACHE_SIZE):
         """
         Initializes the semantic retriever.
 
         Args:
             index_path (str): Path to the FAISS index file.
-            metadata_path (str): Path to the JSON file containing item metadata.
-            model_name (str): Name of the sentence-transformers model to use.
+            metadata_path (str): Path to the JSON file containing item metadata. A columnar
+                                 metadata.store in the same directory is used instead when present.
+            model_name (str): Name of the sentence-transformers model to use. The encoder is
+                              shared process-wide and only loaded on the first query.
+            query_cache (QueryEmbeddingCache, optional): Cache for query vectors. Defaults to the
+                              shared two-tier cache for this encoder; pass False to disable caching.
+            backend (str, optional): Encoder backend: "torch" (sentence-transformers), "onnx" or
+                              "onnx-int8" (ONNX Runtime, no torch import). Defaults to the ENCODER_BACKEND
+                              environment variable.
+            filter_strategy (str): How `filtering_query` is applied: "prefilter" searches only the ids
+                              that pass the filter; "overfetch" widens k until enough neighbours pass it.
+            filter_cache_size (int): Distinct filters whose allowed-id sets are cached.
         """
+        if filter_strategy not in FILTER_STRATEGIES:
+            raise ValueError(f"Unknown filter strategy '{filter_strategy}'. Use one of {list(FILTER_STRATEGIES)}.")
         self.index = faiss.read_index(index_path)
-        self.model = SentenceTransformer(model_name)
-        with open(metadata_path, "r", encoding="utf-8") as f:
-            self.metadata = json.load(f)
+        self.model_name = model_name
+        self.backend = backend
+        # Vectors from different backends differ slightly, so each backend gets its own cache
+        self.query_cache = get_query_cache(encoder_key(model_name, backend)) if query_cache is None else query_cache
+        self.metadata = load_metadata(metadata_path)
+        self.filter_strategy = filter_strategy
+        self.filter_cache_size = filter_cache_size
+        self._filter_cache = OrderedDict()
+        self._filter_cache_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The shared query encoder, loaded on first access."""
+        return encoder_registry.get(self.model_name, self.backend)
 
     def embed_query(self, text: str) -> np.ndarray:
         """
         Encodes a query string into a normalized vector.
 
+        Repeated queries are served from the query cache instead of re-running the encoder.
+
         Args:
             text (str): The user query.
 
         Returns:
             np.ndarray: A 1xD float32 array representing the query embedding.
         """
+        if not self.query_cache:
+            return self._encode(text)
+        return self.query_cache.get_or_compute(text, self._encode).reshape(1, -1)
+
+    def _encode(self, text: str) -> np.ndarray:
+        """Runs the encoder on a single query."""
         embedding = self.model.encode([text], normalize_embeddings=True)
         return embedding.astype("float32")
 
 
+    def _compile_filters(self, filtering_query: Dict[str, str]) -> tuple:
+        """Precompiles a filter dict into a hashable tuple of (field, compiled regex) predicates."""
+        return tuple((key, re.compile(pattern)) for key, pattern in sorted(filtering_query.items()))
+
+    @staticmethod
+    def _matches(item: dict, predicates: tuple) -> bool:
+        return all(pattern.search(str(item.get(key, ""))) for key, pattern in predicates)
+
+    def _allowed_ids(self, predicates: tuple, stats: dict) -> np.ndarray:
+        """
+        Ids of the items satisfying every predicate, evaluated once per distinct filter.
+
+        Metadata is fixed for the lifetime of the retriever, so the id set (and the FAISS selector
+        built from it) are cached by filter, keeping the `filter_cache_size` most recent filters.
+        """
+        with self._filter_cache_lock:
+            cached = self._filter_cache.get(predicates)
+            if cached is not None:
+                self._filter_cache.move_to_end(predicates)
+                return cached
+
+        ids = np.array(
+            sorted(int(row) for row, item in self.metadata.items() if self._matches(item, predicates)),
+            dtype="int64"
+        )
+        selector = faiss.IDSelectorBatch(ids) if ids.size else None
+        cached = (ids, selector)
+        stats["predicate_evaluations"] = len(self.metadata)
+        with self._filter_cache_lock:
+            self._filter_cache[predicates] = cached
+            while len(self._filter_cache) > self.filter_cache_size:
+                self._filter_cache.popitem(last=False)
+        return cached
+
+    def _prefiltered_search(self, query_vector: np.ndarray, top_k: int, predicates: tuple, stats: dict) -> list:
+        """Restricts the ANN search to the allowed-id set with an ID selector."""
+        ids, selector = self._allowed_ids(predicates, stats)
+        stats.update(allowed=int(ids.size), candidates_scanned=int(ids.size))
+        if selector is None:
+            return []
+        params = faiss.SearchParameters(sel=selector)
+        _, indices = self.index.search(query_vector, min(top_k, int(ids.size)), params=params)
+        return [self.metadata[str(idx)] for idx in indices[0] if idx >= 0]
+
+    def _overfetch_search(self, query_vector: np.ndarray, top_k: int, predicates: tuple, stats: dict) -> list:
+        """
+        Searches unfiltered and applies the predicates afterwards, doubling k until `top_k` items
+        survive or the whole index has been fetched.
+        """
+        k = min(top_k * OVERFETCH_FACTOR, self.index.ntotal)
+        rounds = 0
+        while True:
+            rounds += 1
+            _, indices = self.index.search(query_vector, k)
+            stats["predicate_evaluations"] += int(k)
+            results = [
+                item for item in (self.metadata.get(str(idx)) for idx in indices[0] if idx >= 0)
+                if item is not None and self._matches(item, predicates)
+            ]
+            if len(results) >= top_k or k >= self.index.ntotal:
+                break
+            k = min(k * 2, self.index.ntotal)
+        stats.update(candidates_scanned=int(k), rounds=rounds)
+        return results[:top_k]
+
     def search(self, query: str, top_k: int = 5, filtering_query: Optional[Dict[str, str]] = None) -> List[dict]:
         """
         Searches for top-k items most similar to the input query and optionally filters results.
@@ -93,22 +205,41 @@ class SemanticRetriever:
         Returns:
             list: A list of metadata dicts matching the query and filters.
         """
-        query_vector = self.embed_query(query)
-        distances, indices = self.index.search(query_vector, top_k)
-
-        results = []
-        for idx in indices[0]:
-            item = self.metadata.get(str(idx), {})
+        return self.search_with_stats(query, top_k, filtering_query)[0]
 
-            if filtering_query:
-                # Apply regex-based filtering on item fields
-                match = all(
-                    re.search(pattern, str(item.get(key, "")))
-                    for key, pattern in filtering_query.items()
-                )
-                if not match:
-                    continue
+    def search_with_stats(self, query: str, top_k: int = 5,
+                          filtering_query: Optional[Dict[str, str]] = None) -> tuple:
+        """
+        Same as `search`, also returning the cost of this call.
 
-            results.append(item)
+        Filters are applied before ranking, so a selective filter still returns up to `top_k`
+        matches: either by restricting the search to the ids that pass the filter ("prefilter") or
+        by widening k until enough neighbours pass it ("overfetch"). The stats are built per call,
+        so concurrent searches never overwrite each other's.
 
-        return results
+        Returns:
+            tuple: (results, stats) where stats holds the strategy used, the predicate evaluations,
+            the candidates scanned and the number of results returned.
+        """
+        query_vector = self.embed_query(query)
+        stats = {"strategy": "none", "predicate_evaluations": 0}
+
+        if not filtering_query:
+            _, indices = self.index.search(query_vector, top_k)
+            stats.update(candidates_scanned=int(self.index.ntotal))
+            results = [self.metadata[str(idx)] for idx in indices[0] if idx >= 0]
+        else:
+            predicates = self._compile_filters(filtering_query)
+            results = None
+            if self.filter_strategy == "prefilter":
+                stats["strategy"] = "prefilter"
+                try:
+                    results = self._prefiltered_search(query_vector, top_k, predicates, stats)
+                except RuntimeError as e:  # Index type without ID selector support
+                    logger.warning(f"Pre-filtered search unavailable ({e}); over-fetching instead.")
+            if results is None:
+                stats["strategy"] = "overfetch"
+                results = self._overfetch_search(query_vector, top_k, predicates, stats)
+
+        stats["returned"] = len(results)
+        return results, stats
@@ -0,0 +1,259 @@
+"""
+title: Query Embedding Cache
+description: A two-tier cache for query embeddings, keyed by (model name, normalized query). The first tier is an
+             in-process LRU; the second is a small SQLite store on disk, so identical queries skip the transformer
+             forward pass across Streamlit reruns, sessions and process restarts. Both tiers are size-bounded and
+             keep hit/miss counters; the disk tier is pruned every few inserts rather than counted on each one. Several models (e.g. one per encoder backend) share the SQLite file; every
+             disk operation is scoped to the cache's own model, and other models' rows are only purged on request.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", os.path.join(".cache", "query_embeddings.sqlite"))
+QUERY_CACHE_MEMORY_ENTRIES = int(os.getenv("QUERY_CACHE_MEMORY_ENTRIES", "512"))
+QUERY_CACHE_DISK_ENTRIES = int(os.getenv("QUERY_CACHE_DISK_ENTRIES", "10000"))
+# The disk bound is enforced every this many inserts, so a write is a single INSERT otherwise
+QUERY_CACHE_PRUNE_EVERY = int(os.getenv("QUERY_CACHE_PRUNE_EVERY", "64"))
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a query: NFC unicode with collapsed, trimmed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class QueryEmbeddingCache:
+    """
+    LRU memory tier in front of a persistent SQLite tier.
+
+    Vectors are stored as 1-D float32 arrays. A cache instance is bound to one model name and only
+    reads, evicts and invalidates that model's rows, so caches for different models (or backends of
+    the same model) can share one SQLite file without wiping each other.
+    """
+
+    def __init__(self, model_name: str, path: str = QUERY_CACHE_PATH,
+                 max_memory_entries: int = QUERY_CACHE_MEMORY_ENTRIES,
+                 max_disk_entries: int = QUERY_CACHE_DISK_ENTRIES,
+                 purge_other_models: bool = False):
+        """
+        Args:
+            model_name (str): Encoder the cached vectors belong to.
+            path (str): SQLite file for the disk tier. Use None for a memory-only cache.
+            max_memory_entries (int): Capacity of the in-process LRU.
+            max_disk_entries (int): Capacity of this model's disk rows; least recently used rows are evicted.
+                The bound is enforced every QUERY_CACHE_PRUNE_EVERY inserts, so it can be exceeded by
+                fewer rows than that in between.
+            purge_other_models (bool): Delete the rows of every other model when opening the disk tier
+                (e.g. after retiring a model for good).
+        """
+        self.model_name = model_name
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_evictions": 0}
+        self._inserts_since_prune = 0
+        self._conn = self._open_disk_tier(path, purge_other_models) if path else None
+
+    #
+    def _open_disk_tier(self, path, purge_other_models=False):
+        """Opens (or creates) the SQLite store, dropping rows from other models only if asked to."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model_name  TEXT NOT NULL,
+                    query       TEXT NOT NULL,
+                    vector      BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model_name, query)
+                )
+                """
+            )
+            if purge_other_models:
+                purged = conn.execute(
+                    "DELETE FROM query_embeddings WHERE model_name != ?", (self.model_name,)
+                ).rowcount
+                if purged:
+                    logger.info(f"Purged {purged} cached query embeddings from other models in {path}")
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Query embedding cache at {path} unavailable, using memory only: {e}")
+            return None
+
+    #
+    def get(self, query: str):
+        """
+        Looks a query up in memory, then on disk.
+
+        Returns:
+            np.ndarray or None: The cached 1-D float32 vector.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return vector
+
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._counters["disk_hits"] += 1
+                self._memory_put(key, vector)
+                return vector
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, query: str, vector: np.ndarray):
+        """Stores a query vector in both tiers."""
+        key = normalize_query(query)
+        vector = np.asarray(vector, dtype="float32").reshape(-1)
+        vector.setflags(write=False)
+        with self._lock:
+            self._memory_put(key, vector)
+            self._disk_put(key, vector)
+
+    def get_or_compute(self, query: str, compute):
+        """
+        Returns the cached vector for `query`, calling `compute(query)` on a miss.
+
+        Args:
+            query (str): Raw query text.
+            compute (callable): Produces a vector (any shape with D elements) for the query.
+
+        Returns:
+            np.ndarray: 1-D float32 vector.
+        """
+        vector = self.get(query)
+        if vector is None:
+            vector = np.asarray(compute(query), dtype="float32").reshape(-1)
+            self.put(query, vector)
+        return vector
+
+    #
+    def _memory_put(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key):
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE model_name = ? AND query = ?",
+                (self.model_name, key)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE query_embeddings SET last_access = ? WHERE model_name = ? AND query = ?",
+                (time.time(), self.model_name, key)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Query embedding cache read failed: {e}")
+            return None
+        vector = np.frombuffer(row[0], dtype="float32")
+        return vector
+
+    def _disk_put(self, key, vector):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model_name, query, vector, last_access) VALUES (?, ?, ?, ?)",
+                (self.model_name, key, vector.tobytes(), time.time())
+            )
+            self._inserts_since_prune += 1
+            if self._inserts_since_prune >= QUERY_CACHE_PRUNE_EVERY:
+                self._inserts_since_prune = 0
+                self._disk_prune()
+        except sqlite3.Error as e:
+            logger.warning(f"Query embedding cache write failed: {e}")
+
+    def _disk_prune(self):
+        """Evicts this model's least recently used rows beyond `max_disk_entries`."""
+        overflow = self._disk_count() - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM query_embeddings WHERE rowid IN "
+                "(SELECT rowid FROM query_embeddings WHERE model_name = ? ORDER BY last_access ASC LIMIT ?)",
+                (self.model_name, overflow)
+            )
+            self._counters["disk_evictions"] += overflow
+
+    def _disk_count(self) -> int:
+        """Rows of this cache's model on disk."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM query_embeddings WHERE model_name = ?", (self.model_name,)
+        ).fetchone()[0]
+
+    #
+    def invalidate(self, model_name: str = None):
+        """
+        Drops every cached vector of this cache's model. If `model_name` is given, the cache is
+        re-bound to that model and its rows are dropped as well. Other models' rows are kept.
+        """
+        with self._lock:
+            self._memory.clear()
+            stale_models = {self.model_name}
+            if model_name is not None:
+                self.model_name = model_name
+                stale_models.add(model_name)
+            if self._conn is not None:
+                try:
+                    for stale_model in stale_models:
+                        self._conn.execute("DELETE FROM query_embeddings WHERE model_name = ?", (stale_model,))
+                except sqlite3.Error as e:
+                    logger.warning(f"Query embedding cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current tier sizes."""
+        with self._lock:
+            report = dict(self._counters)
+            report["memory_entries"] = len(self._memory)
+            report["disk_entries"] = 0
+            if self._conn is not None:
+                try:
+                    report["disk_entries"] = self._disk_count()
+                except sqlite3.Error:
+                    pass
+        lookups = report["memory_hits"] + report["disk_hits"] + report["misses"]
+        report["hit_rate"] = round((lookups - report["misses"]) / lookups, 4) if lookups else 0.0
+        report["model_name"] = self.model_name
+        return report
+
+
+#
+# Process-wide caches, one per model name
+#
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_query_cache(model_name: str) -> QueryEmbeddingCache:
+    """Returns the shared query cache for `model_name`, creating it on first use."""
+    with _shared_lock:
+        cache = _shared_caches.get(model_name)
+        if cache is None:
+            cache = _shared_caches[model_name] = QueryEmbeddingCache(model_name)
+        return cache
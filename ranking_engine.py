@@ -0,0 +1,141 @@
+"""
+title: Ranking Engine
+description: A vectorized scoring engine for code samples. Module metadata is turned once into a NumPy feature
+             matrix (media availability, recency decay, library count, forced-rank boost), and each request
+             scores every candidate with a single weighted dot product, optionally adding the query columns
+             (dense similarity and fused lexical/dense relevance), before picking the top-k with argpartition. Cost stays flat as the catalogue grows because
+             no per-request Python loop touches every item.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+# Column order of the feature matrix; the QUERY_FEATURES are supplied per query
+FEATURES = ("has_media", "recency", "library_count", "forced_rank_boost", "semantic_similarity", "query_relevance")
+QUERY_FEATURES = ("semantic_similarity", "query_relevance")
+
+# Defaults approximate the former lexicographic heuristic: forced ranks first, then media, then freshness
+DEFAULT_WEIGHTS = {
+    "has_media": 1.0,
+    "recency": 0.5,
+    "library_count": 0.1,
+    "forced_rank_boost": 2.0,
+    "semantic_similarity": 1.0,
+    "query_relevance": 1.0,
+}
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DEFAULT_DATE = "1970-01-01T00:00:00Z"
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.strptime(value or DEFAULT_DATE, DATE_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return datetime.strptime(DEFAULT_DATE, DATE_FORMAT).timestamp()
+
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FeatureScorer:
+    """
+    Scores items as `features @ weights` and selects the top-k.
+
+    Rows of the feature matrix follow the order of the items given at construction time.
+    """
+
+    def __init__(self, items: list, weights: dict = None, recency_half_life_days: float = 180.0,
+                 group_field: str = "repo_name"):
+        """
+        Args:
+            items (list): Module metadata dicts.
+            weights (dict, optional): Feature name -> weight; missing features use DEFAULT_WEIGHTS.
+            recency_half_life_days (float): Age (relative to the newest item) at which recency halves.
+            group_field (str): Field used to restrict scoring to one project.
+        """
+        unknown = set(weights or {}) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown ranking features: {sorted(unknown)}. Available: {list(FEATURES)}")
+
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.weight_vector = np.array([self.weights[name] for name in FEATURES], dtype="float32")
+        self.num_items = len(items)
+
+        features = np.zeros((self.num_items, len(FEATURES)), dtype="float32")
+        if self.num_items:
+            features[:, 0] = [bool(item.get("image_path")) for item in items]
+
+            timestamps = np.array([_parse_timestamp(item.get("last_updated")) for item in items])
+            age_days = (timestamps.max() - timestamps) / 86400.0
+            features[:, 1] = np.exp(-np.log(2.0) * age_days / recency_half_life_days)
+
+            library_counts = np.log1p([len(item.get("libraries") or []) for item in items])
+            features[:, 2] = library_counts / max(library_counts.max(), 1e-9)
+
+            forced_ranks = [_parse_int(item.get("forced_rank")) for item in items]
+            features[:, 3] = [
+                1.0 / (1.0 + rank) if rank is not None and 0 <= rank < self.num_items else 0.0
+                for rank in forced_ranks
+            ]
+        self.features = features
+
+        # Static part of the score, computed once; the query columns are added per query
+        num_static = len(FEATURES) - len(QUERY_FEATURES)
+        self.static_scores = features[:, :num_static] @ self.weight_vector[:num_static]
+
+        self.group_rows = {}
+        for row, item in enumerate(items):
+            self.group_rows.setdefault(str(item.get(group_field, "")).lower(), []).append(row)
+        self.group_rows = {group: np.array(rows, dtype="int64") for group, rows in self.group_rows.items()}
+
+    def rows_for_group(self, group: str = None) -> np.ndarray:
+        """Row ids of a group's items, or every row when `group` is None."""
+        if group is None:
+            return np.arange(self.num_items, dtype="int64")
+        return self.group_rows.get(group.lower(), np.zeros(0, dtype="int64"))
+
+    def score(self, similarity: np.ndarray = None, rows: np.ndarray = None,
+              relevance: np.ndarray = None) -> np.ndarray:
+        """
+        Weighted score per item.
+
+        Args:
+            similarity (np.ndarray, optional): Dense query similarity per item (length num_items).
+            rows (np.ndarray, optional): Restrict scoring to these rows.
+            relevance (np.ndarray, optional): Fused query relevance per item in [0, 1] (length num_items).
+
+        Returns:
+            np.ndarray: Scores aligned with `rows` (or with every item).
+        """
+        scores = self.static_scores if rows is None else self.static_scores[rows]
+        for name, column in (("semantic_similarity", similarity), ("query_relevance", relevance)):
+            if column is not None:
+                column = column if rows is None else column[rows]
+                scores = scores + self.weights[name] * column
+        return scores
+
+    def top_k(self, k: int, rows: np.ndarray = None, similarity: np.ndarray = None,
+              relevance: np.ndarray = None) -> np.ndarray:
+        """
+        Row ids of the k best-scoring items, best first.
+
+        Uses argpartition, so only the k winners are fully sorted.
+        """
+        rows = np.arange(self.num_items, dtype="int64") if rows is None else np.asarray(rows, dtype="int64")
+        if k <= 0 or rows.size == 0:
+            return np.zeros(0, dtype="int64")
+
+        scores = self.score(similarity, rows, relevance)
+        if k < rows.size:
+            winners = np.argpartition(-scores, k - 1)[:k]
+        else:
+            winners = np.arange(rows.size)
+        # Stable tie-break on row id keeps results deterministic across reruns
+        order = np.lexsort((rows[winners], -scores[winners]))
+        return rows[winners[order]]
@@ -13,22 +13,25 @@ import time
 import glob
 import random
 import hashlib
+import logging
+import threading
 from datetime import datetime
 import markdown
 import math
+import numpy as np
 
 # Third-Party Imports
 import streamlit as st
 import streamlit.components.v1 as components
 
 # Custom Project-Specific Imports
-from git_api_utils import load_modules_metadata
+from git_api_utils import project_item_id, module_item_id
 from git_api_utils import load_repos_metadata as load_github_metadata
-from app_end_metadata import load_repos_metadata as load_app_metadata
+import app_end_metadata
 from front_end_utils import render_section_separator, prettify_title, tags_in_twitter_style
 from media_carousel import MediaCarousel  # Assuming this is the correct import
 from visual_media import  VisualContentGallery
-from front_end_for_recommended_content import html_for_item_data, html_for_milestones_from_project_metadata, render_recommendation_card
+from front_end_for_recommended_content import html_for_item_data, item_card_signature, html_for_milestones_from_project_metadata, render_recommendation_card
 from portfolio_section import PortfolioSection
 from exceptional_ui import apply_custom_tooltip, _custom_tooltip_with_frost_glass_html
 from biotech_lab import frost_glass_mosaic, _custom_tooltip_with_frost_glass_html
@@ -36,12 +39,20 @@ from expandable_text import expandable_text_html
 from external_url_as_tooltip import render_url_as_tooltip
 from summary_list_tooltip import html_for_summary_list_tooltip
 from semantic_retriever import SemanticRetriever
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from ranking_engine import FeatureScorer
+from rerankers import MMRReranker, CrossEncoderReranker
+from index_builder import item_text
+from html_fragments import stable_id
+from render_metrics import RenderMetrics, emit, instrumented_render, is_fragment_rerun, record_rerun, rerun_timings
 
 import os
 from dotenv import load_dotenv
 load_dotenv()
 MOCK_INFO_PREFIX = os.getenv("MOCK_INFO", "[MOCK INFO]")
 
+logger = logging.getLogger(__name__)
+
 #
 # Instantiation of the semantic retriever -> helps to filter projects by meaning
 #
@@ -50,9 +61,10 @@ MOCK_INFO_PREFIX = os.getenv("MOCK_INFO", "[MOCK INFO]")
 #project_retriever=SemanticRetriever("index/projects.index","index/metadata.json")
 #code_retriever=SemanticRetriever("index/modules_index.index","index/modules_metadata.json")
 
-from semantic_retriever import SemanticRetriever
-project_retriever=SemanticRetriever("new_project_embeddings")
-code_retriever=SemanticRetriever("new_samples_embeddings")
+from resource_cache import cached_retriever, cached_repos_metadata, cached_modules_metadata, metadata_fingerprint
+project_retriever=cached_retriever("new_project_embeddings")
+# One index over every code sample; project searches are restricted with an ID selector
+code_retriever=cached_retriever("new_samples_embeddings", storage="consolidated")
 
 #
 # (0) ancillary function to merge metadata about underlyng items
@@ -60,7 +72,8 @@ code_retriever=SemanticRetriever("new_samples_embeddings")
 def combine_metadata():
     # Load both sets of metadata
     github_metadata = load_github_metadata()
-    app_metadata = load_app_metadata()
+    # Looked up on the module, so a reload by resource_cache after an edit is picked up
+    app_metadata = app_end_metadata.load_repos_metadata()
 
     # Convert app metadata to a dictionary for fast lookup
     app_metadata_dict = {item["title"]: item for item in app_metadata}
@@ -76,7 +89,112 @@ def combine_metadata():
     return combined_metadata
 
 #
-# (1) RecSys
+# (1) Catalog: metadata plus every structure derived from it
+#
+class RecSysCatalog:
+    """
+    Project and code metadata together with the lookup tables, BM25 index, heuristic rankings and
+    feature scorer built from them. A catalog is built in full and not modified afterwards, so a
+    RecommendationSystem switches to new metadata by replacing its catalog in one assignment.
+    """
+
+    def __init__(self, repos_metadata, metadata_list, ranking_weights=None, signature=None):
+        self.signature = signature
+        self.metadata_list = metadata_list
+
+        # Id-keyed lookup tables, so retriever hits are joined back to metadata in O(hits)
+        self.item_positions = {item["id"]: position for position, item in enumerate(metadata_list)}
+
+        # Inverted index over code metadata, built once instead of regex-scanning every item per query
+        self.lexical_index = BM25Index(metadata_list)
+
+        # Card signatures (content hash, media files, badge expiry), so a card render is a cache lookup
+        self.card_signatures = {item["id"]: item_card_signature(item) for item in metadata_list}
+
+        self._build_heuristic_rankings()
+        self.feature_scorer = FeatureScorer(metadata_list, weights=ranking_weights)
+        self._sort_projects(repos_metadata)
+        self.projects_by_id = {project["id"]: project for project in self.repos_metadata}
+        self._prepare_project_titles_and_default()
+
+    #
+    def _build_heuristic_rankings(self):
+        """Precompute the heuristic ordering of code samples, overall and per project.
+
+        Items with media ('image_path') come first, then the most recently updated; items with a
+        valid 'forced_rank' are then slotted into that position. The result is stored as
+        `ranked_items` and `ranked_items_by_project` (keyed by lowercase repo_name), so rank_items
+        serves a project's card grid from a dictionary lookup.
+        """
+        def parse_int(value):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+
+        ranked_items = sorted(
+            self.metadata_list,
+            key=lambda x: (
+                not bool(x.get("image_path")),
+                -datetime.strptime(
+                    x.get("last_updated", "1970-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ"
+                ).timestamp(),
+            ),
+        )
+
+        forced_ranked_items = [None] * len(ranked_items)
+        unranked_items = []
+
+        for item in ranked_items:
+            forced_rank = parse_int(item.get("forced_rank"))
+            if isinstance(forced_rank, int) and 0 <= forced_rank < len(ranked_items):
+                if forced_ranked_items[forced_rank] is None:
+                    forced_ranked_items[forced_rank] = item
+                else:
+                    unranked_items.append(item)
+            else:
+                unranked_items.append(item)
+
+        self.ranked_items = [item for item in forced_ranked_items if item is not None] + unranked_items
+
+        self.ranked_items_by_project = {}
+        for item in self.ranked_items:
+            self.ranked_items_by_project.setdefault(item["repo_name"].lower(), []).append(item)
+
+    #
+    def _sort_projects(self, repos_metadata):
+        """Sort projects by ongoing status and number of related items (into a new list)."""
+        self.project_item_counts = {
+            repo["title"].lower(): sum(
+                1 for item in self.metadata_list if item['repo_name'].lower() == repo["title"].lower()
+            )
+            for repo in repos_metadata
+        }
+
+        self.repos_metadata = sorted(
+            repos_metadata,
+            key=lambda x: (
+                not x.get("ongoing", False),
+                -self.project_item_counts.get(x["title"].lower(), 0)
+            )
+        )
+    #
+    def _prepare_project_titles_and_default(self):
+        """Prepares project titles for selection and determines the default project."""
+        self.project_titles = [
+            f"{repo['title']} (Ongoing)" if repo.get("ongoing", False) else repo["title"]
+            for repo in self.repos_metadata
+        ]
+
+        self.title_mapping = {
+            prettify_title(title): repo["title"]
+            for title, repo in zip(self.project_titles, self.repos_metadata)
+        }
+
+        self.default_project = self.repos_metadata[0]["title"] if self.repos_metadata else "No Projects"
+
+#
+# (2) RecSys
 #
 class RecommendationSystem(PortfolioSection):
 
@@ -86,12 +204,32 @@ class RecommendationSystem(PortfolioSection):
     # Default media dimensions (class-level static attributes)
     MEDIA_CONTAINER_WIDTH = "700px"
     MEDIA_CONTAINER_HEIGHT = "400px"
+
+    # Projects whose cosine similarity to the visitor's query falls below this are not rendered
+    MIN_PROJECT_SIMILARITY = 0.25
+    # Code samples below this cosine similarity to the query are not semantic matches
+    MIN_CODE_SIMILARITY = 0.25
+    # MMR diversifies among this many times num_recommended_items leading candidates
+    MMR_POOL_FACTOR = 4
+    # Projects rendered per page (after the highlight); the rest wait for "load more"
+    PROJECTS_PER_PAGE = 3
+    PAGINATION_STATE_KEY = "recsys_pagination"
+    PAGE_METRICS_STATE_KEY = "recsys_page_metrics"
     #
     def __init__(self, 
                  semantic_project_retriever=None,
                  semantic_code_retriever=None, 
                  num_recommended_items=6, 
                  num_columns=3,
+                 retrieval_mode="hybrid",
+                 min_project_similarity=None,
+                 min_code_similarity=None,
+                 ranker="heuristic",
+                 ranking_weights=None,
+                 diversity_lambda=None,
+                 cross_encoder=None,
+                 projects_per_page=PROJECTS_PER_PAGE,
+                 project_code_search=True,
                  section_header="Project Galleria 🗂️ ",
                  section_description="Discover content tailored to your needs. Use the search bar to find recommendations and filter by project category."):
         """
@@ -103,6 +241,29 @@ class RecommendationSystem(PortfolioSection):
                 responsible for encoding queries and retrieving similar projects.
             num_recommended_items (int): Number of recommended items to display.
             num_columns (int): Number of columns in the gallery layout.
+            retrieval_mode (str): How code queries are matched: "lexical" (BM25 over titles,
+                descriptions and libraries), "semantic" (dense retriever only) or "hybrid"
+                (both, merged with reciprocal rank fusion).
+            min_project_similarity (float, optional): Minimum query similarity for a project to be
+                rendered. Defaults to MIN_PROJECT_SIMILARITY.
+            min_code_similarity (float, optional): Minimum query similarity for a code sample to count
+                as a semantic match. Defaults to MIN_CODE_SIMILARITY.
+            ranker (str): "heuristic" serves the precomputed media/recency/forced-rank ordering;
+                "scored" ranks with the vectorized FeatureScorer.
+            ranking_weights (dict, optional): Feature weights for the "scored" ranker (see
+                ranking_engine.FEATURES); unspecified features keep their defaults.
+            diversity_lambda (float, optional): Enables MMR diversification of query results:
+                1.0 keeps the relevance order, lower values push near-duplicate modules down.
+                None (default) disables it.
+            cross_encoder (CrossEncoderReranker or bool, optional): Second-stage re-scoring of the
+                leading query matches with a cross-encoder under a millisecond budget. True uses the
+                defaults from rerankers; None/False (default) disables it.
+            projects_per_page (int, optional): Projects rendered per page, with a "load more"
+                button for the rest. None renders every project at once.
+            project_code_search (bool): Renders a code search box in each project block that
+                re-ranks only that project's code samples. Project blocks are fragments, and this
+                box is their only widget, so it is what lets a query rerun one block instead of
+                the page. False keeps the former query-less blocks.
             section_header (str): Title for the section.
             section_description (str): Descriptive subtitle for the section.
         """
@@ -119,117 +280,79 @@ class RecommendationSystem(PortfolioSection):
                    
         self.num_recommended_items = num_recommended_items
         self.num_columns = num_columns
+        self.retrieval_mode = retrieval_mode
+        self.ranker = ranker
+        self.ranking_weights = ranking_weights
+        self.mmr_reranker = MMRReranker(diversity_lambda) if diversity_lambda is not None else None
+        self.cross_encoder = CrossEncoderReranker() if cross_encoder is True else (cross_encoder or None)
+        self.projects_per_page = projects_per_page
+        self.project_code_search = project_code_search
+        self.min_project_similarity = (
+            self.MIN_PROJECT_SIMILARITY if min_project_similarity is None else min_project_similarity
+        )
+        self.min_code_similarity = (
+            self.MIN_CODE_SIMILARITY if min_code_similarity is None else min_code_similarity
+        )
         
-        self.repos_metadata = combine_metadata()
-        self.metadata_list = load_modules_metadata()
-
-        self._sort_projects()
-        self._prepare_project_titles_and_default()
+        self._metadata_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._load_metadata()
 
         self.active_galleria = None  # Still optional unless you attach something dynamically
 
     #
-    def _sort_projects(self):
-        """Sort projects by ongoing status and number of related items."""
-        self.project_item_counts = {
-            repo["title"].lower(): sum(
-                1 for item in self.metadata_list if item['repo_name'].lower() == repo["title"].lower()
-            )
-            for repo in self.repos_metadata
-        }
+    def _metadata_signature(self):
+        """Content fingerprint of the metadata files the section is built from."""
+        return metadata_fingerprint()
 
-        self.repos_metadata.sort(
-            key=lambda x: (
-                not x.get("ongoing", False),
-                -self.project_item_counts.get(x["title"].lower(), 0)
-            )
+    def _load_metadata(self):
+        """Load project and code metadata and build every structure derived from it.
+
+        The merged metadata comes from the cross-session resource cache, so unchanged JSON is
+        neither re-read nor re-merged. The new catalog replaces the old one in a single assignment,
+        so concurrent renders see either the old or the new state, never a mix.
+        """
+        signature = self._metadata_signature()
+        catalog = RecSysCatalog(
+            cached_repos_metadata(combine_metadata), cached_modules_metadata(), self.ranking_weights, signature
         )
-    #
-    def _prepare_project_titles_and_default(self):
-        """Prepares project titles for selection and determines the default project."""
-        self.project_titles = [
-            f"{repo['title']} (Ongoing)" if repo.get("ongoing", False) else repo["title"]
-            for repo in self.repos_metadata
-        ]
+        with self._metadata_lock:
+            self.catalog = catalog
 
-        self.title_mapping = {
-            prettify_title(title): repo["title"]
-            for title, repo in zip(self.project_titles, self.repos_metadata)
-        }
+    def refresh_metadata(self, force=False):
+        """Reload metadata and rebuild derived structures if the metadata files changed on disk.
 
-        self.default_project = self.repos_metadata[0]["title"] if self.repos_metadata else "No Projects"
+        Returns:
+            bool: True if a reload happened.
+        """
+        if not force and self._metadata_signature() == self.catalog.signature:
+            return False
+        # One session rebuilds; the others keep serving the current catalog meanwhile
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            if not force and self._metadata_signature() == self.catalog.signature:
+                return False
+            self._load_metadata()
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    @property
+    def repos_metadata(self):
+        """Projects of the current catalog, sorted for display."""
+        return self.catalog.repos_metadata
+
+    @property
+    def metadata_list(self):
+        """Code samples of the current catalog."""
+        return self.catalog.metadata_list
 
     RANKER_LOGIC = """
     ⚙️ The recommendation system suggests some application modules from larger projects I’ve worked on. 
     Code samples are ranked based on availability of media content and freshness. 
-    The system currently supports filtering by project and exact keyword matching in code metadata (titles/descriptions) and library names for Python and R code samples.
+    The system currently supports filtering by project, and matches queries against code metadata (titles/descriptions) and library names for Python and R code samples, fusing keyword (BM25) and semantic rankings.
     """
-    #
-    # ranking logic aspect of the RecSys
-    #
-    def rank_items(self, query=None, selected_project=None):
-        """Rank the items by priority on 'image_path' and 'last_updated', then apply filters."""
-    
-        def parse_boolean(value):
-            """Helper function to safely parse boolean values from strings."""
-            return str(value).strip().lower() == "true"
-    
-        def parse_int(value):
-            """Helper function to safely parse integers."""
-            try:
-                return int(value)
-            except (TypeError, ValueError):
-                return None
-    
-        # Step 1: Sort items based on:
-        #   - Priority: Items with "image_path" not empty come first.
-        #   - Secondary: Sort by 'last_updated' in descending order.
-        ranked_items = sorted(
-            self.metadata_list,
-            key=lambda x: (
-                not bool(x.get("image_path")),  # Items without image_path get a higher value (sorted later)
-                -datetime.strptime(
-                    x.get("last_updated", "1970-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ"
-                ).timestamp(),
-            ),
-        )
-    
-        # Step 2: Apply forced rank heuristic
-        forced_ranked_items = [None] * len(ranked_items)  # Create a list with placeholders
-        unranked_items = []
-    
-        for item in ranked_items:
-            forced_rank = parse_int(item.get("forced_rank"))
-            if isinstance(forced_rank, int) and 0 <= forced_rank < len(ranked_items):
-                if forced_ranked_items[forced_rank] is None:
-                    forced_ranked_items[forced_rank] = item  # Place item in specified position
-                else:
-                    unranked_items.append(item)  # Handle collisions by adding to unranked
-            else:
-                unranked_items.append(item)  # Add items without forced_rank to unranked
-    
-        # Fill in the remaining slots with unranked items
-        final_ranked_items = [item for item in forced_ranked_items if item is not None] + unranked_items
-    
-        # Step 3: Filter by project selection
-        if selected_project and selected_project != "All Projects":
-            final_ranked_items = [
-                item for item in final_ranked_items if item["repo_name"].lower() == selected_project.lower()
-            ]
-    
-        # Step 4: Filter by search query
-        if query:
-            query_pattern = re.compile(re.escape(query), re.IGNORECASE)
-            final_ranked_items = [
-                item for item in final_ranked_items
-                if query_pattern.search(item.get("title", "")) 
-                or query_pattern.search(item.get("description", "")) 
-                or any(query_pattern.search(lib) for lib in item.get("libraries", []))
-            ]
-
-        # Step 5: Return the top 'num_recommended_items' recommendations
-        return final_ranked_items[:self.num_recommended_items]
-
     #
     # front end representation of items
     #
@@ -241,7 +364,7 @@ class RecommendationSystem(PortfolioSection):
     def _style_ancillary_component(self, component_key):
         """Apply CSS styles to make the ancillary component visible with a smooth transition."""
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <style>
             .st-key-{component_key} * {{
                 opacity: 0;
@@ -251,7 +374,7 @@ class RecommendationSystem(PortfolioSection):
                 transition: opacity 0.5s ease-in-out, visibility 0.5s ease-in-out, height 0.5s ease-in-out;
             }}
             </style>
-            """,
+            """),
             unsafe_allow_html=True,
         )
 
@@ -282,10 +405,12 @@ class RecommendationSystem(PortfolioSection):
     def render_card(self, rec, **kwargs):
         """Render a single recommendation card with dynamic HTML generation."""
 
-        card_html, tooltip_html, tooltip_styles=html_for_item_data(rec)
-        st.markdown(card_html, unsafe_allow_html=True)
-        st.markdown(tooltip_html, unsafe_allow_html=True)
-        st.markdown(tooltip_styles, unsafe_allow_html=True)
+        card_html, tooltip_html, tooltip_styles=html_for_item_data(
+            rec, signature=self.catalog.card_signatures.get(rec.get("id"))
+        )
+        st.markdown(emit("markdown", card_html), unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_html), unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_styles), unsafe_allow_html=True)
 
         unique_hash = hashlib.md5(rec['title'].encode()).hexdigest()
         button_id = f"galleria_{unique_hash}"
@@ -314,7 +439,7 @@ class RecommendationSystem(PortfolioSection):
         unique_key = "control-panel"
     
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <style>
                 .st-key-{unique_key} {{
                     position: sticky;
@@ -352,7 +477,7 @@ class RecommendationSystem(PortfolioSection):
                     outline: none;
                 }}
             </style>
-            """,
+            """),
             unsafe_allow_html=True
         )
     
@@ -389,55 +514,68 @@ class RecommendationSystem(PortfolioSection):
         )
     
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <blockquote style="border-left: 4px solid #d3d3d3; padding-left: 1em; color: #555; margin-bottom: 1.5em;">
                 {message}
             </blockquote>
-            """,
+            """),
             unsafe_allow_html=True
         )
     
+    @instrumented_render
     def render(self):
         """Render method displaying all projects in a portfolio-style view with a featured 'Personal Highlight'.
     
         If no query is entered, a hardcoded highlight is shown first, followed by the rest (excluding highlight).
         If a query is entered, only the ranked projects are shown in order.
+        Projects are rendered `projects_per_page` at a time behind a "load more" button; the payload
+        bytes and render time of every page are logged and kept in the session state.
         """
     
         self._render_headers()
         self._render_portfolio_disclaimer()
+        self._render_body()
+
+    #
+    @st.fragment
+    @instrumented_render
+    def _render_body(self):
+        """Control panel and project pages, as a fragment: a new query or "load more" reruns only this
+        part of the page, not the hero area and the other sections."""
+        render_start = time.perf_counter()
+
+        # Rebuild rankings only if the metadata files were edited since the last load
+        self.refresh_metadata()
     
         # Step 1: Get user input only
         user_query = self._render_control_panel()
     
-        # Step 2: Copy metadata to avoid mutating the original list
-        projects_copy = self.repos_metadata.copy()
+        # Step 2: One catalog for the whole pass, even if the metadata is swapped meanwhile
+        catalog = self.catalog
+        projects_copy = catalog.repos_metadata.copy()
+        highlighted_title, highlighted_project = None, None
     
         # Step 3: Determine projects to render
         if user_query:
-            ranked_project_lists = self.semantic_project_retriever.search(user_query)
-            ranked_titles = [pair["title"] for pair in ranked_project_lists]
+            # Weak matches are skipped entirely rather than drawing their video and dashboard
+            ranked_project_hits = self.semantic_project_retriever.search_with_scores(
+                user_query, min_score=self.min_project_similarity
+            )
+            ranked_ids = [item.get("id") or project_item_id(item) for item, score, rank in ranked_project_hits]
             projects_to_render = [
-                project for title in ranked_titles
-                for project in projects_copy
-                if project["title"] == title
+                catalog.projects_by_id[project_id] for project_id in ranked_ids
+                if project_id in catalog.projects_by_id
             ]
+            if not projects_to_render:
+                st.info("No project matches your query closely enough. Try rephrasing it or describing the requirement in more detail.")
         else:
-            # No query evaluated, fetch and render the highlighted project
+            # No query evaluated, the highlighted project leads the first page
             highlighted_title = self._fetch_highlighted_project()
             if highlighted_title:
-                st.markdown(
-                    "<div style='text-align: right;'><h4>🌟 <em>Personal Highlight</em></h4></div>",
-                    unsafe_allow_html=True
-                )
                 highlighted_project = next(
                     (project for project in projects_copy if project["title"] == highlighted_title),
                     None
                 )
-                if highlighted_project:
-                    self.render_project_metadata_and_recommendations(highlighted_project, user_query)
-                    st.markdown("---")
-    
                 # Exclude highlighted project from further rendering
                 projects_to_render = [
                     project for project in projects_copy if project["title"] != highlighted_title
@@ -445,14 +583,71 @@ class RecommendationSystem(PortfolioSection):
             else:
                 projects_to_render = projects_copy
 
-        # Step 4: Render selected projects
-        for project_metadata in projects_to_render:
-            self.render_project_metadata_and_recommendations(project_metadata, user_query)
-            st.markdown("<hr style='border: 0.5px solid #ccc;'/>", unsafe_allow_html=True)
+        # Step 4: Render the pages loaded so far; the rest waits for "load more"
+        page_size = self.projects_per_page or max(len(projects_to_render), 1)
+        pagination = self._pagination_state(user_query)
+        visible_projects = projects_to_render[:pagination["pages"] * page_size]
+
+        page_metrics = []
+        for page, start in enumerate(range(0, max(len(visible_projects), 1), page_size), start=1):
+            with RenderMetrics(f"RecSys projects page {page}") as metrics:
+                if page == 1 and highlighted_title:
+                    st.markdown(
+                        emit("markdown", "<div style='text-align: right;'><h4>🌟 <em>Personal Highlight</em></h4></div>"),
+                        unsafe_allow_html=True
+                    )
+                    if highlighted_project:
+                        self.render_project_metadata_and_recommendations(highlighted_project, user_query)
+                        st.markdown(emit("markdown", "---"))
+                for project_metadata in visible_projects[start:start + page_size]:
+                    self.render_project_metadata_and_recommendations(project_metadata, user_query)
+                    st.markdown(emit("markdown", "<hr style='border: 0.5px solid #ccc;'/>"), unsafe_allow_html=True)
+            page_metrics.append(metrics.as_dict())
+        st.session_state[self.PAGE_METRICS_STATE_KEY] = page_metrics
+
+        remaining = len(projects_to_render) - len(visible_projects)
+        if remaining > 0:
+            st.button(
+                f"Load more projects ({remaining} not shown yet)",
+                key="recsys-load-more-projects",
+                on_click=self._load_more_projects,
+                width="stretch",
+            )
+
+        self._render_rerun_timing(render_start)
+
+    def _render_rerun_timing(self, start):
+        """Caption comparing this section's rerun with the last full page rerun."""
+        scope = "recsys fragment" if is_fragment_rerun() else "recsys in page"
+        entry = record_rerun(scope, time.perf_counter() - start)
+        page = rerun_timings().get("page", {}).get("last_ms")
+        parts = [f"this section {'alone' if scope == 'recsys fragment' else 'within the page'}: {entry['last_ms']:,.0f} ms"]
+        if page is not None:
+            parts.append(f"last full page rerun: {page:,.0f} ms")
+        st.caption("⏱️ " + " · ".join(parts))
 
     #
+    def _pagination_state(self, user_query):
+        """Pages loaded in this session; a new query starts again from the first page."""
+        state = st.session_state.setdefault(self.PAGINATION_STATE_KEY, {"query": user_query, "pages": 1})
+        if state["query"] != user_query:
+            state.update(query=user_query, pages=1)
+        return state
+
+    def _load_more_projects(self):
+        """Button callback: runs before the rerun, so the next page renders in the same pass."""
+        st.session_state[self.PAGINATION_STATE_KEY]["pages"] += 1
+
+    #
+    @st.fragment
+    @instrumented_render
     def render_project_metadata_and_recommendations(self, project_metadata, query):
-            """Render project title, video, metadata, dashboard (if available), and recommendations in an ancillary container."""
+            """Render project title, video, metadata, dashboard (if available), and recommendations in an ancillary container.
+
+            Each project block is its own fragment: a query in the project's code search box reruns
+            only that block, not the whole page. The box replaces the former `code_query = None`
+            placeholder (see `project_code_search`).
+            """
         
             # Render project video (refactored to a helper method)
             self._render_project_video(project_metadata)
@@ -464,24 +659,24 @@ class RecommendationSystem(PortfolioSection):
             description_html = markdown.markdown(f"{description_html} ")
         
             st.markdown(
-                f"""
+                emit("markdown", f"""
                 <div style="text-align: center; margin-bottom: 0px;">
                     <h3>{prettify_title(project_metadata['title'])}</h3>
                 </div>
                 <p style="text-align: center; margin-top: 0px;">{tags_html}</p>
-                """,
+                """),
                 unsafe_allow_html=True,
             )
         
             unique_key = hashlib.md5(project_metadata['title'].encode()).hexdigest()
             with st.container(key=unique_key):
                 st.markdown(
-                    f"""
+                    emit("markdown", f"""
                     <div style="text-align: justify;">
                         {description_html}
                     </div>
                     {description_styles}
-                    """,
+                    """),
                     unsafe_allow_html=True,
                 )
         
@@ -489,8 +684,15 @@ class RecommendationSystem(PortfolioSection):
                 self._render_notebook_previews(project_metadata)
                 self._render_milestones_grid(project_metadata)
         
-                # 🔍 Codebase-specific search box
+                # 🔍 Codebase-specific search box; typing in it reruns only this project's fragment
                 code_query = None
+                if self.project_code_search:
+                    code_query = self._render_search_box(
+                        "",
+                        label=f"🔍 Search the code of {prettify_title(project_metadata['title'])}",
+                        placeholder="how is the predictive model being trained",
+                        key=project_metadata["id"],
+                    )
         
                 #st.markdown("<br>", unsafe_allow_html=True)
         
@@ -503,7 +705,7 @@ class RecommendationSystem(PortfolioSection):
                     filter_message = f"Showing the codebase for project {prettify_title(project_metadata['title'])}"
 
                 st.markdown(
-                    f'<p style="font-style: italic; color: #555; font-size: 105%; font-weight: 550;">{filter_message}</p>',
+                    emit("markdown", f'<p style="font-style: italic; color: #555; font-size: 105%; font-weight: 550;">{filter_message}</p>'),
                     unsafe_allow_html=True
                 )
         
@@ -523,7 +725,7 @@ class RecommendationSystem(PortfolioSection):
                 for nb in colab_links
             )
             st.markdown(
-                f"""
+                emit("markdown", f"""
                 <div style="margin-top: 0.5em;">
                     <p style="font-size: 110%; font-weight: 500; color: #444;">
                         🔗 <em>Notebook Previews</em>
@@ -532,7 +734,7 @@ class RecommendationSystem(PortfolioSection):
                         {notebook_list}
                     </ul>
                 </div>
-                """,
+                """),
                 unsafe_allow_html=True
             )
     #
@@ -554,7 +756,7 @@ class RecommendationSystem(PortfolioSection):
             return
     
         media_placeholder = st.empty()
-        media_placeholder.video(video_path, loop=True, autoplay=True, muted=True)
+        media_placeholder.video(emit("video", video_path), loop=True, autoplay=True, muted=True)
     # 
     def _render_executive_dashboard(self, project_metadata):
         dashboard = project_metadata.get("dashboard", {})
@@ -573,7 +775,7 @@ class RecommendationSystem(PortfolioSection):
             key_bulletsbox = f"{key_namespace}_dashboard_bulletsbox"
     
             st.markdown(
-                f"""
+                emit("markdown", f"""
                 <style>
                     .st-key-{key_imagebox} {{
                         background-color: #f9f9f9;
@@ -606,7 +808,7 @@ class RecommendationSystem(PortfolioSection):
                         margin-bottom: 0.5em;
                     }}
                 </style>
-                """,
+                """),
                 unsafe_allow_html=True,
             )
     
@@ -616,7 +818,7 @@ class RecommendationSystem(PortfolioSection):
                 with st.container(key=key_imagebox):
                     try:
                         # Try to load the media
-                        st.image(media_url, use_container_width=True)
+                        st.image(emit("image", media_url), use_container_width=True)
                     except Exception as e:
                         st.error(f"⚠️ Error loading media for project `{project_metadata['title']}`: {str(e)}")
                         # Optionally, provide a fallback image or placeholder
@@ -628,7 +830,7 @@ class RecommendationSystem(PortfolioSection):
               
                   with st.container(key=key_bulletsbox):
                       st.markdown(
-                          f"""
+                          emit("markdown", f"""
                           <p style="font-size: 1.1em; font-weight: 600; color: #555; border-left: 4px solid #ccc; padding-left: 0.5em; margin-bottom: 1em;">
                               {dashboard_title}
                           </p>
@@ -670,7 +872,7 @@ class RecommendationSystem(PortfolioSection):
                           <div class="st-key-{key_bulletsbox}">
                               {''.join(f'<div class="carousel-item">{markdown.markdown(b)}</div>' for b in bullets)}
                           </div>
-                          """,
+                          """),
                           unsafe_allow_html=True
                       )
 
@@ -688,7 +890,7 @@ class RecommendationSystem(PortfolioSection):
         wa_url = f"https://wa.me/{wa_number}?text=Hi!%20I'm%20interested%20in%20your%20project%20'{project_metadata['title']}'"
     
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <div style="margin: 2em auto 1em auto; padding: 0.9em 1.2em; max-width: 600px;
                         background-color: #f9fbfc; border-left: 4px solid #cce4f7; border-radius: 8px;
                         box-shadow: 0 1px 3px rgba(0,0,0,0.03); text-align: center;">
@@ -703,7 +905,7 @@ class RecommendationSystem(PortfolioSection):
                     </button>
                 </a>
             </div>
-            """,
+            """),
             unsafe_allow_html=True
         )
     #
@@ -720,12 +922,12 @@ class RecommendationSystem(PortfolioSection):
         """Render milestones in a row-based grid with consistent vertical spacing and shared row styling."""
     
     
-        # Include code samples in metadata
-        project_metadata["code_samples"] = self._fetch_files(project_metadata["title"])
+        # Include code samples in a copy, since project metadata is shared by every session
+        project_metadata = {**project_metadata, "code_samples": self._fetch_files(project_metadata["title"])}
     
         # Global styling class for all milestone rows
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <style>
                 .milestone-row {{
                     display: flex;
@@ -749,7 +951,7 @@ class RecommendationSystem(PortfolioSection):
                     margin: 10px 0;
                 }}
             </style>
-            """,
+            """),
             unsafe_allow_html=True
         )
     
@@ -777,7 +979,7 @@ class RecommendationSystem(PortfolioSection):
                 row_types.append(None)
     
             with st.container():
-                st.markdown('<div class="milestone-row">', unsafe_allow_html=True)
+                st.markdown(emit("markdown", '<div class="milestone-row">'), unsafe_allow_html=True)
                 cols = st.columns(col_count)
     
                 for col, milestone_type in zip(cols, row_types):
@@ -791,89 +993,141 @@ class RecommendationSystem(PortfolioSection):
                                 items=summary_items,
                                 style_key=milestone_type
                             )
-                            st.markdown(html_content, unsafe_allow_html=True)
+                            st.markdown(emit("markdown", html_content), unsafe_allow_html=True)
                         # For empty columns, do nothing (they stay empty)
-                st.markdown('</div>', unsafe_allow_html=True)
+                st.markdown(emit("markdown", '</div>'), unsafe_allow_html=True)
 
     #
     # ranking logic aspect of the RecSys
     #
     def rank_items(self, query=None, selected_project=None):
-        """Rank the items either via semantic retrieval or heuristics."""
-    
-        def parse_boolean(value):
-            return str(value).strip().lower() == "true"
-    
-        def parse_int(value):
-            try:
-                return int(value)
-            except (TypeError, ValueError):
-                return None
-    
-        # 🔁 New semantic ranking logic (if all conditions met)
-        if query and selected_project and selected_project != "All Projects" and hasattr(self, "semantic_code_retriever"):
-            # Work on a copy of the full list of code samples
-            code_samples_copy = self.metadata_list.copy()
-            
-            # Retrieve top-k relevant code samples using the semantic retriever, scoped by project group
-            ranked_code_snippets = self.semantic_code_retriever.search(
-                query, top_k=self.num_recommended_items, group=selected_project
-            )
-            
-            # Extract the titles of the retrieved code samples
-            ranked_titles = [item["title"] for item in ranked_code_snippets]
-            
-            # Reorder the internal metadata to match the ranked list
-            final_ranked_items = [
-                sample for title in ranked_titles
-                for sample in code_samples_copy
-                if sample["title"] == title
-            ]
-            
-            return final_ranked_items[:self.num_recommended_items]
+        """Serve the precomputed heuristic ranking, then match the query lexically, semantically or both."""
 
-    
-        # 🔁 Default heuristic-based logic
-        ranked_items = sorted(
-            self.metadata_list,
-            key=lambda x: (
-                not bool(x.get("image_path")),
-                -datetime.strptime(
-                    x.get("last_updated", "1970-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ"
-                ).timestamp(),
-            ),
-        )
-    
-        forced_ranked_items = [None] * len(ranked_items)
-        unranked_items = []
-    
-        for item in ranked_items:
-            forced_rank = parse_int(item.get("forced_rank"))
-            if isinstance(forced_rank, int) and 0 <= forced_rank < len(ranked_items):
-                if forced_ranked_items[forced_rank] is None:
-                    forced_ranked_items[forced_rank] = item
-                else:
-                    unranked_items.append(item)
-            else:
-                unranked_items.append(item)
-    
-        final_ranked_items = [item for item in forced_ranked_items if item is not None] + unranked_items
+        catalog = self.catalog
+        if self.ranker == "scored":
+            return self._rank_items_scored(query, selected_project, catalog)
     
         if selected_project and selected_project != "All Projects":
-            final_ranked_items = [
-                item for item in final_ranked_items if item["repo_name"].lower() == selected_project.lower()
-            ]
+            final_ranked_items = catalog.ranked_items_by_project.get(selected_project.lower(), [])
+        else:
+            final_ranked_items = catalog.ranked_items
     
         if query:
-            query_pattern = re.compile(re.escape(query), re.IGNORECASE)
-            final_ranked_items = [
-                item for item in final_ranked_items
-                if query_pattern.search(item.get("title", ""))
-                or query_pattern.search(item.get("description", ""))
-                or any(query_pattern.search(lib) for lib in item.get("libraries", []))
-            ]
+            fused, _ = self._match_query(query, final_ranked_items, selected_project, catalog)
+            final_ranked_items = [catalog.metadata_list[position] for position, _ in fused]
+            if self.cross_encoder is not None:
+                final_ranked_items = self.cross_encoder.rerank(query, final_ranked_items, item_text)
+            final_ranked_items = self._diversify(final_ranked_items)
     
         return final_ranked_items[:self.num_recommended_items]
+
+    #
+    def _match_query(self, query, ranked_items, selected_project=None, catalog=None):
+        """Scores the heuristically ranked candidates by relevance to a code query.
+
+        Lexical hits come from the BM25 index, dense hits (at least `min_code_similarity` to the
+        query) from the semantic code retriever; in hybrid mode both lists are merged with
+        reciprocal rank fusion. Items matched by neither are dropped, as with the former keyword
+        filter, so an unrelated query matches nothing.
+
+        Returns:
+            tuple: (fused, dense_hits) where `fused` holds (metadata position, RRF score) pairs,
+            best first, and `dense_hits` the (metadata position, cosine similarity) pairs the
+            dense search returned (empty without a semantic retriever).
+        """
+        catalog = catalog or self.catalog
+        candidates = [catalog.item_positions[item["id"]] for item in ranked_items]
+        heuristic_rank = {position: rank for rank, position in enumerate(candidates)}
+        allowed = set(candidates)
+
+        rankings = []
+        dense_hits = []
+        if self.retrieval_mode in ("lexical", "hybrid"):
+            lexical_hits = catalog.lexical_index.search(query, candidates=allowed)
+            # Equal BM25 scores keep the heuristic order
+            lexical_hits.sort(key=lambda hit: (-hit[1], heuristic_rank[hit[0]]))
+            rankings.append([position for position, _ in lexical_hits])
+
+        if self.retrieval_mode in ("semantic", "hybrid") and self.semantic_code_retriever is not None:
+            dense_hits = self._dense_hits(query, selected_project, catalog)
+            rankings.append([position for position, _ in dense_hits if position in allowed])
+
+        return reciprocal_rank_fusion(*rankings), dense_hits
+
+    def _dense_hits(self, query, selected_project=None, catalog=None):
+        """Semantic code hits above `min_code_similarity` as (metadata position, cosine similarity) pairs, best first."""
+        catalog = catalog or self.catalog
+        group = selected_project if selected_project and selected_project != "All Projects" else None
+        top_k = max(self.num_recommended_items * 3, 10)
+        try:
+            if group is None:
+                # Portfolio-wide code search: every project index, merged into a global top-k
+                hits = self.semantic_code_retriever.search_all_groups(
+                    query, top_k=top_k, min_score=self.min_code_similarity
+                )
+            else:
+                hits = self.semantic_code_retriever.search_with_scores(
+                    query, top_k=top_k, group=group, min_score=self.min_code_similarity
+                )
+        except ValueError:
+            return []  # Project without a code index
+        positions = ((catalog.item_positions.get(item.get("id") or module_item_id(item)), score) for item, score, _ in hits)
+        return [(position, score) for position, score in positions if position is not None]
+
+    def _rank_items_scored(self, query=None, selected_project=None, catalog=None):
+        """Rank with the vectorized feature scorer instead of the precomputed heuristic lists.
+
+        Without a query every item of the project is a candidate. With a query, candidates are the
+        items matched by `_match_query`; their dense similarity and their fused (BM25/dense RRF)
+        relevance, scaled to [0, 1], enter the weighted score.
+        """
+        catalog = catalog or self.catalog
+        group = selected_project if selected_project and selected_project != "All Projects" else None
+        rows = catalog.feature_scorer.rows_for_group(group)
+        similarity = relevance = None
+
+        if query:
+            ranked_items = [catalog.metadata_list[row] for row in rows]
+            fused, dense_hits = self._match_query(query, ranked_items, selected_project, catalog)
+            rows = np.array([position for position, _ in fused], dtype="int64")
+            relevance = np.zeros(len(catalog.metadata_list), dtype="float32")
+            if fused:
+                relevance[rows] = np.array([score for _, score in fused], dtype="float32") / fused[0][1]
+            if dense_hits:
+                similarity = np.zeros(len(catalog.metadata_list), dtype="float32")
+                for position, score in dense_hits:
+                    similarity[position] = score
+
+        pool_size = self.num_recommended_items
+        if query and self.mmr_reranker is not None:
+            pool_size *= self.MMR_POOL_FACTOR
+        top_rows = catalog.feature_scorer.top_k(pool_size, rows, similarity, relevance)
+        ranked_items = [catalog.metadata_list[row] for row in top_rows]
+        if query:
+            ranked_items = self._diversify(ranked_items)
+        return ranked_items[:self.num_recommended_items]
+
+    def _diversify(self, ranked_items):
+        """Re-rank the leading candidates with MMR so near-duplicate modules do not fill the grid.
+
+        Relevance is the incoming order scaled to [0, 1], so lexical, dense and feature scores keep
+        their say; diversity comes from cosine similarities between the stored code vectors.
+        """
+        if self.mmr_reranker is None or self.semantic_code_retriever is None or len(ranked_items) < 2:
+            return ranked_items
+
+        pool = ranked_items[:self.num_recommended_items * self.MMR_POOL_FACTOR]
+        try:
+            vectors = self.semantic_code_retriever.item_vectors([item["id"] for item in pool])
+        except (ValueError, RuntimeError) as e:
+            logger.warning(f"MMR skipped, item vectors unavailable: {e}")
+            return ranked_items
+
+        relevance = 1.0 - np.arange(len(pool), dtype="float32") / len(pool)
+        order = self.mmr_reranker.rerank(vectors, relevance, self.num_recommended_items)
+        chosen = set(order)
+        return [pool[i] for i in order] + [item for i, item in enumerate(pool) if i not in chosen] + ranked_items[len(pool):]
+
     #
     def _render_search_box(
         self,
@@ -881,27 +1135,27 @@ class RecommendationSystem(PortfolioSection):
         label="🧠 You can ask anything to the codebase",
         placeholder="how is the predictive model being trained",
         height=50,
-        
+        key=None,
     ):
         """
-        Render a sticky, styled search box with full customization and a unique time-based key.
+        Render a sticky, styled search box with full customization and a stable, content-derived key.
         
         Parameters:
             label (str): Label displayed above the text area.
             placeholder (str): Placeholder shown inside the text area.
             value (str): Default value of the text area.
             height (int): Height of the text area in pixels.
+            key (str, optional): Distinguishes search boxes sharing a label (e.g. one per project).
         
         Returns:
             str: The user-provided query.
         """
-        # Generate unique key using current time hash
-        timestamp = str(time.time_ns())
-        unique_key = hashlib.md5(timestamp.encode()).hexdigest()
+        # The same box gets the same key on every rerun, so its HTML and widget state are stable
+        unique_key = stable_id(key or "", label, placeholder, prefix="search-box-")
     
         # Inject scoped CSS styling using that unique key
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <style>
                 .st-key-{unique_key} {{
                     position: sticky;
@@ -939,7 +1193,7 @@ class RecommendationSystem(PortfolioSection):
                     outline: none;
                 }}
             </style>
-            """,
+            """),
             unsafe_allow_html=True
         )
     
@@ -967,7 +1221,7 @@ class RecommendationSystem(PortfolioSection):
             key_bulletsbox = f"{key_namespace}_dashboard_bulletsbox"
     
             st.markdown(
-                f"""
+                emit("markdown", f"""
                 <style>
                     .st-key-{key_imagebox} {{
                         background-color: #f9f9f9;
@@ -1000,7 +1254,7 @@ class RecommendationSystem(PortfolioSection):
                         margin-bottom: 0.5em;
                     }}
                 </style>
-                """,
+                """),
                 unsafe_allow_html=True,
             )
     
@@ -1008,25 +1262,25 @@ class RecommendationSystem(PortfolioSection):
     
             with col_img:
                 with st.container(key=key_imagebox):
-                    st.image(media_url, use_container_width=True)
+                    st.image(emit("image", media_url), use_container_width=True)
     
             with col_bullets:
                 with st.container(key=key_bulletsbox):
                     st.markdown(
-                        f"""
+                        emit("markdown", f"""
                         <p style="font-size: 1.1em; font-weight: 600; color: #555; border-left: 4px solid #ccc; padding-left: 0.5em; margin-bottom: 1em;">
                             {project_title}
                         </p>
-                        """,
+                        """),
                         unsafe_allow_html=True
                     )
                     st.markdown(
-                        "<ul>" +
-                        "".join(
-                            f"<li>{markdown.markdown(bullet)}</li>"
-                            for bullet in bullets
-                        ) +
-                        "</ul>",
+                        emit("markdown", "<ul>" +
+                                         "".join(
+                                             f"<li>{markdown.markdown(bullet)}</li>"
+                                             for bullet in bullets
+                                         ) +
+                                         "</ul>"),
                         unsafe_allow_html=True
                     )
 
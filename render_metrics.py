@@ -0,0 +1,257 @@
+"""
+title: Render Metrics
+description: Measures what a block of Streamlit code sends to the browser. Section code reports each element it
+             renders with `emit(kind, payload)`, which returns the payload, e.g.
+             st.markdown(emit("markdown", html), unsafe_allow_html=True). Inside `with RenderMetrics("label")` every
+             emitted st.markdown, components.html, st.video or st.image payload adds its size to the block's
+             counters: HTML/markdown text in UTF-8 bytes, local media files by their size on disk, in-memory media
+             by their buffer size. Remote URLs are counted as calls only, since the browser fetches them from
+             elsewhere. The block's wall time is recorded too. Streamlit itself is not patched, so elements
+             rendered without `emit` are not counted. Recorders nest and are per thread, so concurrent sessions
+             never count each other.
+             The rerun helpers keep the wall time of full script reruns and of fragment-scoped reruns in the
+             session state, so the two can be compared side by side. The `instrumented_render` decorator applies
+             the same measurement to a section's render(), emitting one structured (JSON) log record per section
+             per rerun and feeding an opt-in debug overlay (RENDER_DEBUG_OVERLAY=true or ?debug=render).
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import functools
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+# Element kinds counted by emit()
+TRACKED_ELEMENTS = ("markdown", "html", "video", "image")
+
+RERUN_TIMINGS_STATE_KEY = "rerun_timings"
+SECTION_METRICS_STATE_KEY = "section_metrics"
+
+# The debug overlay is shown when enabled here or with ?debug=render in the URL
+DEBUG_OVERLAY = os.getenv("RENDER_DEBUG_OVERLAY", "false").lower() in ("1", "true", "yes")
+DEBUG_QUERY_PARAM = ("debug", "render")
+
+_active = threading.local()
+
+
+#
+# (1) payload sizes
+#
+def payload_bytes(payload) -> int:
+    """Bytes a Streamlit element ships for `payload` (0 for remote URLs and unknown objects)."""
+    if payload is None:
+        return 0
+    if isinstance(payload, (list, tuple)):  # st.image accepts a list of images
+        return sum(payload_bytes(item) for item in payload)
+    if isinstance(payload, str):
+        if payload.startswith(("http://", "https://")):
+            return 0
+        if len(payload) < 4096 and os.path.isfile(payload):
+            return os.path.getsize(payload)
+        return len(payload.encode("utf-8"))
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    if hasattr(payload, "nbytes"):  # numpy arrays
+        return int(payload.nbytes)
+    if hasattr(payload, "getbuffer"):  # BytesIO
+        return len(payload.getbuffer())
+    if hasattr(payload, "size") and hasattr(payload, "mode"):  # PIL images, as raw pixels
+        width, height = payload.size
+        return width * height * len(payload.getbands())
+    return 0
+
+
+#
+# (2) instrumentation
+#
+def _recorders() -> list:
+    stack = getattr(_active, "stack", None)
+    if stack is None:
+        stack = _active.stack = []
+    return stack
+
+
+def emit(kind: str, payload):
+    """
+    Counts one element of `kind` (see TRACKED_ELEMENTS) against every RenderMetrics block active
+    on the calling thread and returns `payload` unchanged. Outside a block it only returns it.
+    """
+    stack = _recorders()
+    if stack:
+        size = payload_bytes(payload)
+        for recorder in stack:
+            recorder.add(kind, size)
+    return payload
+
+
+class RenderMetrics:
+    """
+    Context manager accumulating payload bytes, element counts and wall time of a render block.
+
+    Usage:
+        with RenderMetrics("projects page 1") as metrics:
+            ...
+        metrics.as_dict()
+    """
+
+    def __init__(self, label: str, log: bool = True):
+        self.label = label
+        self.log = log
+        self.bytes = {element: 0 for element in TRACKED_ELEMENTS}
+        self.calls = {element: 0 for element in TRACKED_ELEMENTS}
+        self.seconds = 0.0
+        self._start = None
+
+    def add(self, element: str, size: int):
+        self.bytes[element] += size
+        self.calls[element] += 1
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.bytes.values())
+
+    def __enter__(self):
+        _recorders().append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.seconds = time.perf_counter() - self._start
+        _recorders().remove(self)
+        if self.log:
+            logger.info(
+                f"{self.label}: {self.total_bytes / 1024:.1f} KB in {self.seconds * 1000:.0f} ms "
+                f"({', '.join(f'{element}={self.calls[element]}' for element in TRACKED_ELEMENTS)})"
+            )
+        return False
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "total_bytes": self.total_bytes,
+            "bytes": dict(self.bytes),
+            "calls": dict(self.calls),
+            "ms": round(self.seconds * 1000, 1),
+        }
+
+
+#
+# (3) rerun timings
+#
+def is_fragment_rerun() -> bool:
+    """True while Streamlit reruns only fragments (not the whole script)."""
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and getattr(ctx, "fragment_ids_this_run", None))
+
+
+def record_rerun(scope: str, seconds: float) -> dict:
+    """
+    Stores the latest wall time of a rerun `scope` (e.g. "page" or "recsys fragment") in the
+    session state and returns its entry.
+    """
+    timings = st.session_state.setdefault(RERUN_TIMINGS_STATE_KEY, {})
+    entry = timings.setdefault(scope, {"runs": 0, "last_ms": None})
+    entry["runs"] += 1
+    entry["last_ms"] = round(seconds * 1000, 1)
+    logger.info(f"{scope} rerun: {entry['last_ms']} ms")
+    return entry
+
+
+def rerun_timings() -> dict:
+    """Latest timings per rerun scope in this session."""
+    return st.session_state.get(RERUN_TIMINGS_STATE_KEY, {})
+
+
+#
+# (4) per-section instrumentation
+#
+def _sections_in_progress() -> set:
+    sections = getattr(_active, "sections", None)
+    if sections is None:
+        sections = _active.sections = set()
+    return sections
+
+
+def _record_section(section, metrics: RenderMetrics, render_name: str = "render") -> dict:
+    """
+    Logs one section render as a JSON record and keeps it for the debug overlay. Renders of part of a
+    section (a fragment rerun) are kept next to the full render, as "<section>.<method>".
+    """
+    entry = {
+        "event": "section_render",
+        "section": type(section).__name__,
+        "render": render_name,
+        "title": getattr(section, "title", None),
+        "ms": round(metrics.seconds * 1000, 1),
+        "markdown_calls": metrics.calls["markdown"],
+        "html_calls": metrics.calls["html"],
+        "html_bytes": metrics.bytes["markdown"] + metrics.bytes["html"],
+        "media_bytes": metrics.bytes["video"] + metrics.bytes["image"],
+        "fragment_rerun": is_fragment_rerun(),
+    }
+    logger.info(json.dumps(entry, ensure_ascii=False))
+    key = entry["section"] if render_name == "render" else f"{entry['section']}.{render_name}"
+    st.session_state.setdefault(SECTION_METRICS_STATE_KEY, {})[key] = entry
+    return entry
+
+
+def instrumented_render(render):
+    """
+    Decorates a section's render() to measure it with RenderMetrics. A render that calls another
+    instrumented render of the same object (e.g. through super()) is measured once, at the outermost call.
+
+    Also apply it to the methods a section runs as st.fragment (below the fragment decorator): inside a
+    full render they are part of the section's measurement, and when Streamlit reruns only the fragment
+    they emit their own record.
+    """
+    @functools.wraps(render)
+    def wrapper(self, *args, **kwargs):
+        in_progress = _sections_in_progress()
+        if id(self) in in_progress:
+            return render(self, *args, **kwargs)
+
+        in_progress.add(id(self))
+        metrics = RenderMetrics(type(self).__name__, log=False)
+        try:
+            with metrics:
+                return render(self, *args, **kwargs)
+        finally:
+            in_progress.discard(id(self))
+            _record_section(self, metrics, render.__name__)
+    return wrapper
+
+
+def debug_overlay_enabled() -> bool:
+    key, value = DEBUG_QUERY_PARAM
+    return DEBUG_OVERLAY or st.query_params.get(key) == value
+
+
+def render_debug_overlay():
+    """Fixed corner panel with the latest per-section metrics of this session (opt-in)."""
+    if not debug_overlay_enabled():
+        return
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{entry['ms']:,.0f}</td><td>{entry['markdown_calls']}</td>"
+        f"<td>{entry['html_calls']}</td><td>{entry['html_bytes'] / 1024:,.1f}</td><td>{entry['media_bytes'] / 1024:,.0f}</td></tr>"
+        for name, entry in st.session_state.get(SECTION_METRICS_STATE_KEY, {}).items()
+    )
+    page = rerun_timings().get("page", {}).get("last_ms")
+    st.markdown(
+        f"""
+        <div style="position: fixed; bottom: 12px; left: 12px; z-index: 10000; background: rgba(20, 20, 20, 0.85);
+                    color: #f0f0f0; font: 12px monospace; padding: 8px 10px; border-radius: 8px;">
+            <div style="margin-bottom: 4px;">render metrics · last full page rerun: {page if page is not None else "n/a"} ms</div>
+            <table style="border-collapse: collapse; color: inherit;">
+                <tr><th>section</th><th>ms</th><th>md</th><th>html</th><th>HTML KB</th><th>media KB</th></tr>
+                {rows}
+            </table>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
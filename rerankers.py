@@ -0,0 +1,271 @@
+"""
+title: Rerankers
+description: Second-stage re-ranking of retrieved candidates. MMRReranker applies maximal marginal relevance over
+             the stored item vectors, trading each candidate's relevance against its similarity to the items
+             already picked, so near-identical modules do not fill the code grid. Work is limited to the candidate
+             set (one small cosine matrix) and bounded by a latency budget, after which the remaining slots keep
+             their incoming order. CrossEncoderReranker re-scores the leading candidates jointly with the query
+             using a small cross-encoder in one batched forward pass; when that pass would exceed (or does
+             exceed) its millisecond budget, the incoming order is served unchanged. The cross-encoder is
+             loaded in the background as soon as the reranker is built and shared by every reranker of the
+             same model. Both keep running stats.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+MMR_BUDGET_MS = float(os.getenv("MMR_BUDGET_MS", "5"))
+
+CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+CROSS_ENCODER_TOP_N = int(os.getenv("CROSS_ENCODER_TOP_N", "20"))
+CROSS_ENCODER_BUDGET_MS = float(os.getenv("CROSS_ENCODER_BUDGET_MS", "150"))
+# After this many calls skipped on the cost estimate, one call runs anyway to refresh it
+CROSS_ENCODER_PROBE_EVERY = 10
+
+_cross_encoders = {}
+_cross_encoders_lock = threading.Lock()
+
+
+def get_cross_encoder(model_name: str = CROSS_ENCODER_MODEL):
+    """
+    Returns the process-wide sentence-transformers CrossEncoder for `model_name`, loading it on
+    first request. Cross-encoders score (query, passage) pairs rather than embedding queries, so
+    they are kept apart from the query encoders of encoder_registry.
+    """
+    model = _cross_encoders.get(model_name)
+    if model is not None:
+        return model
+    with _cross_encoders_lock:
+        model = _cross_encoders.get(model_name)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            start = time.perf_counter()
+            model = _cross_encoders[model_name] = CrossEncoder(model_name)
+            logger.info(f"Loaded cross-encoder '{model_name}' in {time.perf_counter() - start:.2f}s")
+    return model
+
+
+class MMRReranker:
+    """
+    Greedy maximal marginal relevance:
+
+        next = argmax_i  lambda * relevance_i - (1 - lambda) * max_j cos(v_i, v_j),  j already selected
+
+    lambda = 1 reproduces the incoming ranking; lower values favour diversity.
+    """
+
+    def __init__(self, lambda_: float = MMR_LAMBDA, budget_ms: float = MMR_BUDGET_MS):
+        """
+        Args:
+            lambda_ (float): Relevance weight in [0, 1].
+            budget_ms (float): Hard time limit for one re-ranking; None disables it.
+        """
+        if not 0.0 <= lambda_ <= 1.0:
+            raise ValueError(f"MMR lambda must be within [0, 1], got {lambda_}.")
+        self.lambda_ = lambda_
+        self.budget_ms = budget_ms
+        self.stats = {"calls": 0, "truncated": 0, "last_ms": 0.0}
+
+    def rerank(self, vectors: np.ndarray, relevance: np.ndarray, top_k: int) -> list:
+        """
+        Orders candidates by marginal relevance.
+
+        Args:
+            vectors (np.ndarray): NxD unit vectors of the candidates.
+            relevance (np.ndarray): Relevance of each candidate to the query (higher is better).
+            top_k (int): Number of candidates to select.
+
+        Returns:
+            list: Candidate positions, in selection order.
+        """
+        start = time.perf_counter()
+        self.stats["calls"] += 1
+        num_candidates = len(relevance)
+        top_k = min(top_k, num_candidates)
+        if top_k <= 0:
+            return []
+
+        relevance = np.asarray(relevance, dtype="float32")
+        similarities = vectors @ vectors.T
+        max_similarity = np.full(num_candidates, -np.inf, dtype="float32")
+        available = np.ones(num_candidates, dtype=bool)
+
+        selected = [int(np.argmax(relevance))]
+        available[selected[0]] = False
+        max_similarity = np.maximum(max_similarity, similarities[selected[0]])
+
+        while len(selected) < top_k:
+            if self.budget_ms is not None and (time.perf_counter() - start) * 1000 > self.budget_ms:
+                # Out of time: the remaining slots keep their relevance order
+                self.stats["truncated"] += 1
+                remaining = np.flatnonzero(available)
+                selected.extend(remaining[np.argsort(-relevance[remaining], kind="stable")][:top_k - len(selected)].tolist())
+                break
+            marginal = self.lambda_ * relevance - (1.0 - self.lambda_) * max_similarity
+            marginal[~available] = -np.inf
+            chosen = int(np.argmax(marginal))
+            selected.append(chosen)
+            available[chosen] = False
+            max_similarity = np.maximum(max_similarity, similarities[chosen])
+
+        self.stats["last_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return selected
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores the top-N candidates of a query with a cross-encoder.
+
+    The model is warmed on the worker thread when the reranker is built. Each call scores all N
+    (query, candidate) pairs in one batch on that thread and waits at most `budget_ms` for it;
+    if the expected cost (from the running per-pair average of the forward pass) is already over
+    budget, the model is not called at all, apart from an occasional probe that refreshes the
+    estimate. While the model is still loading, or an abandoned batch is still running, calls are
+    not queued behind it. In all these cases the incoming order is returned, so the stage can only
+    add latency up to its budget.
+
+    `stats` reports calls, how many were applied, skipped (over the cost estimate), busy (worker
+    still occupied) or abandoned, the time spent, and the mean rank displacement of applied
+    re-rankings. Displacement only says how much the stage reorders, not whether it improves
+    relevance; that is measured on the golden set by retrieval_eval (nDCG/recall with and without
+    the cross-encoder against the latency it adds). Sessions share a reranker, so the counters are
+    updated under a lock.
+    """
+
+    def __init__(self, model_name: str = CROSS_ENCODER_MODEL, top_n: int = CROSS_ENCODER_TOP_N,
+                 budget_ms: float = CROSS_ENCODER_BUDGET_MS, warm: bool = True):
+        """
+        Args:
+            model_name (str): sentence-transformers CrossEncoder model.
+            top_n (int): Number of leading candidates to re-score.
+            budget_ms (float): Time limit for one re-ranking; None disables it.
+            warm (bool): Start loading the model in the background right away.
+        """
+        self.model_name = model_name
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cross-encoder")
+        self.stats = {
+            "calls": 0, "applied": 0, "skipped": 0, "busy": 0, "abandoned": 0,
+            "total_ms": 0.0, "ms_per_pair": None, "mean_displacement": 0.0, "top1_changed": 0,
+        }
+        self._skips_since_probe = 0
+        self._stats_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        # Latest job on the worker (warm-up or batch); the next batch is only submitted once it is done
+        self._in_flight = self._executor.submit(self._warm) if warm else None
+
+    @property
+    def model(self):
+        return get_cross_encoder(self.model_name)
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """Blocks until the warm-up (or a running batch) is done; True if the worker is free."""
+        in_flight = self._in_flight
+        if in_flight is None:
+            return True
+        try:
+            in_flight.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception:
+            pass
+        return True
+
+    def _warm(self):
+        try:
+            self.model
+        except Exception as e:
+            logger.warning(f"Cross-encoder '{self.model_name}' could not be loaded: {e}")
+
+    def _score(self, query: str, texts: list) -> np.ndarray:
+        model = self.model  # Normally warm; a cold load is not part of the per-pair cost
+        pairs = [(query, text) for text in texts]
+        start = time.perf_counter()
+        scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        self._record_timing(start, len(pairs))
+        return np.asarray(scores, dtype="float32")
+
+    def rerank(self, query: str, items: list, text_of) -> list:
+        """
+        Re-orders the first `top_n` items by cross-encoder score; the tail keeps its order.
+
+        Args:
+            query (str): The visitor's query.
+            items (list): Candidates, best first.
+            text_of (callable): Maps a candidate to the passage scored against the query.
+
+        Returns:
+            list: The re-ranked candidates (the input order if the budget was exceeded).
+        """
+        self._count("calls")
+        head, tail = items[:self.top_n], items[self.top_n:]
+        if len(head) < 2:
+            return items
+
+        with self._stats_lock:
+            ms_per_pair = self.stats["ms_per_pair"]
+            if self.budget_ms is not None and ms_per_pair is not None and ms_per_pair * len(head) > self.budget_ms:
+                self._skips_since_probe += 1
+                if self._skips_since_probe < CROSS_ENCODER_PROBE_EVERY:
+                    self.stats["skipped"] += 1
+                    return items
+        with self._submit_lock:
+            if self._in_flight is not None and not self._in_flight.done():
+                # Still loading, or an abandoned batch is running: do not queue behind it
+                self._count("busy")
+                return items
+            self._skips_since_probe = 0
+            start = time.perf_counter()
+            future = self._in_flight = self._executor.submit(self._score, query, [text_of(item) for item in head])
+        try:
+            timeout = None if self.budget_ms is None else self.budget_ms / 1000
+            scores = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # The batch finishes in the background; its timing still informs the next estimate
+            with self._stats_lock:
+                self.stats["abandoned"] += 1
+                self.stats["total_ms"] += self.budget_ms
+            logger.info(f"Cross-encoder re-ranking abandoned after {self.budget_ms} ms")
+            return items
+        except Exception as e:
+            logger.warning(f"Cross-encoder re-ranking failed: {e}")
+            return items
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        order = np.argsort(-scores, kind="stable")
+        displacement = float(np.abs(order - np.arange(len(head))).mean())
+        with self._stats_lock:
+            self.stats["total_ms"] += elapsed_ms
+            applied = self.stats["applied"]
+            self.stats["mean_displacement"] = (self.stats["mean_displacement"] * applied + displacement) / (applied + 1)
+            self.stats["applied"] = applied + 1
+            self.stats["top1_changed"] += int(order[0] != 0)
+        return [head[i] for i in order] + tail
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _record_timing(self, start: float, num_pairs: int):
+        """Updates the running per-pair cost of the forward pass (exponential average)."""
+        per_pair = (time.perf_counter() - start) * 1000 / num_pairs
+        with self._stats_lock:
+            previous = self.stats["ms_per_pair"]
+            self.stats["ms_per_pair"] = round(per_pair if previous is None else 0.8 * previous + 0.2 * per_pair, 4)
+
+    def report(self) -> dict:
+        """A consistent copy of the stats plus the mean ms per call."""
+        with self._stats_lock:
+            report = dict(self.stats)
+        calls = report["calls"] or 1
+        report["mean_ms"] = round(report["total_ms"] / calls, 3)
+        return report
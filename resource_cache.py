@@ -0,0 +1,212 @@
+"""
+title: Resource Cache
+description: Process-wide cache for the expensive, read-only resources behind the RecSys section: the semantic
+             retrievers, the merged project metadata and the code-sample metadata. Entries are keyed by the
+             content of the files they are built from (sha256, recomputed only when a file's mtime or size
+             changes), so reruns and new sessions reuse them until the underlying JSON really changes, and
+             touching a file without editing it costs one os.stat. The cache lives in st.cache_resource, which
+             is shared by every session and survives Streamlit's module reloads. Hit/miss counters are kept per
+             resource, and invalidate() drops entries explicitly.
+"""
+
+import os
+import time
+import hashlib
+import importlib
+import logging
+import threading
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+MISSING_FILE = "missing"
+
+
+#
+# (1) file fingerprints
+#
+class FileFingerprints:
+    """
+    Content hashes of files, recomputed only when (mtime_ns, size) changes.
+    """
+
+    def __init__(self):
+        self._known = {}  # path -> ((mtime_ns, size), sha256)
+        self._lock = threading.Lock()
+
+    def fingerprint(self, path: str) -> str:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return MISSING_FILE
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            known = self._known.get(path)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._known[path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    def forget(self):
+        with self._lock:
+            self._known.clear()
+
+
+#
+# (2) cache
+#
+class ResourceCache:
+    """
+    Builds each named resource once per fingerprint of its source files.
+
+    A resource is rebuilt when the content of any of its files changes (or a file appears or
+    disappears); the previous entry is replaced. Cached objects are shared by every session and
+    must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.fingerprints = FileFingerprints()
+        self._entries = {}  # name -> (key, value)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _stats_for(self, name: str) -> dict:
+        return self.stats.setdefault(name, {"hits": 0, "misses": 0, "build_seconds": 0.0})
+
+    def key_for(self, paths=()) -> tuple:
+        """Content fingerprint of `paths`, in order."""
+        return tuple(self.fingerprints.fingerprint(path) for path in paths)
+
+    def get_or_build(self, name: str, builder, paths=()):
+        """
+        Returns the cached resource `name`, building it with `builder()` when it is absent or
+        when the files in `paths` changed since it was built.
+
+        Args:
+            name (str): Resource name (also the stats key).
+            builder (callable): Zero-argument constructor of the resource.
+            paths (iterable): Files the resource is derived from; empty for resources that never go stale.
+        """
+        key = self.key_for(paths)
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        # Sessions asking for the same resource wait for one build instead of racing
+        with lock:
+            entry = self._entries.get(name)
+            stats = self._stats_for(name)
+            if entry is not None and entry[0] == key:
+                stats["hits"] += 1
+                return entry[1]
+
+            stats["misses"] += 1
+            start = time.perf_counter()
+            value = builder()
+            stats["build_seconds"] = round(stats["build_seconds"] + time.perf_counter() - start, 4)
+            self._entries[name] = (key, value)
+            logger.info(f"Built resource '{name}' in {time.perf_counter() - start:.3f}s")
+            return value
+
+    def invalidate(self, name: str = None):
+        """Drops one resource (or all of them) so the next request rebuilds it from disk."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self.fingerprints.forget()
+            else:
+                self._entries.pop(name, None)
+        logger.info(f"Invalidated resource cache: {name or 'all'}")
+
+    def report(self) -> dict:
+        """Per-resource counters plus the hit ratio."""
+        report = {}
+        for name, stats in self.stats.items():
+            requests = stats["hits"] + stats["misses"]
+            report[name] = {**stats, "hit_ratio": round(stats["hits"] / requests, 4) if requests else 0.0}
+        return report
+
+
+@st.cache_resource(show_spinner=False)
+def get_resource_cache() -> ResourceCache:
+    """The process-wide cache, shared by every session."""
+    return ResourceCache()
+
+
+#
+# (3) portfolio resources
+#
+def cached_retriever(source_dir: str, model_name: str = "all-MiniLM-L6-v2", **options):
+    """
+    A SemanticRetriever shared across sessions.
+
+    Retrievers hot-reload their indexes from the build manifest themselves, so the entry never
+    goes stale; one is kept per (source_dir, model_name, options).
+    """
+    from semantic_retriever import SemanticRetriever
+
+    name = f"retriever:{source_dir}:{model_name}:" + ",".join(f"{k}={v}" for k, v in sorted(options.items()))
+    return get_resource_cache().get_or_build(name, lambda: SemanticRetriever(source_dir, model_name, **options))
+
+
+def _repos_metadata_sources() -> tuple:
+    import app_end_metadata
+    from git_api_utils import REPOS_METADATA_FILE
+    return (REPOS_METADATA_FILE, app_end_metadata.__file__)
+
+
+def _reload_app_metadata_if_changed():
+    """
+    Reloads app_end_metadata when its source changed since it was imported (or last reloaded).
+
+    The app metadata is Python source, so a new file hash only reaches combine() once the
+    imported module is re-executed. The hash it was loaded at is kept on the module itself.
+    """
+    import app_end_metadata
+    fingerprint = get_resource_cache().fingerprints.fingerprint(app_end_metadata.__file__)
+    loaded_at = getattr(app_end_metadata, "_source_fingerprint", None)
+    if loaded_at is not None and loaded_at != fingerprint:
+        app_end_metadata = importlib.reload(app_end_metadata)
+        logger.info("Reloaded app_end_metadata after its source changed")
+    app_end_metadata._source_fingerprint = fingerprint
+
+
+def _modules_metadata_sources() -> tuple:
+    from git_api_utils import MODULES_METADATA_FILE
+    return (MODULES_METADATA_FILE,)
+
+
+def metadata_fingerprint() -> tuple:
+    """Content fingerprint of every file the section metadata is built from."""
+    return get_resource_cache().key_for(_repos_metadata_sources() + _modules_metadata_sources())
+
+
+def cached_repos_metadata(combine) -> list:
+    """
+    GitHub project metadata merged with the app metadata, with item ids assigned.
+
+    Args:
+        combine (callable): Produces the merged list (rec_sys.combine_metadata); it must read the
+            app metadata through the app_end_metadata module so a reload is seen.
+    """
+    from git_api_utils import assign_item_ids
+
+    def build():
+        _reload_app_metadata_if_changed()
+        return assign_item_ids(combine(), "repos")
+
+    return get_resource_cache().get_or_build("repos_metadata", build, _repos_metadata_sources())
+
+
+def cached_modules_metadata() -> list:
+    """Code-sample metadata, with item ids assigned."""
+    from git_api_utils import assign_item_ids, load_modules_metadata
+    return get_resource_cache().get_or_build(
+        "metadata_list", lambda: assign_item_ids(load_modules_metadata(), "modules"), _modules_metadata_sources()
+    )
@@ -0,0 +1,445 @@
+"""
+title: Retrieval Evaluation
+description: Measures the project and code-sample retrievers against the versioned golden set in
+             retrieval_golden_set.json. For each suite it reports recall@k, MRR and nDCG@k, along with cold latency
+             (fresh retriever: lazy index opening, empty query cache) and warm latency (indexes open, query vectors
+             cached) at p50/p95, and checks that the golden set's unrelated (negative) queries match nothing above
+             the similarity cut-off the app applies. The output is a JSON report with stable key order. Two reports, e.g. from
+             before and after an index rebuild, can be diffed directly or compared with --baseline. With the code
+             suite, the code grid's query pipelines (lexical, semantic, hybrid, hybrid + MMR, hybrid + cross-encoder)
+             are also run through RecommendationSystem.rank_items and scored side by side with their latency, and
+             the cross-encoder's nDCG/recall gain over plain hybrid is reported against the latency it adds.
+
+Usage:
+    python retrieval_eval.py                                  # both suites, report to stdout
+    python retrieval_eval.py --output eval_report.json        # write the report
+    python retrieval_eval.py --baseline eval_report.json      # print metric deltas against an older report
+    python retrieval_eval.py --suite code --pipeline lexical --pipeline hybrid   # compare two pipelines
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ann_index import index_type_of
+from encoder_registry import encoder_stats
+from query_cache import QueryEmbeddingCache
+from lexical_index import BM25Index
+from encoder_backends import encoder_key
+from semantic_retriever import SemanticRetriever
+
+logger = logging.getLogger(__name__)
+
+GOLDEN_SET_FILE = "retrieval_golden_set.json"
+DEFAULT_K_VALUES = (1, 3, 5, 10)
+
+# How each suite's retriever is built and cut off (mirrors the instances and the
+# MIN_PROJECT_SIMILARITY / MIN_CODE_SIMILARITY thresholds in rec_sys)
+SUITES = {
+    "projects": {"source_dir": "new_project_embeddings", "storage": "grouped", "min_score": 0.25},
+    "code": {"source_dir": "new_samples_embeddings", "storage": "consolidated", "min_score": 0.25, "lexical": True},
+}
+
+# Query pipelines of the code grid, run end to end through rec_sys.RecommendationSystem.rank_items
+# (constructor arguments per pipeline), so the app's fusion and re-ranking stages are scored as served
+PIPELINES = {
+    "lexical": {"retrieval_mode": "lexical"},
+    "semantic": {"retrieval_mode": "semantic"},
+    "hybrid": {"retrieval_mode": "hybrid"},
+    "hybrid+mmr": {"retrieval_mode": "hybrid", "diversity_lambda": 0.7},
+    "hybrid+cross_encoder": {"retrieval_mode": "hybrid", "cross_encoder": True},
+}
+PIPELINE_SUITE = "code"
+
+
+#
+# (1) golden set
+#
+def load_golden_set(path: str = GOLDEN_SET_FILE) -> dict:
+    """Loads the golden set and checks that every case has a query and at least one relevant id."""
+    with open(path, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    for suite, cases in golden["suites"].items():
+        for case in cases:
+            if not case.get("query") or not case.get("relevant"):
+                raise ValueError(f"Golden set case in '{suite}' needs a query and relevant ids: {case}")
+    return golden
+
+
+#
+# (2) metrics
+#
+def first_relevant_rank(retrieved_ids: list, relevant: set):
+    """1-based rank of the first relevant id, or None."""
+    for rank, item_id in enumerate(retrieved_ids, start=1):
+        if item_id in relevant:
+            return rank
+    return None
+
+
+def recall_at_k(retrieved_ids: list, relevant: set, k: int) -> float:
+    return len(set(retrieved_ids[:k]) & relevant) / len(relevant)
+
+
+def ndcg_at_k(retrieved_ids: list, relevant: set, k: int) -> float:
+    """Binary-relevance nDCG."""
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, item_id in enumerate(retrieved_ids[:k], start=1) if item_id in relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return dcg / ideal
+
+
+def aggregate_metrics(per_query: list, k_values=DEFAULT_K_VALUES) -> dict:
+    """Mean MRR, recall@k and nDCG@k over per-query results holding `relevant` and `retrieved` ids."""
+    metrics = {"mrr": 0.0}
+    for k in k_values:
+        metrics[f"recall@{k}"] = 0.0
+        metrics[f"ndcg@{k}"] = 0.0
+    for result in per_query:
+        relevant = set(result["relevant"])
+        rank = result["first_relevant_rank"]
+        metrics["mrr"] += 1.0 / rank if rank else 0.0
+        for k in k_values:
+            metrics[f"recall@{k}"] += recall_at_k(result["retrieved"], relevant, k)
+            metrics[f"ndcg@{k}"] += ndcg_at_k(result["retrieved"], relevant, k)
+    return {key: round(value / len(per_query), 4) for key, value in metrics.items()}
+
+
+def _percentiles(timings_ms: list) -> dict:
+    return {
+        "p50_ms": round(float(np.percentile(timings_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings_ms, 95)), 3),
+        "mean_ms": round(float(np.mean(timings_ms)), 3),
+    }
+
+
+#
+# (3) evaluation
+#
+def index_fingerprint(source_dir: str) -> str:
+    """Short content hash of the root index, identifying the build a report was produced from."""
+    digest = hashlib.sha256()
+    with open(os.path.join(source_dir, "projects.index"), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _timed_search(retriever, case, top_k):
+    start = time.perf_counter()
+    hits = retriever.search(case["query"], top_k=top_k, group=case.get("group"))
+    return (time.perf_counter() - start) * 1000, [item.get("id") for item in hits]
+
+
+def evaluate_negatives(retriever, queries: list, min_score: float, top_k: int, lexical_index=None, items=None) -> dict:
+    """
+    Unrelated queries that still match something (there should be none): dense hits above
+    `min_score` and, for suites the app also matches with BM25, lexical hits over `items`.
+    """
+    false_positives = []
+    for query in queries:
+        hits = retriever.search_with_scores(query, top_k=top_k, min_score=min_score)
+        lexical_hits = lexical_index.search(query, top_k=top_k) if lexical_index is not None else []
+        if hits or lexical_hits:
+            false_positives.append({
+                "query": query,
+                "hits": [[item.get("id"), round(float(score), 4)] for item, score, _ in hits],
+                "lexical_hits": [[items[position].get("id"), round(score, 4)] for position, score in lexical_hits],
+            })
+    return {"queries": len(queries), "min_score": min_score, "false_positives": false_positives}
+
+
+def evaluate_suite(name: str, cases: list, k_values=DEFAULT_K_VALUES, warm_repeats: int = 3,
+                   model_name: str = "all-MiniLM-L6-v2", backend: str = None, negatives=()) -> dict:
+    """
+    Runs every case of a suite through a freshly built retriever.
+
+    The cold pass uses a new retriever with an empty, memory-only query cache, so each query pays
+    encoding and, for its group, index opening. Warm passes repeat the queries on the same instance.
+    Encoder loading is excluded from both (it is reported in `encoder`). `negatives` are then
+    searched with the suite's min_score and any hit is reported as a false positive.
+
+    Raises:
+        ValueError: If a relevant id is not in the corpus under evaluation, since such a case could
+            never be retrieved and would silently lower every metric.
+    """
+    config = SUITES[name]
+    top_k = max(k_values)
+
+    # Load the encoder before timing anything
+    SemanticRetriever(config["source_dir"], model_name, query_cache=False, backend=backend).model.encode(["warm-up"])
+
+    cache = QueryEmbeddingCache(encoder_key(model_name, backend), path=None)
+    retriever = SemanticRetriever(
+        config["source_dir"], model_name, query_cache=cache, storage=config["storage"], backend=backend
+    )
+
+    indexed_ids = {item.get("id") for item in retriever._get_metadata(None).values()}
+    missing = sorted({item_id for case in cases for item_id in case["relevant"]} - indexed_ids)
+    if missing:
+        raise ValueError(f"{name}: relevant ids absent from {config['source_dir']}: {missing}")
+
+    cold_ms, per_query = [], []
+    for case in cases:
+        elapsed, retrieved = _timed_search(retriever, case, top_k)
+        cold_ms.append(elapsed)
+        relevant = set(case["relevant"])
+        per_query.append({
+            "query": case["query"],
+            "group": case.get("group"),
+            "relevant": case["relevant"],
+            "retrieved": retrieved,
+            "first_relevant_rank": first_relevant_rank(retrieved, relevant),
+        })
+
+    warm_ms = []
+    for _ in range(warm_repeats):
+        for case in cases:
+            warm_ms.append(_timed_search(retriever, case, top_k)[0])
+
+    metrics = aggregate_metrics(per_query, k_values)
+
+    items = list(retriever._get_metadata(None).values())
+    lexical_index = BM25Index(items) if config.get("lexical") else None
+    negative_report = evaluate_negatives(retriever, list(negatives), config["min_score"], top_k, lexical_index, items)
+    if negative_report["false_positives"]:
+        logger.warning(f"{name}: unrelated queries matched: {[fp['query'] for fp in negative_report['false_positives']]}")
+
+    index = retriever._get_index(None)
+
+    return {
+        "index": {
+            "source_dir": config["source_dir"],
+            "storage": config["storage"],
+            "type": index_type_of(index),
+            "vectors": int(index.ntotal),
+            "fingerprint": index_fingerprint(config["source_dir"]),
+        },
+        "cases": len(cases),
+        "metrics": metrics,
+        "latency": {"cold": _percentiles(cold_ms), "warm": _percentiles(warm_ms)},
+        "negatives": negative_report,
+        "per_query": per_query,
+    }
+
+
+def _timed_rank(recsys, case):
+    start = time.perf_counter()
+    ranked = recsys.rank_items(case["query"], case.get("group"))
+    return (time.perf_counter() - start) * 1000, [item.get("id") for item in ranked]
+
+
+def evaluate_pipelines(cases: list, k_values=DEFAULT_K_VALUES, warm_repeats: int = 3,
+                       model_name: str = "all-MiniLM-L6-v2", backend: str = None, pipelines=None) -> dict:
+    """
+    Scores the code-grid query pipelines (lexical, semantic, hybrid, and hybrid followed by MMR or
+    the cross-encoder) side by side on the code suite.
+
+    Each pipeline is a RecommendationSystem built over the app's catalog (RecSysCatalog) and the
+    consolidated code retriever, returning `max(k_values)` items, so matching, fusion and
+    re-ranking run exactly as in `rank_items`. All pipelines share one warm retriever and query
+    cache; latency is measured over `warm_repeats` passes after the scored one, so it shows what
+    each stage adds on top of retrieval rather than index opening or encoding.
+
+    Raises:
+        ValueError: If a relevant id is not in the catalog.
+    """
+    # rec_sys pulls in the Streamlit front end; only load it when pipelines are evaluated
+    from rec_sys import RecommendationSystem
+
+    config = SUITES[PIPELINE_SUITE]
+    top_k = max(k_values)
+    retriever = SemanticRetriever(
+        config["source_dir"], model_name, storage=config["storage"], backend=backend,
+        query_cache=QueryEmbeddingCache(encoder_key(model_name, backend), path=None),
+    )
+
+    results = {}
+    for name in pipelines or PIPELINES:
+        recsys = RecommendationSystem(
+            semantic_code_retriever=retriever, num_recommended_items=top_k,
+            min_code_similarity=config["min_score"], **PIPELINES[name]
+        )
+        if not results:
+            catalog_ids = set(recsys.catalog.item_positions)
+            missing = sorted({item_id for case in cases for item_id in case["relevant"]} - catalog_ids)
+            if missing:
+                raise ValueError(f"{PIPELINE_SUITE}: relevant ids absent from the catalog: {missing}")
+        if recsys.cross_encoder is not None:
+            recsys.cross_encoder.wait_until_ready()
+        for case in cases:
+            recsys.rank_items(case["query"], case.get("group"))  # Warm the query cache and item vectors
+
+        per_query = []
+        for case in cases:
+            _, retrieved = _timed_rank(recsys, case)
+            per_query.append({
+                "relevant": case["relevant"],
+                "retrieved": retrieved,
+                "first_relevant_rank": first_relevant_rank(retrieved, set(case["relevant"])),
+            })
+        warm_ms = [_timed_rank(recsys, case)[0] for _ in range(max(warm_repeats, 1)) for case in cases]
+        results[name] = {
+            "config": dict(PIPELINES[name]),
+            "metrics": aggregate_metrics(per_query, k_values),
+            "latency": {"warm": _percentiles(warm_ms)},
+        }
+        if recsys.cross_encoder is not None:
+            # Whether the stage actually re-ranked (or was skipped/abandoned on its budget)
+            results[name]["reranker"] = recsys.cross_encoder.report()
+    return results
+
+
+def cross_encoder_tradeoff(pipelines: dict, k_values=DEFAULT_K_VALUES,
+                           base: str = "hybrid", reranked: str = "hybrid+cross_encoder") -> dict:
+    """
+    Relevance the cross-encoder adds on the golden set against the latency it costs: nDCG@k and
+    recall@k with and without the stage, the warm p50/p95 added, and nDCG@k gained per added ms.
+    Returns None unless both pipelines were evaluated.
+    """
+    if base not in pipelines or reranked not in pipelines:
+        return None
+    k = max(k_values)
+    plain, reranked_run = pipelines[base], pipelines[reranked]
+    tradeoff = {"baseline": base, "pipeline": reranked}
+    for key in ("mrr", f"ndcg@{k}", f"recall@{k}"):
+        tradeoff[key] = {
+            "without": plain["metrics"][key],
+            "with": reranked_run["metrics"][key],
+            "delta": round(reranked_run["metrics"][key] - plain["metrics"][key], 4),
+        }
+    for key in ("p50_ms", "p95_ms"):
+        tradeoff[f"added_{key}"] = round(reranked_run["latency"]["warm"][key] - plain["latency"]["warm"][key], 3)
+    added_ms = tradeoff["added_p50_ms"]
+    tradeoff[f"ndcg@{k}_per_ms"] = round(tradeoff[f"ndcg@{k}"]["delta"] / added_ms, 6) if added_ms > 0 else None
+    tradeoff["applied"] = reranked_run.get("reranker", {}).get("applied")
+    return tradeoff
+
+
+def build_report(golden: dict, suites=None, k_values=DEFAULT_K_VALUES, warm_repeats: int = 3,
+                 model_name: str = "all-MiniLM-L6-v2", backend: str = None, pipelines=None) -> dict:
+    """Evaluates the requested suites (all by default), and the code-grid pipelines with the code suite, into one report."""
+    report = {
+        "golden_set_version": golden["version"],
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "model": encoder_key(model_name, backend),
+        "k_values": list(k_values),
+        "suites": {},
+    }
+    for name in suites or golden["suites"]:
+        report["suites"][name] = evaluate_suite(
+            name, golden["suites"][name], k_values, warm_repeats, model_name, backend, golden.get("negatives", ())
+        )
+    if PIPELINE_SUITE in report["suites"] and pipelines != []:
+        report["pipelines"] = evaluate_pipelines(
+            golden["suites"][PIPELINE_SUITE], k_values, warm_repeats, model_name, backend, pipelines
+        )
+        tradeoff = cross_encoder_tradeoff(report["pipelines"], k_values)
+        if tradeoff is not None:
+            report["cross_encoder"] = tradeoff
+    report["encoder"] = encoder_stats().get(encoder_key(model_name, backend), {})
+    return report
+
+
+def compare_reports(current: dict, baseline: dict) -> list:
+    """Lines describing metric and latency changes between two reports."""
+    lines = []
+    if current["golden_set_version"] != baseline["golden_set_version"]:
+        lines.append(f"golden set changed: {baseline['golden_set_version']} -> {current['golden_set_version']}")
+    for name, suite in current["suites"].items():
+        old = baseline["suites"].get(name)
+        if old is None:
+            continue
+        for key, value in suite["metrics"].items():
+            before = old["metrics"].get(key)
+            if before is not None:
+                lines.append(f"{name:<9}{key:<11}{before:>8.4f} -> {value:<8.4f}({value - before:+.4f})")
+        if "negatives" in suite and "negatives" in old:
+            before, value = len(old["negatives"]["false_positives"]), len(suite["negatives"]["false_positives"])
+            lines.append(f"{name:<9}{'neg. FP':<11}{before:>8} -> {value:<8}({value - before:+d})")
+        for phase in ("cold", "warm"):
+            for key in ("p50_ms", "p95_ms"):
+                before, value = old["latency"][phase][key], suite["latency"][phase][key]
+                lines.append(f"{name:<9}{phase + ' ' + key:<11}{before:>8.3f} -> {value:<8.3f}({value - before:+.3f})")
+    for name, pipeline in current.get("pipelines", {}).items():
+        old = baseline.get("pipelines", {}).get(name)
+        if old is None:
+            continue
+        for key in ("mrr", "ndcg@5", "recall@5"):
+            before, value = old["metrics"].get(key), pipeline["metrics"].get(key)
+            if before is not None and value is not None:
+                lines.append(f"{name:<22}{key:<11}{before:>8.4f} -> {value:<8.4f}({value - before:+.4f})")
+        before, value = old["latency"]["warm"]["p50_ms"], pipeline["latency"]["warm"]["p50_ms"]
+        lines.append(f"{name:<22}{'warm p50_ms':<11}{before:>8.3f} -> {value:<8.3f}({value - before:+.3f})")
+    return lines
+
+
+def pipeline_table(pipelines: dict, k_values=DEFAULT_K_VALUES) -> list:
+    """Lines comparing the pipelines side by side: MRR, nDCG@k and recall@k, and warm p50/p95 latency."""
+    k = max(k_values)
+    lines = [f"{'pipeline':<22}{'mrr':>8}{f'ndcg@{k}':>10}{f'recall@{k}':>11}{'p50_ms':>10}{'p95_ms':>10}"]
+    for name, pipeline in pipelines.items():
+        metrics, warm = pipeline["metrics"], pipeline["latency"]["warm"]
+        lines.append(
+            f"{name:<22}{metrics['mrr']:>8.4f}{metrics[f'ndcg@{k}']:>10.4f}{metrics[f'recall@{k}']:>11.4f}"
+            f"{warm['p50_ms']:>10.3f}{warm['p95_ms']:>10.3f}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency on the golden set.")
+    parser.add_argument("--golden", default=GOLDEN_SET_FILE)
+    parser.add_argument("--suite", action="append", choices=list(SUITES), help="Suite to run (repeatable)")
+    parser.add_argument("--k", type=int, action="append", help="Cut-off for recall/nDCG (repeatable)")
+    parser.add_argument("--warm-repeats", type=int, default=3)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backend", default=None, help="Encoder backend (see encoder_backends)")
+    parser.add_argument("--pipeline", action="append", choices=list(PIPELINES),
+                        help="Code-grid pipeline to score with the code suite (repeatable; default: all)")
+    parser.add_argument("--no-pipelines", action="store_true", help="Skip the code-grid pipeline comparison")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    golden = load_golden_set(args.golden)
+    report = build_report(
+        golden, args.suite, tuple(sorted(set(args.k))) if args.k else DEFAULT_K_VALUES,
+        args.warm_repeats, args.model, args.backend, [] if args.no_pipelines else args.pipeline
+    )
+
+    serialized = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(serialized + "\n")
+    else:
+        print(serialized)
+    if "pipelines" in report:
+        print("\n".join(pipeline_table(report["pipelines"], report["k_values"])), file=sys.stderr)
+    if "cross_encoder" in report:
+        tradeoff, k = report["cross_encoder"], max(report["k_values"])
+        print(
+            f"cross-encoder: ndcg@{k} {tradeoff[f'ndcg@{k}']['without']:.4f} -> {tradeoff[f'ndcg@{k}']['with']:.4f}, "
+            f"recall@{k} {tradeoff[f'recall@{k}']['without']:.4f} -> {tradeoff[f'recall@{k}']['with']:.4f}, "
+            f"+{tradeoff['added_p50_ms']:.3f} ms p50 (+{tradeoff['added_p95_ms']:.3f} ms p95), "
+            f"applied on {tradeoff['applied']} calls",
+            file=sys.stderr,
+        )
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare_reports(report, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,82 +41,627 @@ Usage Example:
     retriever = SemanticRetriever("index.faiss", "metadata.json")
     results = retriever.search("data visualization")
 
+    # One index for the whole corpus, filtered per group at search time
+    code_retriever = SemanticRetriever("new_samples_embeddings", storage="consolidated")
+    results = code_retriever.search("data visualization", group="monkey_research")
+
 Author: Your Name
 """
 
 
 import os
 import json
+import time
+import heapq
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from ann_index import configure_search, enable_reconstruct, search_parameters
+from encoder_backends import encoder_key
+from metadata_store import MetadataStore, load_metadata
+from encoder_registry import encoder_registry
+from query_cache import get_query_cache
 
+logger = logging.getLogger(__name__)
 
-class SemanticRetriever:
-    def __init__(self, source_dir: str, model_name: str = "all-MiniLM-L6-v2"):
-        """
-        Initializes the semantic retriever.
+# Memory-map flat codes where supported (faiss >= 1.9), otherwise fall back to the generic mmap flag
+MMAP_READ_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | getattr(faiss, "IO_FLAG_READ_ONLY", 0)
 
-        Args:
-            source_dir (str): Directory containing FAISS index and metadata files.
-                              May include subdirectories representing groups.
-            model_name (str): Name of the sentence-transformers model to use.
-        """
-        self.model = SentenceTransformer(model_name)
+
+# Written last by the index builder; a new version triggers a hot reload
+MANIFEST_FILE = "manifest.json"
+RELOAD_INTERVAL_SECONDS = float(os.getenv("RETRIEVER_RELOAD_INTERVAL", "10"))
+
+# Shared pool for cross-group fan-out searches, created on first use
+FAN_OUT_WORKERS = int(os.getenv("RETRIEVER_FAN_OUT_WORKERS", "8"))
+_fan_out_pool = None
+_fan_out_lock = threading.Lock()
+
+
+def _fan_out_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide thread pool used by `search_all_groups`."""
+    global _fan_out_pool
+    if _fan_out_pool is None:
+        with _fan_out_lock:
+            if _fan_out_pool is None:
+                _fan_out_pool = ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS, thread_name_prefix="retriever-fan-out")
+    return _fan_out_pool
+
+
+def read_index_mmap(index_path: str):
+    """
+    Reads a FAISS index memory-mapped and read-only, falling back to a regular read when the
+    index type does not support mapping.
+    """
+    try:
+        return faiss.read_index(index_path, MMAP_READ_FLAGS)
+    except RuntimeError as e:
+        logger.warning(f"Could not memory-map {index_path} ({e}); reading it into memory instead.")
+        return faiss.read_index(index_path)
+
+
+class IndexSnapshot:
+    """
+    One immutable build of an embeddings directory: its groups, indexes and metadata.
+
+    Indexes and metadata are still opened lazily, group by group, but always from the files this
+    snapshot was created for. A retriever swaps in a new snapshot when the manifest changes; searches
+    that already hold the old one finish against it, and replaced files stay readable because
+    os.replace leaves the old inodes in place for as long as they are open or mapped.
+    """
+
+    def __init__(self, source_dir: str, storage: str, group_field: str, ef_search: int = None,
+                 nprobe: int = None, manifest: dict = None):
+        self.source_dir = source_dir
+        self.storage = storage
+        self.group_field = group_field
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self.manifest = manifest
+        self.version = (manifest or {}).get("version")
+
+        # Groups are discovered here but only opened on their first search
+        self.group_paths = self._discover_groups(source_dir)
+        if storage == "consolidated":
+            if None not in self.group_paths:
+                raise ValueError(f"Consolidated storage needs a root projects.index in '{source_dir}'.")
+            self.group_paths = {None: self.group_paths[None]}
         self.group_to_index = {}
         self.group_to_metadata = {}
+        self._group_members = None
+        self._group_selectors = {}
+        self._id_rows = None
+        self._open_lock = threading.Lock()
 
+    @staticmethod
+    def _discover_groups(source_dir: str) -> dict:
+        """
+        Maps each group name (None for ungrouped data) to its (index_path, metadata_path) pair.
+        """
+        group_paths = {}
         for entry in os.listdir(source_dir):
             full_path = os.path.join(source_dir, entry)
             if os.path.isdir(full_path):  # grouped data
                 index_path = os.path.join(full_path, "projects.index")
                 metadata_path = os.path.join(full_path, "metadata.json")
                 if os.path.exists(index_path) and os.path.exists(metadata_path):
-                    self.group_to_index[entry] = faiss.read_index(index_path)
-                    with open(metadata_path, "r", encoding="utf-8") as f:
-                        self.group_to_metadata[entry] = json.load(f)
+                    group_paths[entry] = (index_path, metadata_path)
             elif entry == "projects.index":  # ungrouped data
-                index_path = os.path.join(source_dir, "projects.index")
-                metadata_path = os.path.join(source_dir, "metadata.json")
-                self.group_to_index[None] = faiss.read_index(index_path)
-                with open(metadata_path, "r", encoding="utf-8") as f:
-                    self.group_to_metadata[None] = json.load(f)
+                group_paths[None] = (
+                    os.path.join(source_dir, "projects.index"),
+                    os.path.join(source_dir, "metadata.json"),
+                )
+        return group_paths
+
+    @property
+    def groups(self) -> list:
+        """Names of the groups available for search."""
+        if self.storage == "consolidated":
+            return [None] + list(self.group_members().keys())
+        return list(self.group_paths.keys())
+
+    @property
+    def opened_groups(self) -> list:
+        """Groups whose index has been opened."""
+        return list(self.group_to_index.keys())
+
+    def group_members(self) -> dict:
+        """
+        Consolidated mode: maps each group to the vector ids it owns.
+
+        Uses the `groups.json` written by the index builder when present ({group: [start, end)}
+        ranges), otherwise derives the ids from the group field of the root metadata.
+        """
+        if self._group_members is not None:
+            return self._group_members
+
+        groups_path = os.path.join(self.source_dir, "groups.json")
+        if os.path.exists(groups_path):
+            with open(groups_path, "r", encoding="utf-8") as f:
+                members = {group: tuple(bounds) for group, bounds in json.load(f)["groups"].items()}
+        else:
+            ids_by_group = {}
+            for row, group in enumerate(self._field_values(self.group_field)):
+                ids_by_group.setdefault(group, []).append(row)
+            members = {}
+            for group, ids in ids_by_group.items():
+                ids.sort()
+                contiguous = ids[-1] - ids[0] + 1 == len(ids)
+                members[group] = (ids[0], ids[-1] + 1) if contiguous else np.array(ids, dtype="int64")
+
+        self._group_members = members
+        return members
+
+    def search_params(self, group):
+        """
+        Consolidated mode: FAISS search parameters restricting candidates to one group.
+
+        Contiguous groups use an IDSelectorRange; scattered ones an IDSelectorBatch. Returns None
+        for an unrestricted search over the whole corpus.
+        """
+        if group is None:
+            return None
+        cached = self._group_selectors.get(group)
+        if cached is None:
+            members = self.group_members()
+            if group not in members:
+                raise ValueError(f"Group '{group}' not found. Available groups: {self.groups}")
+            bounds = members[group]
+            if isinstance(bounds, tuple):
+                selector = faiss.IDSelectorRange(int(bounds[0]), int(bounds[1]))
+            else:
+                selector = faiss.IDSelectorBatch(bounds)
+            # Keep the selector alive alongside the parameters that point to it
+            params = search_parameters(self.get_index(None), selector)
+            cached = self._group_selectors[group] = (params, selector)
+        return cached[0]
+
+    def get_index(self, group):
+        """
+        Returns the FAISS index for a group, opening it on first use.
+
+        Indexes are memory-mapped read-only, so several worker processes on one host share the
+        same pages through the OS page cache. HNSW and IVF indexes get the retriever's
+        efSearch/nprobe settings; the root index also gets the IVF direct map `item_vectors` needs.
+        """
+        index = self.group_to_index.get(group)
+        if index is None:
+            with self._open_lock:
+                index = self.group_to_index.get(group)
+                if index is None:
+                    index = read_index_mmap(self.group_paths[group][0])
+                    index = configure_search(index, self.ef_search, self.nprobe)
+                    if group is None:
+                        index = enable_reconstruct(index)
+                    self.group_to_index[group] = index
+        return index
+
+    def get_metadata(self, group):
+        """
+        Returns the metadata for a group, loading it on first use.
+
+        A columnar metadata.store is memory-mapped and decoded row by row on access; without one,
+        or when it no longer matches metadata.json (by the size and checksum its header records),
+        metadata.json is parsed.
+        """
+        metadata = self.group_to_metadata.get(group)
+        if metadata is None:
+            with self._open_lock:
+                metadata = self.group_to_metadata.get(group)
+                if metadata is None:
+                    metadata = self.group_to_metadata[group] = load_metadata(self.group_paths[group][1])
+        return metadata
+
+    def _field_values(self, field: str) -> list:
+        """One field of every root row, in row order, without decoding whole rows when possible."""
+        metadata = self.get_metadata(None)
+        if isinstance(metadata, MetadataStore):
+            return metadata.column(field)
+        return [metadata[str(row)].get(field) for row in range(len(metadata))]
+
+    def id_rows(self) -> dict:
+        """Maps item id -> row of the root index, built on first use."""
+        if self._id_rows is None:
+            if None not in self.group_paths:
+                raise ValueError(f"Item vectors need a root projects.index in '{self.source_dir}'.")
+            self._id_rows = {
+                item_id: row for row, item_id in enumerate(self._field_values("id")) if item_id
+            }
+        return self._id_rows
+
+
+def read_manifest(source_dir: str):
+    """Returns the parsed manifest.json of an embeddings directory, or None if there is none."""
+    path = os.path.join(source_dir, MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def manifest_matches_files(source_dir: str, manifest: dict) -> bool:
+    """Whether every file listed in the manifest is present with the recorded checksum."""
+    for relative_path, checksum in manifest.get("files", {}).items():
+        try:
+            if file_sha256(os.path.join(source_dir, relative_path)) != checksum:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SemanticRetriever:
+    def __init__(self, source_dir: str, model_name: str = "all-MiniLM-L6-v2", query_cache=None,
+                 storage: str = "grouped", group_field: str = "repo_name", backend: str = None,
+                 ef_search: int = None, nprobe: int = None, reload_interval: float = RELOAD_INTERVAL_SECONDS):
+        """
+        Initializes the semantic retriever.
+
+        Args:
+            source_dir (str): Directory containing FAISS index and metadata files.
+                              May include subdirectories representing groups.
+            model_name (str): Name of the sentence-transformers model to use. The encoder is
+                              shared process-wide and only loaded on the first query.
+            query_cache (QueryEmbeddingCache, optional): Cache for query vectors. Defaults to the
+                              shared two-tier cache for this encoder; pass False to disable caching.
+            storage (str): "grouped" searches one index per group subdirectory. "consolidated" uses
+                           only the root index over the whole corpus and restricts a group search
+                           to that group's vectors with an ID selector.
+            group_field (str): Metadata field holding the group of each vector in consolidated mode.
+            backend (str, optional): Encoder backend: "torch" (sentence-transformers), "onnx" or
+                              "onnx-int8" (ONNX Runtime, no torch import). Defaults to the ENCODER_BACKEND
+                              environment variable.
+            ef_search (int, optional): efSearch for HNSW indexes (default ann_index.HNSW_EF_SEARCH).
+            nprobe (int, optional): Lists probed in IVF indexes (default ann_index.IVF_NPROBE).
+            reload_interval (float): Seconds between checks of `manifest.json` for a new build; a
+                              changed manifest swaps in the new indexes without a restart. Use
+                              None to disable hot reload.
+        """
+        if storage not in ("grouped", "consolidated"):
+            raise ValueError(f"Unknown storage mode '{storage}'. Use 'grouped' or 'consolidated'.")
+
+        self.model_name = model_name
+        self.backend = backend
+        # Vectors from different backends differ slightly, so each backend gets its own cache
+        self.query_cache = get_query_cache(encoder_key(model_name, backend)) if query_cache is None else query_cache
+        self.source_dir = source_dir
+        self.storage = storage
+        self.group_field = group_field
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
+        self._manifest_mtime = self._stat_manifest()
+        self._snapshot = self._new_snapshot(read_manifest(source_dir))
+
+    def _new_snapshot(self, manifest):
+        return IndexSnapshot(self.source_dir, self.storage, self.group_field, self.ef_search, self.nprobe, manifest)
+
+    def _stat_manifest(self):
+        try:
+            return os.stat(os.path.join(self.source_dir, MANIFEST_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @property
+    def snapshot(self) -> IndexSnapshot:
+        """
+        The current index snapshot. At most every `reload_interval` seconds this also checks whether
+        the builder published a new manifest; callers should read it once per search.
+        """
+        if self.reload_interval is not None and time.monotonic() - self._last_reload_check >= self.reload_interval:
+            # One thread checks; the others keep serving the current snapshot meanwhile
+            if self._reload_lock.acquire(blocking=False):
+                try:
+                    self._last_reload_check = time.monotonic()
+                    self.reload()
+                finally:
+                    self._reload_lock.release()
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swaps in a new snapshot if `manifest.json` changed and its checksums match the files on disk.
+
+        Groups opened in the current snapshot are opened in the new one before the swap, so the
+        first searches after a deploy do not pay index loading. The encoder and query cache are
+        untouched.
+
+        Returns:
+            bool: Whether a new snapshot was installed.
+        """
+        mtime = self._stat_manifest()
+        if mtime is None or (mtime == self._manifest_mtime and not force):
+            return False
+        manifest = read_manifest(self.source_dir)
+        current = self._snapshot
+        if manifest is None or (manifest.get("version") == current.version and not force):
+            self._manifest_mtime = mtime
+            return False
+        if not manifest_matches_files(self.source_dir, manifest):
+            # A build is still being written (or was interrupted); try again on the next check
+            logger.info(f"Manifest in {self.source_dir} does not match its files yet; keeping version {current.version}.")
+            return False
+        if manifest.get("model_name") not in (None, self.model_name):
+            logger.warning(
+                f"Index in {self.source_dir} was built with '{manifest['model_name']}', "
+                f"but queries are encoded with '{self.model_name}'."
+            )
+
+        try:
+            snapshot = self._new_snapshot(manifest)
+            for group in current.opened_groups:
+                if group in snapshot.group_paths:
+                    snapshot.get_index(group)
+                    snapshot.get_metadata(group)
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.error(f"Could not load version {manifest.get('version')} from {self.source_dir}: {e}")
+            return False
+
+        self._snapshot = snapshot
+        self._manifest_mtime = mtime
+        self.reloads += 1
+        logger.info(f"Swapped {self.source_dir} from version {current.version} to {snapshot.version}")
+        return True
+
+    @property
+    def version(self):
+        """Manifest version of the snapshot being served (None without a manifest)."""
+        return self._snapshot.version
+
+    @property
+    def group_paths(self) -> dict:
+        return self.snapshot.group_paths
+
+    @property
+    def groups(self) -> list:
+        """Names of the groups available for search."""
+        return self.snapshot.groups
+
+    def _get_index(self, group):
+        return self.snapshot.get_index(group)
+
+    def _get_metadata(self, group):
+        return self.snapshot.get_metadata(group)
+
+    @property
+    def model(self):
+        """The shared query encoder, loaded on first access."""
+        return encoder_registry.get(self.model_name, self.backend)
 
     def embed_query(self, text: str) -> np.ndarray:
         """
         Encodes a query string into a normalized vector.
 
+        Repeated queries are served from the query cache instead of re-running the encoder.
+
         Args:
             text (str): The user query.
 
         Returns:
             np.ndarray: A 1xD float32 array representing the query embedding.
         """
+        if not self.query_cache:
+            return self._encode(text)
+        return self.query_cache.get_or_compute(text, self._encode).reshape(1, -1)
+
+    def _encode(self, text: str) -> np.ndarray:
+        """Runs the encoder on a single query."""
         embedding = self.model.encode([text], normalize_embeddings=True)
         return embedding.astype("float32")
 
-    def search(self, query: str, top_k: int = 5, group: str = None) -> list:
+    def embed_queries(self, texts: list) -> np.ndarray:
         """
-        Searches for top-k items most similar to the input query.
+        Encodes several queries, running the encoder once over every query not already cached.
 
         Args:
-            query (str): User query string.
-            top_k (int): Number of top results to return.
-            group (str, optional): Group name to restrict search to. Defaults to None.
+            texts (list): Query strings.
 
         Returns:
-            list: A list of metadata dicts corresponding to the top-k results.
+            np.ndarray: An NxD float32 array, one row per query.
         """
-        if group not in self.group_to_index:
-            raise ValueError(f"Group '{group}' not found. Available groups: {list(self.group_to_index.keys())}")
+        cached = [self.query_cache.get(text) if self.query_cache else None for text in texts]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
 
-        index = self.group_to_index[group]
-        metadata = self.group_to_metadata[group]
-        query_vector = self.embed_query(query)
+        encoded = {}
+        if missing:
+            vectors = self.model.encode(missing, normalize_embeddings=True).astype("float32")
+            for text, vector in zip(missing, vectors):
+                encoded[text] = vector
+                if self.query_cache:
+                    self.query_cache.put(text, vector)
+
+        rows = [vector if vector is not None else encoded[text] for text, vector in zip(texts, cached)]
+        return np.vstack(rows).astype("float32") if rows else np.zeros((0, 0), dtype="float32")
+
+    def _search_vectors(self, query_vector: np.ndarray, top_k: int, group: str = None, snapshot=None):
+        """
+        Runs the FAISS search for already-encoded queries against one group of one snapshot.
+
+        Returns:
+            tuple: (similarities, indices, metadata), with FAISS distances converted to cosine
+                   similarities.
+        """
+        snapshot = snapshot or self.snapshot
+        if self.storage == "consolidated":
+            params = snapshot.search_params(group)
+            index = snapshot.get_index(None)
+            distances, indices = index.search(query_vector, top_k, params=params)
+            return self._as_similarity(distances, index), indices, snapshot.get_metadata(None)
+
+        if group not in snapshot.group_paths:
+            raise ValueError(f"Group '{group}' not found. Available groups: {snapshot.groups}")
+        index = snapshot.get_index(group)
         distances, indices = index.search(query_vector, top_k)
+        return self._as_similarity(distances, index), indices, snapshot.get_metadata(group)
+
+    @staticmethod
+    def _as_similarity(distances: np.ndarray, index) -> np.ndarray:
+        """
+        Converts FAISS distances to cosine similarities.
+
+        Inner-product indexes already return cosine similarity for normalized vectors; squared L2
+        distances between unit vectors map to it as 1 - d / 2.
+        """
+        if index.metric_type == faiss.METRIC_L2:
+            return 1.0 - distances / 2.0
+        return distances
+
+    def search_with_scores(self, query: str, top_k: int = 5, group: str = None, min_score: float = None) -> list:
+        """
+        Searches for top-k items and keeps their similarity scores.
+
+        Hits padded by FAISS (index -1, when the group holds fewer than top_k items) are dropped, as
+        are hits below `min_score`.
+
+        Args:
+            query (str): User query string.
+            top_k (int): Maximum number of results to return.
+            group (str, optional): Group name to restrict search to. Defaults to None, which searches
+                                   the ungrouped index (the whole corpus in consolidated mode).
+            min_score (float, optional): Minimum cosine similarity a hit needs to be returned.
+
+        Returns:
+            list: (item, score, rank) tuples, best first, with 1-based ranks.
+        """
+        query_vector = self.embed_query(query)
+        similarities, indices, metadata = self._search_vectors(query_vector, top_k, group)
+        return self._collect_hits(indices[0], similarities[0], metadata, min_score)
+
+    def item_vectors(self, item_ids: list) -> np.ndarray:
+        """
+        Stored vectors of items, looked up by id in the root index.
+
+        Args:
+            item_ids (list): Item ids (see git_api_utils.assign_item_ids).
+
+        Returns:
+            np.ndarray: An NxD float32 array aligned with `item_ids`; unknown ids get zero rows.
+        """
+        snapshot = self.snapshot
+        rows_by_id = snapshot.id_rows()
+        index = snapshot.get_index(None)
+        rows = np.array([rows_by_id.get(item_id, -1) for item_id in item_ids], dtype="int64")
+        vectors = np.zeros((len(item_ids), index.d), dtype="float32")
+        found = rows >= 0
+        if found.any():
+            vectors[found] = index.reconstruct_batch(rows[found])
+        return vectors
 
+    @staticmethod
+    def _collect_hits(indices, similarities, metadata, min_score: float = None) -> list:
+        """Turns one row of FAISS results into (item, score, rank) tuples."""
         results = []
-        for idx in indices[0]:
-            item = metadata[str(idx)]
-            results.append(item)
+        for idx, score in zip(indices, similarities):
+            if idx < 0:  # FAISS pads with -1 when fewer than top_k candidates exist
+                continue
+            if min_score is not None and score < min_score:
+                break  # Hits come sorted by similarity
+            results.append((metadata[str(idx)], float(score), len(results) + 1))
         return results
+
+    def search_many(self, queries: list, top_k: int = 5, groups=None, min_score: float = None) -> list:
+        """
+        Searches several queries at once.
+
+        All queries are encoded in one transformer batch, and queries that target the same group are
+        answered by a single batched FAISS search.
+
+        Args:
+            queries (list): Query strings.
+            top_k (int): Maximum number of results per query.
+            groups (str or list, optional): One group for every query, or a list aligned with
+                                            `queries`. Defaults to None (see `search`).
+            min_score (float, optional): Minimum cosine similarity a hit needs to be returned.
+
+        Returns:
+            list: One list of (item, score, rank) tuples per query, in the order of `queries`.
+        """
+        if not queries:
+            return []
+        if groups is None or isinstance(groups, str):
+            groups = [groups] * len(queries)
+        if len(groups) != len(queries):
+            raise ValueError(f"Got {len(groups)} groups for {len(queries)} queries.")
+
+        query_vectors = self.embed_queries(queries)
+
+        rows_by_group = {}
+        for row, group in enumerate(groups):
+            rows_by_group.setdefault(group, []).append(row)
+
+        snapshot = self.snapshot
+        results = [None] * len(queries)
+        for group, rows in rows_by_group.items():
+            similarities, indices, metadata = self._search_vectors(query_vectors[rows], top_k, group, snapshot)
+            for position, row in enumerate(rows):
+                results[row] = self._collect_hits(indices[position], similarities[position], metadata, min_score)
+        return results
+
+    def search_all_groups(self, query: str, top_k: int = 5, min_score: float = None) -> list:
+        """
+        Searches every group and merges the hits into a global top-k.
+
+        The query is embedded once; each group index is then searched on a shared thread pool (FAISS
+        releases the GIL during search), so latency stays close to that of a single-group search.
+        In consolidated mode the root index already spans all groups and is searched directly.
+
+        Args:
+            query (str): User query string.
+            top_k (int): Number of results to return across all groups.
+            min_score (float, optional): Minimum cosine similarity a hit needs to be returned.
+
+        Returns:
+            list: (item, score, rank) tuples, best first, with 1-based global ranks.
+        """
+        if self.storage == "consolidated":
+            return self.search_with_scores(query, top_k, None, min_score)
+
+        snapshot = self.snapshot
+        named_groups = [group for group in snapshot.group_paths if group is not None]
+        if not named_groups:
+            return self.search_with_scores(query, top_k, None, min_score)
+
+        query_vector = self.embed_query(query)
+
+        def search_group(group):
+            similarities, indices, metadata = self._search_vectors(query_vector, top_k, group, snapshot)
+            return self._collect_hits(indices[0], similarities[0], metadata, min_score)
+
+        per_group_hits = _fan_out_executor().map(search_group, named_groups)
+        merged = heapq.nlargest(
+            top_k,
+            (hit for hits in per_group_hits for hit in hits),
+            key=lambda hit: hit[1],
+        )
+        return [(item, score, rank) for rank, (item, score, _) in enumerate(merged, start=1)]
+
+    def search(self, query: str, top_k: int = 5, group: str = None) -> list:
+        """
+        Searches for top-k items most similar to the input query.
+
+        Args:
+            query (str): User query string.
+            top_k (int): Number of top results to return.
+            group (str, optional): Group name to restrict search to. Defaults to None, which searches
+                                   the ungrouped index (the whole corpus in consolidated mode).
+
+        Returns:
+            list: A list of metadata dicts corresponding to the top-k results.
+        """
+        return [item for item, _, _ in self.search_with_scores(query, top_k, group)]
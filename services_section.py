@@ -10,9 +10,10 @@ import random
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from front_end_for_recommended_content import html_for_item_data
+from front_end_for_recommended_content import html_for_item_data, item_card_signature
 from services_data_loader import load_service_items
 from portfolio_section import PortfolioSection
+from render_metrics import emit, instrumented_render
 
 # Load environment variables
 load_dotenv()
@@ -50,17 +51,20 @@ class ServicesSection(PortfolioSection):
         
         self.services = load_service_items()
         self.services_to_display = random.sample(self.services, OFFERINGS_SAMPLE_SIZE)  # Always random sample on init
+        # Card signatures once per service, so reruns go straight to the card cache
+        self.card_signatures = [item_card_signature(service) for service in self.services_to_display]
 
+    @instrumented_render
     def render(self):
         """Render the services section using Streamlit."""
         
         self._render_headers() # new style of rendering headers, comes from the portfolio section class
         
         # Display the SERVICE_LOGIC string for section-level context
-        st.markdown(self.SERVICE_LOGIC, unsafe_allow_html=True)
+        st.markdown(emit("markdown", self.SERVICE_LOGIC), unsafe_allow_html=True)
         
         # Space separator
-        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown(emit("markdown", "<br>"), unsafe_allow_html=True)
 
         # Render services
         services_area = st.container()
@@ -89,22 +93,22 @@ class ServicesSection(PortfolioSection):
             for i, service in enumerate(services_to_render):
                 with service_cols[i % 3]:
                     # Generate HTML using the shared item data structure
-                    service_html, tooltip_html, styles_html = html_for_item_data(service)
-                    st.markdown(service_html, unsafe_allow_html=True)
-                    st.markdown(tooltip_html, unsafe_allow_html=True)
-                    st.markdown(styles_html, unsafe_allow_html=True)
+                    service_html, tooltip_html, styles_html = html_for_item_data(service, signature=self.card_signatures[i])
+                    st.markdown(emit("markdown", service_html), unsafe_allow_html=True)
+                    st.markdown(emit("markdown", tooltip_html), unsafe_allow_html=True)
+                    st.markdown(emit("markdown", styles_html), unsafe_allow_html=True)
                   
                 # Add vertical spacing between rows (after every 3rd item)
                 if (i + 1) % 3 == 0 and i + 1 != len(services_to_render):
-                    st.markdown("<br><br>", unsafe_allow_html=True)  # Adding vertical margin between rows
+                    st.markdown(emit("markdown", "<br><br>"), unsafe_allow_html=True)  # Adding vertical margin between rows
     
     def display_rates_and_wages(self, 
                                 description="I am able to work as freelance or full-time contractor under very flexible arrangements. I typically deliver my work in advance of payment. Below are some reference parameters.",
                                 currency="USD"):
         """Display a section with the hourly rate and monthly compensation."""
-        st.markdown("### Rates and Expected Wages 💰")
+        st.markdown(emit("markdown", "### Rates and Expected Wages 💰"))
         st.markdown(
-            f'<p style="color: gray;">{description}</p>',  # Using f-string for dynamic insertion
+            emit("markdown", f'<p style="color: gray;">{description}</p>'),  # Using f-string for dynamic insertion
             unsafe_allow_html=True
         )
         
@@ -122,7 +126,7 @@ class ServicesSection(PortfolioSection):
     def display_info_component(self, label, value, style):
         """Display a simple info block with label and value."""
         st.markdown(
-            f'<div style="{style}"><strong>{label}</strong>: {value}</div>',
+            emit("markdown", f'<div style="{style}"><strong>{label}</strong>: {value}</div>'),
             unsafe_allow_html=True
         )
 
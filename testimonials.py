@@ -1,5 +1,6 @@
 from portfolio_section import PortfolioSection
 import streamlit as st
+from render_metrics import emit, instrumented_render
 
 class Testimonials(PortfolioSection):
     """
@@ -21,6 +22,7 @@ class Testimonials(PortfolioSection):
         super().__init__(title="Testimonials 💬", description="Feedback from colleagues and clients.")
         self.testimonials = testimonials
 
+    @instrumented_render
     def render(self):
         """Render the testimonials section."""
         self._render_headers()
@@ -28,7 +30,7 @@ class Testimonials(PortfolioSection):
 
         for testimonial in self.testimonials:
             with st.expander(f"⭐ {testimonial['name']} - {testimonial['role']}"):
-                st.markdown(f"_{testimonial['quote']}_")
+                st.markdown(emit("markdown", f"_{testimonial['quote']}_"))
 
 # Module-level instance of TestimonialsSection
 testimonials = Testimonials(
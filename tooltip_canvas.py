@@ -14,6 +14,7 @@ import time
 import streamlit as st
 from typing import Union, List
 from media_carrousel import html_for_media_carousel, dummy_media_list 
+from html_fragments import stable_id
          
 
 # Default tooltip content styling
@@ -45,9 +46,10 @@ class TooltipCanvas:
         :param tooltip_styles: Dictionary of CSS properties for .tc-tooltip-content.
         :param animation_styles: Dictionary to override tooltip animation styles.
         """
-        self.timestamp = int(time.time())  # Forces CSS refresh
         self.tooltip_styles = {**DEFAULT_TOOLTIP_STYLES, **(tooltip_styles or {})}
         self.animation_styles = {**DEFAULT_ANIMATION_STYLES, **(animation_styles or {})}
+        # Changes with the styles (not the clock), so the CSS is identical on every rerun and process
+        self.style_version = stable_id(self.tooltip_styles, self.animation_styles)
 
     
     def _define_tooltip(self, content: Union[str, List[Union[str, List[str]]]], element_id: str, visible_text: str = "Hover me") -> str:
@@ -94,8 +96,8 @@ class TooltipCanvas:
         tooltip_html = self._define_tooltip(content, element_id, visible_text)
         tooltip_css = self._generate_tooltip_css(element_id)
 
-        st.markdown(tooltip_css, unsafe_allow_html=True)
-        st.markdown(tooltip_html, unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_css), unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_html), unsafe_allow_html=True)
 
     def render_test_case(self):
         """Renders a test case for visual verification of tooltips with grid layout."""
@@ -127,7 +129,7 @@ class TooltipCanvas:
     
         return f"""
         <style>
-            /* Timestamp {self.timestamp} to force refresh */
+            /* Styles {self.style_version} */
             {keyframes}
     
             .tc-tooltip-item-{element_id} {{
@@ -226,6 +228,6 @@ class TooltipCanvas:
         tooltip_html = self._define_tooltip(content, element_id, visible_text)
         tooltip_css = self._generate_tooltip_css(element_id, tooltip_styles_override)
     
-        st.markdown(tooltip_css, unsafe_allow_html=True)
-        st.markdown(tooltip_html, unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_css), unsafe_allow_html=True)
+        st.markdown(emit("markdown", tooltip_html), unsafe_allow_html=True)
 
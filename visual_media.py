@@ -9,6 +9,7 @@ import os
 import glob
 import streamlit as st
 import streamlit.components.v1 as components
+from render_metrics import emit
 
 
 def render_item_visual_content(title, description, media_path, width="700px", height="400px"):
@@ -42,7 +43,7 @@ def render_item_visual_content(title, description, media_path, width="700px", he
 
     # Define base styles
     st.markdown(
-        f"""
+        emit("markdown", f"""
         <style>
             .media-container {{
                 width: {width};
@@ -95,23 +96,23 @@ def render_item_visual_content(title, description, media_path, width="700px", he
                 background-color: darkblue;
             }}
         </style>
-        """,
+        """),
         unsafe_allow_html=True
     )
 
     # Render media
     with st.container():
         if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']:
-            st.image(current_file, use_container_width=True)  # ✅ Fixed: Replaced deprecated use_column_width
+            st.image(emit("image", current_file), use_container_width=True)  # ✅ Fixed: Replaced deprecated use_column_width
 
         elif file_ext in ['.mp4', '.avi', '.mov', '.webm']:
-            st.video(current_file)
+            st.video(emit("video", current_file))
 
         elif file_ext == '.html':
             try:
                 with open(current_file, 'r') as file:
                     html_content = file.read()
-                components.html(html_content, width=int(width.replace("px", "")), height=int(height.replace("px", "")))
+                components.html(emit("html", html_content), width=int(width.replace("px", "")), height=int(height.replace("px", "")))
             except Exception as e:
                 st.error(f"Error loading HTML content: {str(e)}")
 
@@ -130,12 +131,12 @@ def render_item_visual_content(title, description, media_path, width="700px", he
         
     # Render the text section
     st.markdown(
-        f"""
+        emit("markdown", f"""
         <div class="text-container">
             <span class="title-text">{title}</span>
             <span class="description-text">{description}</span>
         </div>
-        """,
+        """),
         unsafe_allow_html=True
     )
 
@@ -162,14 +163,14 @@ class VisualContentGallery:
         
         try:
             if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']:
-                st.image(file_path, use_container_width=True)
+                st.image(emit("image", file_path), use_container_width=True)
             elif file_ext in ['.mp4', '.avi', '.mov', '.webm']:
-                st.video(file_path)
+                st.video(emit("video", file_path))
             elif file_ext == '.html':
                 with open(file_path, 'r', encoding='utf-8') as file:
                     html_content = file.read()
                 components.html(
-                    html_content, 
+                    emit("html", html_content), 
                     width=int(self.width.replace("px", "")) + width_offset, 
                     height=int(self.height.replace("px", "")) + height_offset
                 )
@@ -183,7 +184,7 @@ class VisualContentGallery:
 
         # Apply styles globally to the app
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <style>
                 .media-container {{
                     width: {self.width};
@@ -232,7 +233,7 @@ class VisualContentGallery:
                     background-color: darkblue;
                 }}
             </style>
-            """,
+            """),
             unsafe_allow_html=True
         )
         
@@ -252,12 +253,12 @@ class VisualContentGallery:
                         #st.experimental_rerun()
 
         st.markdown(
-            f"""
+            emit("markdown", f"""
             <div class="text-container">
                 <span class="title-text">{self.title}</span>
                 <span class="description-text">{self.description}</span>
             </div>
-            """,
+            """),
             unsafe_allow_html=True
         )
 